@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Measures the cost of EcoflowDevice.decode_message per message, comparing the
+# payload sniffing decoder with the former exception driven JSON-then-protobuf path.
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+import model.protos.powerstream_pb2 as powerstream
+from model.ecoflow.constant import CmdFuncs, CmdIds
+from model.ecoflow.payload import classify_payload, PAYLOAD_JSON, PAYLOAD_PROTO
+from stubs import install
+
+
+def heartbeat_payload(serial):
+    pdata = powerstream.InverterHeartbeat()
+    pdata.pv1InputVolt = 312
+    pdata.pv1InputCur = 41
+    pdata.pv1InputWatts = 1280
+    pdata.pv2InputVolt = 305
+    pdata.pv2InputCur = 38
+    pdata.pv2InputWatts = 1162
+    pdata.batSoc = 67
+    pdata.invOutputWatts = 2440
+    pdata.permanentWatts = 2000
+    pdata.invTemp = 412
+    message = powerstream.SendHeaderMsg()
+    header = message.msg.add()
+    header.src = 53
+    header.dest = 32
+    header.cmd_func = CmdFuncs.POWERSTREAM
+    header.cmd_id = CmdIds.HEARTBEAT
+    header.pdata = pdata.SerializeToString()
+    header.data_len = len(header.pdata)
+    header.seq = 123456
+    header.device_sn = serial
+    return message.SerializeToString()
+
+
+def params_payload():
+    return json.dumps({
+        "id": 123456,
+        "version": "1.0",
+        "timestamp": 1700000000,
+        "params": {
+            "bmsMaster.soc": 67,
+            "bmsMaster.temp": 24,
+            "inv.inputWatts": 0,
+            "inv.outputWatts": 212,
+            "pd.wattsOutSum": 212
+        }
+    }).encode("utf-8")
+
+
+def legacy_decode_message(device, payload):
+    # decode_message as it was before the payload type got sniffed
+    is_json = False
+    try:
+        msg = payload.decode("utf-8")
+        message = json.loads(msg)
+        is_json = True
+        device.decode_json(message, msg)
+    except Exception as e:
+        if not is_json:
+            device.decode_proto(payload)
+        else:
+            raise e
+
+
+def legacy_select(payload):
+    try:
+        json.loads(payload.decode("utf-8"))
+        return PAYLOAD_JSON
+    except Exception:
+        return PAYLOAD_PROTO
+
+
+def run(name, device, payload, number):
+    legacy = min(timeit.repeat(lambda: legacy_select(payload), number=number, repeat=5)) / number
+    sniffed = min(timeit.repeat(lambda: classify_payload(payload, device.uses_protobuf), number=number, repeat=5)) / number
+    print("%-22s decoder selection   legacy: %8.2f µs/msg   sniffed: %8.2f µs/msg" % (name, legacy * 1e6, sniffed * 1e6))
+    legacy = min(timeit.repeat(lambda: legacy_decode_message(device, payload), number=number, repeat=5)) / number
+    sniffed = min(timeit.repeat(lambda: device.decode_message(payload), number=number, repeat=5)) / number
+    print("%-22s full decode_message legacy: %8.2f µs/msg   sniffed: %8.2f µs/msg   (%.1f%%)" % (name, legacy * 1e6, sniffed * 1e6, (sniffed - legacy) / legacy * 100))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark EcoflowDevice.decode_message.')
+    parser.add_argument('-n', dest='number', type=int, default=20000, help='messages per run')
+    args = parser.parse_args()
+
+    install(homie=False)
+
+    from model.ecoflow.powerstream import Ecoflow_Powerstream
+    from model.ecoflow.delta_max import Ecoflow_DeltaMax
+
+    powerstream_device = Ecoflow_Powerstream("HW51ZOH4SF000001", "1")
+    delta_max = Ecoflow_DeltaMax("DCABZ8ZE0000001", "1")
+    try:
+        run("InverterHeartbeat", powerstream_device, heartbeat_payload(powerstream_device.device_sn), args.number)
+        run("Delta Max params", delta_max, params_payload(), args.number)
+        # a heartbeat of another powerstream received on a shared topic, only the header is scanned
+        foreign = heartbeat_payload("HW51ZOH4SF000002")
+        skipped = min(timeit.repeat(lambda: powerstream_device.decode_message(foreign), number=args.number, repeat=5)) / args.number
+        print("%-22s foreign device skip          %8.2f µs/msg" % ("InverterHeartbeat", skipped * 1e6))
+        print("misclassified payloads: powerstream %s, delta max %s" % (powerstream_device.decode_stats["misclassified"], delta_max.decode_stats["misclassified"]))
+        print("skipped messages: %s (%s bytes)" % (powerstream_device.decode_stats["skipped_messages"], powerstream_device.decode_stats["skipped_bytes"]))
+    finally:
+        powerstream_device.stop()
+        delta_max.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Measures the protobuf command encoding per message, comparing the cached header
+# encoder with the former path that builds and serializes a new SendHeaderMsg.
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+import model.protos.powerstream_pb2 as powerstream
+import model.protos.wn511_socket_sys_pb2 as wn511
+from model.ecoflow.commands import next_seq
+from model.ecoflow.constant import CmdFuncs, CmdIds, DEFAULT_SRC, DEFAULT_DEST
+from model.ecoflow.encoder import HeaderEncoder
+
+SERIAL = "HW51ZOH4SF4E1234"
+
+
+def legacy_set(pdata, seq):
+    # send_set as it was before the header encoder
+    message = powerstream.SendHeaderMsg()
+    header = message.msg.add()
+    header.src = DEFAULT_SRC
+    header.dest = DEFAULT_DEST
+    header.cmd_func = CmdFuncs.POWERSTREAM
+    header.cmd_id = CmdIds.SET_PERMANENT_WATTS
+    header.pdata = pdata.SerializeToString()
+    header.data_len = len(header.pdata)
+    header.need_ack = 1
+    header.seq = seq
+    header.device_sn = SERIAL
+    return message.SerializeToString()
+
+
+def legacy_heartbeat(pdata, seq):
+    # Simulated_Ecoflow_Smartplug.send_heartbeat as it was before the header encoder
+    message = powerstream.SendHeaderMsg()
+    header = message.msg.add()
+    header.src = DEFAULT_DEST
+    header.dest = DEFAULT_SRC
+    header.d_src = 1
+    header.d_dest = 1
+    header.cmd_func = CmdFuncs.SMART_PLUG
+    header.cmd_id = CmdIds.PLUG_HEARTBEAT
+    header.pdata = pdata.SerializeToString()
+    header.data_len = len(header.pdata)
+    header.need_ack = 1
+    header.version = 3
+    header.payload_ver = 3
+    header.seq = seq
+    header.device_sn = SERIAL
+    return message.SerializeToString()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the protobuf command encoding per message.')
+    parser.add_argument('-n', '--number', type=int, default=100000, help='number of messages per measurement (default: 100000)')
+    args = parser.parse_args()
+
+    set_pdata = wn511.permanent_watts_pack()
+    set_pdata.permanent_watts = 3500
+    set_encoder = HeaderEncoder({"src": DEFAULT_SRC, "dest": DEFAULT_DEST, "cmd_func": CmdFuncs.POWERSTREAM,
+                                 "cmd_id": CmdIds.SET_PERMANENT_WATTS, "need_ack": 1, "device_sn": SERIAL})
+
+    heartbeat_pdata = wn511.plug_heartbeat_pack()
+    heartbeat_pdata.watts = 1234
+    heartbeat_pdata.volt = 240
+    heartbeat_pdata.switch = True
+    heartbeat_pdata.brightness = 500
+    heartbeat_encoder = HeaderEncoder({"src": DEFAULT_DEST, "dest": DEFAULT_SRC, "d_src": 1, "d_dest": 1, "cmd_func": CmdFuncs.SMART_PLUG,
+                                       "cmd_id": CmdIds.PLUG_HEARTBEAT, "need_ack": 1, "version": 3, "payload_ver": 3, "device_sn": SERIAL})
+
+    cases = {
+        "set permanent watts": (legacy_set, set_pdata, set_encoder),
+        "plug heartbeat": (legacy_heartbeat, heartbeat_pdata, heartbeat_encoder)
+    }
+    for name, (legacy, pdata, encoder) in cases.items():
+        for seq in [0, 1, 127, 128, 999999, 2 ** 31 - 1]:
+            if legacy(pdata, seq) != encoder.encode(pdata.SerializeToString(), seq):
+                raise SystemExit(f"{name}: encoder output differs from SendHeaderMsg for seq {seq}")
+        legacy_time = min(timeit.repeat(lambda: legacy(pdata, next_seq()), number=args.number, repeat=3))
+        encoder_time = min(timeit.repeat(lambda: encoder.encode(pdata.SerializeToString(), next_seq()), number=args.number, repeat=3))
+        print("%-20s SendHeaderMsg %9.0f encodes/sec, header encoder %9.0f encodes/sec (%.1fx)" % (
+            name, args.number / legacy_time, args.number / encoder_time, legacy_time / encoder_time))
+
+
+if __name__ == '__main__':
+    main()
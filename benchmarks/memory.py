@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# Reports the memory used per device: a number of devices of every type is created
+# with the stub Ecoflow client and the stub Homie transport and the recorded payloads
+# in benchmarks/fixtures are decoded by every device. The memory is measured with
+# tracemalloc after the devices have been created and after the messages have been
+# handled (the difference is what the current values of a device cost).
+
+import argparse
+import gc
+import logging
+import sys
+import tracemalloc
+
+from stubs import install
+from pipeline import create_device, load_fixtures
+
+
+def allocated():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def value_store_size(device):
+    # bytes of the value store of the device (not the shared layout)
+    values = device.connector.values
+    return sys.getsizeof(values) + sys.getsizeof(values._ints) + sys.getsizeof(values._floats) + \
+        sys.getsizeof(values._state) + sys.getsizeof(values._objects) + sum(sys.getsizeof(value) for value in values._objects.values())
+
+
+def measure(type, serial, payloads, count):
+    # the first device loads the modules, message plans and configs shared by all devices
+    devices = [create_device(type, serial)]
+    try:
+        for payload in payloads:
+            devices[0].decode_message(payload)
+
+        tracemalloc.start()
+        start = allocated()
+        for index in range(count):
+            # same serial for all devices, the payloads are only handled by the device they belong to
+            devices.append(create_device(type, serial))
+        created = allocated()
+        for device in devices[1:]:
+            for payload in payloads:
+                device.decode_message(payload)
+        handled = allocated()
+        tracemalloc.stop()
+
+        return {
+            "created": (created - start) / count,
+            "values": (handled - created) / count,
+            "store": value_store_size(devices[-1]) if getattr(devices[-1].connector, "values", None) is not None else None
+        }
+    finally:
+        for device in devices:
+            device.stop()
+            device.connector.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the memory used per device.')
+    parser.add_argument('-n', dest='count', type=int, default=50, help='devices per type')
+    parser.add_argument('--type', dest='types', action='append', choices=["powerstream", "smartplug", "delta-max"],
+                        help='only measure this device type (can be repeated)')
+    args = parser.parse_args()
+
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.WARNING)
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+    install()
+
+    fixtures = load_fixtures()
+    for type in args.types if args.types else ["powerstream", "delta-max"]:
+        type_fixtures = [fixture for fixture in fixtures.values() if fixture["device"] == type]
+        payloads = [payload for fixture in type_fixtures for payload in fixture["payloads"]]
+        result = measure(type, type_fixtures[0]["serial"], payloads, args.count)
+        print("%-12s %9d bytes/device created %9d bytes/device for values %9d bytes/device total   value store: %s" % (
+            type, result["created"], result["values"], result["created"] + result["values"],
+            "%d bytes" % result["store"] if result["store"] is not None else "-"))
+
+
+if __name__ == '__main__':
+    main()
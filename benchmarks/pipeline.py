@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# Drives the recorded payloads in benchmarks/fixtures through the message pipeline
+# without any network (stub Ecoflow client and stub Homie transport) and reports
+# messages/sec, µs per message and memory per message for every stage:
+#
+#   decode_message   EcoflowDevice.decode_message, the complete pipeline
+#   handler          the registered handler (e.g. handle_heartbeat) with pre-decoded data
+#   connector        Connector.update + end_update with the values the handler produced
+#   homie            Proto_Device/Json_Device.update + end_update with the published values
+#
+# Memory is reported as the peak of the memory allocated while handling one message
+# (bytes) and the memory blocks that are still allocated afterwards (blocks, > 0 means
+# something grows per message).
+#
+# The time of every stage is also reported relative to a reference workload (plain json
+# and float arithmetic, independent of the bridge code) that runs right before every run of the stage.
+# Only the relative times and the memory are compared with benchmarks/baselines.json, the
+# absolute times depend on the machine. Use --save to store the current results as new baselines.
+
+import argparse
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import timeit
+import tracemalloc
+
+from stubs import install
+
+BENCHMARK_FOLDER = os.path.dirname(os.path.realpath(__file__))
+FIXTURE_FOLDER = os.path.join(BENCHMARK_FOLDER, "fixtures")
+BASELINE_FILE = os.path.join(BENCHMARK_FOLDER, "baselines.json")
+REFERENCE_VALUES = {f"value{index}": index * 1.5 for index in range(40)}
+
+
+def load_fixtures(names=None):
+    fixtures = {}
+    for filename in sorted(os.listdir(FIXTURE_FOLDER)):
+        name, ext = os.path.splitext(filename)
+        if ext != ".json" or (names and name not in names):
+            continue
+        with open(os.path.join(FIXTURE_FOLDER, filename)) as f:
+            fixture = json.load(f)
+        fixture["payloads"] = [bytes.fromhex(payload) for payload in fixture["payloads"]]
+        fixtures[name] = fixture
+    return fixtures
+
+
+def create_device(type, serial):
+    if type == "powerstream":
+        from model.ecoflow.powerstream import Ecoflow_Powerstream
+        return Ecoflow_Powerstream(serial, "1")
+    elif type == "smartplug":
+        from model.ecoflow.smart_plug import Ecoflow_Smartplug
+        return Ecoflow_Smartplug(serial, "1")
+    elif type == "delta-max":
+        from model.ecoflow.delta_max import Ecoflow_DeltaMax
+        return Ecoflow_DeltaMax(serial, "1")
+    raise ValueError(f"unknown device type {type}")
+
+
+class Recorder:
+    # records the calls of a method while one payload is decoded
+    def __init__(self, cls, name):
+        self.cls = cls
+        self.name = name
+        self.original = getattr(cls, name)
+        self.calls = []
+
+    def __enter__(self):
+        original = self.original
+        calls = self.calls
+
+        def record(target, *args, **kwargs):
+            calls.append((args, kwargs))
+            return original(target, *args, **kwargs)
+        setattr(self.cls, self.name, record)
+        return self
+
+    def __exit__(self, *args):
+        setattr(self.cls, self.name, self.original)
+
+
+def reference():
+    # a message sized workload that runs at the speed of the machine and the interpreter
+    values = json.loads(json.dumps(REFERENCE_VALUES))
+    return [round(value / 10, 1) for value in values.values() if value != 0]
+
+
+def handler_call(device, payload):
+    # returns a function that calls the registered handlers with the already decoded payload
+    if payload[0:1] == b"{":
+        message = json.loads(payload.decode("utf-8"))
+        cmd_id = message.get("cmdId", message.get("operateType", "params"))
+        cmd_func = message.get("cmdFunc", device.default_cmd_func)
+        handlers = device.handlers[cmd_id] if cmd_func is None else device.handlers[cmd_func][cmd_id]
+        return lambda: [handler(message) for handler in handlers]
+
+    from model.ecoflow.payload import scan_headers
+    calls = []
+    for header in scan_headers(payload):
+        pdata = type(device.get_pdata_message(header.cmd_func, header.cmd_id))()
+        pdata.ParseFromString(bytes(header.pdata))
+        for handler in device.handlers[header.cmd_func][header.cmd_id]:
+            calls.append((handler, pdata, header))
+    return lambda: [handler(pdata, header) for handler, pdata, header in calls]
+
+
+def prepare(fixture):
+    from model.connector import Connector
+    device = create_device(fixture["device"], fixture["serial"])
+    homie_device = device.connector.homie_device
+    stages = {
+        "decode_message": [],
+        "handler": [],
+        "connector": [],
+        "homie": []
+    }
+    # the first run of every payload publishes all values, record what every stage receives
+    for payload in fixture["payloads"]:
+        stages["decode_message"].append(lambda payload=payload: device.decode_message(payload))
+        stages["handler"].append(handler_call(device, payload))
+        with Recorder(Connector, "update") as connector_calls, Recorder(type(homie_device), "update") as homie_calls:
+            device.decode_message(payload)
+        if connector_calls.calls:
+            stages["connector"].append(lambda calls=connector_calls.calls: replay(device.connector, calls))
+        if homie_calls.calls:
+            stages["homie"].append(lambda calls=homie_calls.calls: replay(homie_device, calls))
+    return device, {name: calls for name, calls in stages.items() if calls}
+
+
+def replay(target, calls):
+    for args, kwargs in calls:
+        target.update(*args, **kwargs)
+    target.end_update()
+
+
+def measure_time(calls, number, repeat):
+    # seconds per message of the fastest run and the median time relative to the reference,
+    # the reference runs right before every run of the stage so both see the same machine load
+    count = len(calls)
+
+    def run():
+        for index in range(number):
+            calls[index % count]()
+
+    def run_reference():
+        for _ in range(number):
+            reference()
+    times = []
+    ratios = []
+    for _ in range(repeat):
+        reference_seconds = timeit.timeit(run_reference, number=1)
+        seconds = timeit.timeit(run, number=1)
+        times.append(seconds)
+        ratios.append(seconds / reference_seconds)
+    return min(times) / number, statistics.median(ratios)
+
+
+def measure(calls, number, repeat):
+    count = len(calls)
+    seconds, relative = measure_time(calls, number, repeat)
+
+    gc.collect()
+    tracemalloc.start()
+    peak = 0
+    for call in calls:
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        call()
+        peak += tracemalloc.get_traced_memory()[1] - start
+    tracemalloc.stop()
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    for index in range(number):
+        calls[index % count]()
+    gc.collect()
+    retained = (sys.getallocatedblocks() - blocks) / number
+
+    return {
+        "us": round(seconds * 1e6, 2),
+        "msgs_per_sec": round(1 / seconds),
+        "relative": round(relative, 2),
+        "peak_bytes": round(peak / count),
+        "retained_blocks": round(retained, 3)
+    }
+
+
+def diff(result, baseline, tolerance):
+    if baseline is None or "relative" not in baseline:
+        return "new", False
+    change = (result["relative"] - baseline["relative"]) / baseline["relative"] * 100
+    text = "%+6.1f%% time" % change
+    regression = change > tolerance
+    if baseline["peak_bytes"] > 0:
+        memory_change = (result["peak_bytes"] - baseline["peak_bytes"]) / baseline["peak_bytes"] * 100
+        text += "  %+6.1f%% memory" % memory_change
+        regression = regression or memory_change > tolerance
+    if result["retained_blocks"] >= 1 and baseline["retained_blocks"] < 1:
+        text += "  now retains memory"
+        regression = True
+    return text + ("  REGRESSION" if regression else ""), regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the message pipeline with recorded payloads.')
+    parser.add_argument('-n', dest='number', type=int, default=2000, help='messages per run')
+    parser.add_argument('-r', dest='repeat', type=int, default=5, help='runs per stage (default: 5)')
+    parser.add_argument('--fixture', dest='fixtures', action='append', help='only run this fixture (can be repeated)')
+    parser.add_argument('--save', action='store_true', help='store the results as new baselines')
+    parser.add_argument('--check', action='store_true', help='exit with 1 if a stage regressed')
+    parser.add_argument('--tolerance', type=float, default=20, help='allowed slowdown in percent (default: 20)')
+    args = parser.parse_args()
+
+    # same log level as the bridge, only warnings are shown
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.WARNING)
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+    install()
+
+    baselines = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baselines = json.load(f)
+
+    results = {}
+    regressions = 0
+    for name, fixture in load_fixtures(args.fixtures).items():
+        device, stages = prepare(fixture)
+        try:
+            for stage, calls in stages.items():
+                key = f"{name}/{stage}"
+                result = measure(calls, args.number, args.repeat)
+                results[key] = result
+                text, regression = diff(result, baselines.get(key), args.tolerance)
+                regressions += 1 if regression else 0
+                print("%-48s %9.2f µs/msg %9d msgs/sec %7.2fx ref %9d bytes/msg %7.2f blocks/msg   %s" % (
+                    key, result["us"], result["msgs_per_sec"], result["relative"], result["peak_bytes"], result["retained_blocks"], text))
+        finally:
+            device.stop()
+            device.connector.close()
+
+    if args.save:
+        # the absolute times are only valid on this machine
+        baselines.update({key: {name: value for name, value in result.items() if name not in ("us", "msgs_per_sec")}
+                          for key, result in results.items()})
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write("\n")
+        print(f"baselines saved to {BASELINE_FILE}")
+    if regressions > 0:
+        print(f"{regressions} stage(s) slower than the baseline (tolerance {args.tolerance}%)")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
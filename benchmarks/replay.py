@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Replays a capture file (see index.py --capture) into the configured devices without
+# any network connection: the Ecoflow MQTT client and the homie MQTT transport are
+# replaced by stubs. The messages are replayed with their original timing (--speed 1),
+# faster or slower (--speed 10, --speed 0.5) or as fast as possible (--speed 0).
+
+import argparse
+import json
+import logging
+import os
+import time
+
+from paho.mqtt.client import MQTTMessage
+from stubs import install
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def create_devices(config, user_id):
+    from model.ecoflow.registry import get_device_class
+
+    devices = {}
+    for device in config["devices"]:
+        if "disabled" in device and device["disabled"] == True:
+            continue
+        if "simulated" in device and device["simulated"] is True:
+            # simulated devices do not receive messages from the Ecoflow cloud
+            continue
+        device_class = get_device_class(device["type"])
+        if device_class is not None:
+            devices[device["serial"]] = device_class(device["serial"], user_id)
+        else:
+            _LOGGER.error("unsupported device type: %s" % device["type"])
+    return devices
+
+
+def replay(path, devices, speed):
+    from model.ecoflow.mqtt_client import parse_device_sn
+    from model.utils.capture import read_capture
+
+    stats = {
+        "messages": 0,
+        "bytes": 0,
+        "unrouted": 0,
+        "errors": 0,
+        "handling_time": 0
+    }
+    first_timestamp = None
+    started = time.monotonic()
+    for timestamp, topic, payload in read_capture(path):
+        if first_timestamp is None:
+            first_timestamp = timestamp
+        if speed > 0:
+            delay = (timestamp - first_timestamp) / speed - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+        device = devices.get(parse_device_sn(topic))
+        if device is None:
+            stats["unrouted"] += 1
+            continue
+        message = MQTTMessage(topic=topic.encode("utf-8"))
+        message.payload = payload
+        start = time.perf_counter()
+        try:
+            device.on_message(None, None, message)
+        except Exception as err:
+            stats["errors"] += 1
+            _LOGGER.error(f"{topic}: {err}")
+        stats["handling_time"] += time.perf_counter() - start
+        stats["messages"] += 1
+        stats["bytes"] += len(payload)
+    stats["elapsed"] = time.monotonic() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay captured Ecoflow messages into the configured devices.')
+    parser.add_argument('capture_file', help='capture file written by index.py --capture')
+    parser.add_argument('--config-folder', dest='config_folder', default=os.getenv("EF_CONFIG_FOLDER") if os.getenv("EF_CONFIG_FOLDER") is not None else "./configs",
+                        help='Folder with the config.json that lists the devices.')
+    parser.add_argument('--speed', type=float, default=1, help='replay speed relative to the capture, 0 = as fast as possible (default: 1)')
+    parser.add_argument('--user-id', dest='user_id', default="1", help='user id used in the device topics')
+    args = parser.parse_args()
+
+    # same log level as the bridge, only warnings are shown
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.WARNING)
+    logging.basicConfig(level=logging.INFO, handlers=[handler], format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    install(config_folder=args.config_folder)
+
+    with open(os.path.join(args.config_folder, 'config.json')) as c:
+        config = json.load(c)
+    devices = create_devices(config, args.user_id)
+    try:
+        stats = replay(args.capture_file, devices, args.speed)
+    finally:
+        for device in devices.values():
+            device.stop()
+            device.connector.close()
+
+    print("replayed %d messages (%d bytes) in %.2f seconds, %d not routed to a configured device, %d errors" % (
+        stats["messages"], stats["bytes"], stats["elapsed"], stats["unrouted"], stats["errors"]))
+    if stats["messages"] > 0:
+        print("handling: %.0f msgs/sec, %.1f µs/msg" % (
+            stats["messages"] / stats["handling_time"], stats["handling_time"] / stats["messages"] * 1e6))
+    for serial, device in devices.items():
+        homie_device = device.connector.homie_device
+        print("%-20s decoded: %s, homie publishes: %d" % (serial, json.dumps(device.decode_stats), homie_device.mqtt_client.published))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Creates a growing number of simulated smart plugs (one heartbeat task every 10 seconds
+# per plug) with the stub clients and reports the number of threads and the scheduler
+# wakeups per second while the periodic tasks run.
+
+import argparse
+import logging
+import threading
+import time
+
+from stubs import install
+
+
+def measure(count, duration):
+    from model.utils.scheduler import get_scheduler
+    from model.ecoflow.smart_plug import Simulated_Ecoflow_Smartplug
+
+    threads = threading.active_count()
+    devices = []
+    try:
+        for index in range(count):
+            devices.append(Simulated_Ecoflow_Smartplug("HW52%012d" % index, "1"))
+        scheduler = get_scheduler()
+        start = scheduler.stats()
+        time.sleep(duration)
+        end = scheduler.stats()
+        return {
+            "threads": threading.active_count() - threads,
+            "tasks": end["tasks"],
+            "wakeups": (end["wakeups"] - start["wakeups"]) / duration,
+            "runs": (end["runs"] - start["runs"]) / duration
+        }
+    finally:
+        for device in devices:
+            device.stop()
+            device.connector.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure threads and timer wakeups per number of devices.')
+    parser.add_argument('-n', dest='counts', type=int, action='append', help='number of devices (can be repeated, default: 10, 100, 1000)')
+    parser.add_argument('--duration', type=float, default=20, help='measuring time per count in seconds (default: 20)')
+    args = parser.parse_args()
+
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.WARNING)
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+    install()
+
+    for count in args.counts if args.counts else [10, 100, 1000]:
+        result = measure(count, args.duration)
+        print("%5d devices: %5d threads, %5d scheduled tasks, %7.1f scheduler wakeups/sec, %7.1f task runs/sec" % (
+            count, result["threads"], result["tasks"], result["wakeups"], result["runs"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+# Runs a fleet of virtual Smart Plugs, Powerstreams and Delta Maxes against the bridge without
+# any network connection or Ecoflow login. A local broker stand-in routes the messages between
+# the fleet and the real EcoflowClient (with paho replaced), the Homie MQTT transport is a stub.
+# The virtual devices send heartbeats and energy reports at the configured rates and answer the
+# get and set requests of the bridge. Reports the sustained messages/sec, the latency from the
+# publish of the fleet until the bridge has handled the message and the CPU per device.
+
+import argparse
+import json
+import logging
+import queue
+import random
+import resource
+import threading
+import time
+import types
+from array import array
+
+from paho.mqtt.client import MQTTMessage
+from stubs import install
+
+import model.protos.platform_pb2 as platform
+import model.protos.powerstream_pb2 as powerstream
+import model.protos.wn511_socket_sys_pb2 as wn511
+from model.ecoflow.constant import CmdFuncs, CmdIds, DEFAULT_SRC, DEFAULT_DEST, WatthType
+from model.ecoflow.encoder import HeaderEncoder
+from model.ecoflow.payload import scan_headers
+from model.ecoflow.registry import get_device_config
+from model.utils.scheduler import get_scheduler
+from model.utils.topic_trie import TopicTrie
+
+_LOGGER = logging.getLogger(__name__)
+
+USER_ID = "1"
+
+
+class LocalBroker:
+    # routes the published messages to the matching subscribers in one delivery thread,
+    # like the network thread of paho delivers them to the bridge
+    def __init__(self) -> None:
+        self.topics = TopicTrie()
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self.run, name="broker", daemon=True)
+        self.published = 0
+        self.delivered = 0
+        self._thread.start()
+
+    def subscribe(self, topic_filter, callback):
+        self.topics.add(topic_filter, callback)
+
+    def publish(self, topic, payload):
+        self.published += 1
+        self._queue.put((topic, payload, time.monotonic()))
+
+    def run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            topic, payload, published = item
+            for callback in self.topics.match(topic):
+                self.delivered += 1
+                try:
+                    callback(topic, payload, published)
+                except Exception as err:
+                    _LOGGER.error(f"{topic}: {err}")
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+class BrokerConnection:
+    # stand-in for the paho client used by EcoflowClient
+    def __init__(self, broker: LocalBroker) -> None:
+        self.broker = broker
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_connect_fail = None
+        self.on_message = None
+        self._subscribed = set()
+        self._stopped = threading.Event()
+
+    def username_pw_set(self, username, password=None):
+        pass
+
+    def tls_set(self, **kwargs):
+        pass
+
+    def tls_insecure_set(self, value):
+        pass
+
+    def reconnect_delay_set(self, min_delay=1, max_delay=120):
+        pass
+
+    def connect(self, host, port=1883):
+        pass
+
+    def loop_forever(self):
+        self.on_connect(self, None, {}, 0)
+        self._stopped.wait()
+
+    def loop_stop(self):
+        self._stopped.set()
+
+    def disconnect(self):
+        self._stopped.set()
+
+    def subscribe(self, topics, qos=0):
+        for topic, _ in topics if isinstance(topics, list) else [(topics, qos)]:
+            if topic not in self._subscribed:
+                self._subscribed.add(topic)
+                self.broker.subscribe(topic, self.deliver)
+
+    def publish(self, topic, payload):
+        # like paho, strings are sent utf-8 encoded
+        self.broker.publish(topic, payload.encode("utf-8") if isinstance(payload, str) else payload)
+
+    def deliver(self, topic, payload, published):
+        message = MQTTMessage(topic=topic.encode("utf-8"))
+        message.payload = payload
+        message.timestamp = published
+        self.on_message(self, None, message)
+
+
+def create_client(broker, wildcard_subscriptions):
+    import model.ecoflow.mqtt_client as mqtt_client
+
+    class MeasuredClient(mqtt_client.EcoflowClient):
+        # measures the latency from the publish of the fleet until the message has been handled
+        latencies = array("d")
+        handling_cpu = {}
+
+        def dispatch(self, mqtt_message):
+            started = time.thread_time()
+            super().dispatch(mqtt_message)
+            device_type = device_types.get(mqtt_client.parse_device_sn(mqtt_message.topic))
+            self.handling_cpu[device_type] = self.handling_cpu.get(device_type, 0) + time.thread_time() - started
+            self.latencies.append(time.monotonic() - mqtt_message.timestamp)
+
+    mqtt_client.mqtt_client.Client = lambda **kwargs: BrokerConnection(broker)
+    auth = types.SimpleNamespace(client_id="simulator", mqtt_username="simulator", mqtt_password="", mqtt_url="localhost", mqtt_port=1883,
+                                 authorize_time=0, from_cache=False)
+    client = MeasuredClient(auth)
+    client.wildcard_subscriptions = wildcard_subscriptions
+    mqtt_client.ecoflow_client = client
+    return client
+
+
+# serial -> device type, used to assign the handling time
+device_types = {}
+
+
+class VirtualDevice:
+    def __init__(self, broker: LocalBroker, serial: str, interval: float) -> None:
+        self.broker = broker
+        self.serial = serial
+        self.interval = interval
+        self.data_topic = f"/app/device/property/{serial}"
+        self.set_reply_topic = f"/app/{USER_ID}/{serial}/thing/property/set_reply"
+        self.get_reply_topic = f"/app/{USER_ID}/{serial}/thing/property/get_reply"
+        self.tasks = []
+        self.seq = random.randint(100000, 999999)
+        device_types[serial] = type(self).__name__
+        broker.subscribe(f"/app/{USER_ID}/{serial}/thing/property/set", self.on_set)
+        broker.subscribe(f"/app/{USER_ID}/{serial}/thing/property/get", self.on_get)
+
+    def every(self, interval, function):
+        # the first message of every device is sent at a random time within the interval
+        if interval > 0:
+            self.tasks.append(get_scheduler().call_later(random.uniform(0, interval), self.start_task, interval, function))
+
+    def start_task(self, interval, function):
+        function()
+        self.tasks.append(get_scheduler().call_every(interval, function, jitter=interval / 10))
+
+    def next_seq(self):
+        self.seq += 1
+        return self.seq
+
+    def stop(self):
+        for task in self.tasks:
+            task.cancel()
+
+    def on_set(self, topic, payload, published):
+        pass
+
+    def on_get(self, topic, payload, published):
+        pass
+
+
+class VirtualProtobufDevice(VirtualDevice):
+    def __init__(self, broker: LocalBroker, serial: str, interval: float) -> None:
+        super().__init__(broker, serial, interval)
+        self.encoders = {}
+
+    def encode(self, cmd_func, cmd_id, pdata, seq=None, reply=False):
+        encoder = self.encoders.get((cmd_func, cmd_id, reply))
+        if encoder is None:
+            fields = {"src": DEFAULT_DEST, "dest": DEFAULT_SRC, "cmd_func": cmd_func, "cmd_id": cmd_id, "need_ack": 0,
+                      "version": 19, "payload_ver": 1, "device_sn": self.serial}
+            if reply:
+                fields["is_ack"] = 1
+            encoder = self.encoders[(cmd_func, cmd_id, reply)] = HeaderEncoder(fields)
+        return encoder.encode(pdata.SerializeToString(), seq if seq is not None else self.next_seq())
+
+    def on_set(self, topic, payload, published):
+        for header in scan_headers(memoryview(payload)) or []:
+            self.apply_set(header.cmd_id, bytes(header.pdata) if header.pdata is not None else b"")
+            # the reply carries the seq of the command
+            ack = wn511.plug_ack_message()
+            ack.ack = 1
+            self.broker.publish(self.set_reply_topic, self.encode(header.cmd_func, header.cmd_id, ack, seq=header.seq, reply=True))
+
+    def on_get(self, topic, payload, published):
+        self.broker.publish(self.get_reply_topic, self.heartbeat())
+
+    def apply_set(self, cmd_id, pdata):
+        pass
+
+    def heartbeat(self) -> bytes:
+        pass
+
+    def send_heartbeat(self):
+        self.broker.publish(self.data_topic, self.heartbeat())
+
+
+class VirtualSmartPlug(VirtualProtobufDevice):
+    def __init__(self, broker: LocalBroker, serial: str, interval: float) -> None:
+        super().__init__(broker, serial, interval)
+        self.state = wn511.plug_heartbeat_pack()
+        self.state.country = 17477
+        self.state.max_cur = 160
+        self.state.temp = 29
+        self.state.freq = 50
+        self.state.volt = 231
+        self.state.watts = random.randint(0, 25000)
+        self.state.switch = True
+        self.state.brightness = 1023
+        self.state.max_watts = 2500
+        self.state.heartbeat_frequency = 2
+        self.state.mesh_enable = True
+        self.every(interval, self.send_heartbeat)
+
+    def heartbeat(self) -> bytes:
+        state = self.state
+        if state.switch:
+            state.watts = max(0, state.watts + random.randint(-150, 150))
+            state.current = state.watts * 10 // max(1, state.volt)
+        else:
+            state.watts = 0
+            state.current = 0
+        state.volt = 231 + random.randint(-2, 2)
+        return self.encode(CmdFuncs.SMART_PLUG, CmdIds.PLUG_HEARTBEAT, state)
+
+    def apply_set(self, cmd_id, pdata):
+        if cmd_id == CmdIds.SET_PLUG_SWITCH:
+            message = wn511.plug_switch_message()
+            message.ParseFromString(pdata)
+            self.state.switch = message.plug_switch == 1
+        elif cmd_id == CmdIds.SET_MAX_WATTS:
+            message = wn511.max_watts_pack()
+            message.ParseFromString(pdata)
+            self.state.max_watts = message.max_watts
+        elif cmd_id == CmdIds.SET_PLUG_BRIGHTNESS:
+            message = wn511.brightness_pack()
+            message.ParseFromString(pdata)
+            self.state.brightness = message.brightness
+
+
+class VirtualPowerstream(VirtualProtobufDevice):
+    def __init__(self, broker: LocalBroker, serial: str, interval: float, energy_interval: float) -> None:
+        super().__init__(broker, serial, interval)
+        state = self.state = powerstream.InverterHeartbeat()
+        state.pv1Status = state.pv2Status = state.batStatus = state.llcStatus = state.invStatus = 2
+        state.pv1InputVolt = 312
+        state.pv1OpVolt = 3118
+        state.pv1InputCur = 41
+        state.pv1InputWatts = random.randint(0, 4000)
+        state.pv1Temp = 381
+        state.pv2InputVolt = 305
+        state.pv2OpVolt = 3049
+        state.pv2InputCur = 38
+        state.pv2InputWatts = random.randint(0, 4000)
+        state.pv2Temp = 377
+        state.batInputVolt = 512
+        state.batOpVolt = 518
+        state.batInputCur = 1875
+        state.batInputWatts = 951
+        state.batTemp = 240
+        state.batSoc = random.randint(10, 100)
+        state.llcInputVolt = 512
+        state.llcOpVolt = 38020
+        state.llcTemp = 402
+        state.invInputVolt = 38010
+        state.invOpVolt = 2301
+        state.invOutputCur = 1040
+        state.invOutputWatts = 2440
+        state.invTemp = 412
+        state.invFreq = 500
+        state.invRelayStatus = state.pv1RelayStatus = state.pv2RelayStatus = 1
+        state.installCountry = 17477
+        state.permanentWatts = 2000
+        state.dynamicWatts = 2000
+        state.lowerLimit = 10
+        state.upperLimit = 100
+        state.invOnOff = 1
+        state.invBrightness = 1023
+        state.heartbeatFrequency = 60
+        state.ratedPower = 8000
+        self.state2 = powerstream.InverterHeartbeat2()
+        self.state2.H2_upperLimit = 100
+        self.state2.H2_lowerLimit = 10
+        # watth_type -> energy per hour of the day (Wh)
+        self.energy = {watth_type: [0] * 24 for watth_type in WatthType}
+        self.energy_seq = 0
+        self.every(interval, self.send_heartbeat)
+        self.every(interval, self.send_heartbeat2)
+        self.every(energy_interval, self.send_energy_report)
+
+    def heartbeat(self) -> bytes:
+        state = self.state
+        state.pv1InputWatts = max(0, state.pv1InputWatts + random.randint(-40, 40))
+        state.pv2InputWatts = max(0, state.pv2InputWatts + random.randint(-40, 40))
+        state.invOutputWatts = min(state.permanentWatts, state.pv1InputWatts + state.pv2InputWatts)
+        state.dynamicWatts = state.invOutputWatts
+        state.invOpVolt = 2301 + random.randint(-5, 5)
+        return self.encode(CmdFuncs.POWERSTREAM, CmdIds.HEARTBEAT, state)
+
+    def send_heartbeat2(self):
+        self.state2.H2_wifiRssi = random.randint(-80, -40)
+        self.broker.publish(self.data_topic, self.encode(CmdFuncs.POWERSTREAM, CmdIds.HEARTBEAT2, self.state2))
+
+    def send_energy_report(self):
+        hour = time.localtime().tm_hour
+        watts = {
+            WatthType.TOTAL: self.state.invOutputWatts,
+            WatthType.TO_PLUGS: self.state.invOutputWatts // 2,
+            WatthType.TO_BATTERY: self.state.batInputWatts,
+            WatthType.FROM_BATTERY: self.state.batInputWatts // 3,
+            WatthType.PV1: self.state.pv1InputWatts,
+            WatthType.PV2: self.state.pv2InputWatts
+        }
+        report = platform.BatchEnergyTotalReport()
+        self.energy_seq += 1
+        report.watth_seq = self.energy_seq
+        day = int(time.time()) // 86400 * 86400
+        for watth_type, hours in self.energy.items():
+            # 0.1 W -> Wh per report interval
+            hours[hour] += max(1, int(watts[watth_type] / 10 * self.interval / 3600))
+            item = report.watth_item.add()
+            item.timestamp = day
+            item.watth_type = watth_type
+            item.watth.extend(hours)
+        self.broker.publish(self.data_topic, self.encode(CmdFuncs.REPORTS, CmdIds.ENERGY_TOTAL_REPORT, report))
+
+    def apply_set(self, cmd_id, pdata):
+        if cmd_id == CmdIds.SET_PERMANENT_WATTS:
+            message = wn511.permanent_watts_pack()
+            message.ParseFromString(pdata)
+            self.state.permanentWatts = message.permanent_watts
+        elif cmd_id == CmdIds.SET_BAT_LOWER:
+            message = wn511.bat_lower_pack()
+            message.ParseFromString(pdata)
+            self.state.lowerLimit = message.lower_limit
+        elif cmd_id == CmdIds.SET_BAT_UPPER:
+            message = wn511.bat_upper_pack()
+            message.ParseFromString(pdata)
+            self.state.upperLimit = message.upper_limit
+
+
+class VirtualDeltaMax(VirtualDevice):
+    # the values of the params messages, all other values are only part of the latestQuotas reply
+    PARAMS = ["bmsMaster.soc", "bmsMaster.temp", "bmsMaster.inputWatts", "bmsMaster.outputWatts", "inv.inputWatts",
+              "inv.outputWatts", "inv.outTemp", "pd.wattsOutSum", "pd.wattsInSum", "pd.remainTime", "pd.soc", "ems.lcdShowSoc"]
+
+    def __init__(self, broker: LocalBroker, serial: str, interval: float) -> None:
+        super().__init__(broker, serial, interval)
+        self.quotas = {}
+        for name, config in get_device_config("delta-max")["properties"].items():
+            if config.get("unit") == "W":
+                self.quotas[name] = random.randint(0, 400)
+            elif "soc" in name.lower():
+                self.quotas[name] = random.randint(10, 100)
+            elif "temp" in name.lower():
+                self.quotas[name] = 25
+            else:
+                self.quotas[name] = 0
+        self.every(interval, self.send_params)
+
+    def send_params(self):
+        for name in self.PARAMS:
+            value = self.quotas.get(name)
+            if isinstance(value, int) and name.endswith("Watts"):
+                self.quotas[name] = max(0, value + random.randint(-15, 15))
+        params = {name: self.quotas[name] for name in self.PARAMS if name in self.quotas}
+        self.broker.publish(self.data_topic, json.dumps({"id": self.next_seq(), "version": "1.0", "timestamp": int(time.time()), "params": params}).encode("utf-8"))
+
+    def on_get(self, topic, payload, published):
+        self.broker.publish(self.get_reply_topic, json.dumps({"code": "0", "message": "Success", "operateType": "latestQuotas",
+                                                              "data": {"online": 1, "quotaMap": self.quotas}}).encode("utf-8"))
+
+    def on_set(self, topic, payload, published):
+        message = json.loads(payload)
+        params = message.get("params", {})
+        names = {CmdIds.USB_OUT_CFG: "pd.dcOutState", CmdIds.CAR_OUT_CFG: "mppt.carState", CmdIds.AC_OUT_CFG: "inv.cfgAcEnabled"}
+        if params.get("id") in names and "enabled" in params:
+            self.quotas[names[params["id"]]] = params["enabled"]
+        self.broker.publish(self.set_reply_topic, json.dumps({"id": message.get("id"), "code": "0", "message": "Success",
+                                                              "operateType": message.get("operateType"), "data": {"ack": 0}}).encode("utf-8"))
+
+
+def create_fleet(broker, args):
+    fleet = []
+    for index in range(args.plugs):
+        fleet.append(VirtualSmartPlug(broker, "HW52SIM%09d" % index, args.plug_interval))
+    for index in range(args.powerstreams):
+        fleet.append(VirtualPowerstream(broker, "HW51SIM%09d" % index, args.powerstream_interval, args.energy_interval))
+    for index in range(args.delta_maxes):
+        fleet.append(VirtualDeltaMax(broker, "DCABSIM%08d" % index, args.delta_max_interval))
+    return fleet
+
+
+def create_bridge_devices(fleet):
+    from model.ecoflow.powerstream import Ecoflow_Powerstream
+    from model.ecoflow.smart_plug import Ecoflow_Smartplug
+    from model.ecoflow.delta_max import Ecoflow_DeltaMax
+
+    classes = {
+        VirtualSmartPlug: Ecoflow_Smartplug,
+        VirtualPowerstream: Ecoflow_Powerstream,
+        VirtualDeltaMax: Ecoflow_DeltaMax
+    }
+    devices = [classes[type(device)](device.serial, USER_ID) for device in fleet]
+    for device in devices:
+        device.init_subscriptions()
+    return devices
+
+
+def send_command(devices, futures):
+    # a set command to a random device, the future returns the round trip time
+    from model.ecoflow.powerstream import Ecoflow_Powerstream
+    from model.ecoflow.smart_plug import Ecoflow_Smartplug
+
+    device = random.choice(devices)
+    if isinstance(device, Ecoflow_Powerstream):
+        futures.append(device.set_output_power(random.randint(0, 600)))
+    elif isinstance(device, Ecoflow_Smartplug):
+        futures.append(device.set_max_watts(random.randint(100, 2500)))
+    else:
+        futures.append(device.set_out(random.random() < 0.5, CmdIds.USB_OUT_CFG))
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0
+
+
+def cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a fleet of virtual Ecoflow devices against the bridge.')
+    parser.add_argument('--plugs', type=int, default=1000, help='number of smart plugs (default: 1000)')
+    parser.add_argument('--powerstreams', type=int, default=100, help='number of Powerstreams (default: 100)')
+    parser.add_argument('--delta-maxes', dest='delta_maxes', type=int, default=20, help='number of Delta Maxes (default: 20)')
+    parser.add_argument('--plug-interval', dest='plug_interval', type=float, default=10, help='seconds between two plug heartbeats (default: 10)')
+    parser.add_argument('--powerstream-interval', dest='powerstream_interval', type=float, default=10,
+                        help='seconds between two Powerstream heartbeats of each kind (default: 10)')
+    parser.add_argument('--energy-interval', dest='energy_interval', type=float, default=300, help='seconds between two energy reports (default: 300)')
+    parser.add_argument('--delta-max-interval', dest='delta_max_interval', type=float, default=5, help='seconds between two Delta Max params messages (default: 5)')
+    parser.add_argument('--commands', type=float, default=1, help='set commands per second sent by the bridge to random devices (default: 1)')
+    parser.add_argument('--duration', type=float, default=60, help='measuring time in seconds after the warmup (default: 60)')
+    parser.add_argument('--warmup', type=float, default=10, help='seconds before the measurement starts (default: 10)')
+    parser.add_argument('--wildcard', action='store_true', help='use the account wide wildcard subscriptions')
+    args = parser.parse_args()
+
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.WARNING)
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+    install()
+
+    broker = LocalBroker()
+    client = create_client(broker, args.wildcard)
+    started = time.perf_counter()
+    fleet = []
+    devices = []
+    try:
+        fleet = create_fleet(broker, args)
+        devices = create_bridge_devices(fleet)
+        print("created %d virtual devices and %d bridge devices in %.1f seconds" % (len(fleet), len(devices), time.perf_counter() - started))
+        threading.Thread(target=client.start, name="mqtt", daemon=True).start()
+        futures = []
+        command_task = get_scheduler().call_every(1 / args.commands, send_command, devices, futures) if args.commands > 0 and devices else None
+
+        time.sleep(args.warmup)
+        published = broker.published
+        handled = client.ingest_queue.handled
+        coalesced = client.ingest_queue.coalesced
+        del client.latencies[:]
+        client.handling_cpu.clear()
+        futures.clear()
+        cpu = cpu_time()
+        time.sleep(args.duration)
+        cpu = cpu_time() - cpu
+        published = broker.published - published
+        handled = client.ingest_queue.handled - handled
+        coalesced = client.ingest_queue.coalesced - coalesced
+        latencies = sorted(client.latencies)
+        if command_task is not None:
+            command_task.cancel()
+    finally:
+        for device in devices:
+            device.stop()
+        for device in fleet:
+            device.stop()
+        client.stop()
+        broker.stop()
+
+    print("fleet: %d msgs/sec published, bridge: %d msgs/sec handled, %d msgs/sec coalesced in the ingest queue, %d msgs in the broker queue at the end" % (
+        published / args.duration, handled / args.duration, coalesced / args.duration, broker.depth()))
+    print("latency publish -> handled: median %.1f ms, p90 %.1f ms, p99 %.1f ms, max %.1f ms" % (
+        percentile(latencies, 0.5) * 1000, percentile(latencies, 0.9) * 1000, percentile(latencies, 0.99) * 1000, percentile(latencies, 1) * 1000))
+    print("cpu: %.1f %% of one core for the fleet and the bridge, %.1f µs/sec per device" % (
+        cpu / args.duration * 100, cpu / args.duration / max(1, len(fleet)) * 1e6))
+    counts = {}
+    for device in fleet:
+        counts[type(device).__name__] = counts.get(type(device).__name__, 0) + 1
+    for device_type, count in counts.items():
+        print("  bridge handling %-20s %7.1f µs/sec per device" % (device_type, client.handling_cpu.get(device_type, 0) / args.duration / count * 1e6))
+    rtts = sorted(future.result() for future in futures if future.done() and not future.cancelled() and future.exception() is None)
+    if futures:
+        print("set commands: %d sent, %d acknowledged, round trip median %.1f ms, p90 %.1f ms" % (
+            len(futures), len(rtts), percentile(rtts, 0.5) * 1000, percentile(rtts, 0.9) * 1000))
+
+
+if __name__ == '__main__':
+    main()
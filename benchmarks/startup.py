@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Measures the startup time and the memory (RSS) of the bridge for a number of devices.
+# Every count runs in a separate process with the stub Ecoflow client and the stub Homie
+# transport, the devices are created round robin from the selected types.
+
+import argparse
+import functools
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+
+DEVICE_TYPES = ["powerstream", "smartplug", "delta-max"]
+
+
+def get_rss():
+    # current resident set size in bytes
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # peak instead of current size (kilobytes on linux, bytes on macOS)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run_child(count, types, workers):
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.WARNING)
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+
+    started = time.perf_counter()
+    from stubs import install
+    install()
+    from pipeline import create_device
+    imported = time.perf_counter()
+    rss_imported = get_rss()
+
+    devices = []
+    try:
+        if workers > 0:
+            # as in index.py, with a pool of worker threads
+            from model.utils.device_init import DeviceInitializer
+            initializer = DeviceInitializer(workers=workers)
+            devices = initializer.devices
+            initializer.start([functools.partial(create_device, types[index % len(types)], "%s%06d" % (types[index % len(types)].upper()[:2], index))
+                               for index in range(count)])
+            initializer.wait()
+        else:
+            for index in range(count):
+                type = types[index % len(types)]
+                devices.append(create_device(type, "%s%06d" % (type.upper()[:2], index)))
+        created = time.perf_counter()
+        rss_created = get_rss()
+    finally:
+        for device in devices:
+            device.stop()
+    print(json.dumps({
+        "import": imported - started,
+        "create": created - imported,
+        "rss_imported": rss_imported,
+        "rss_created": rss_created
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure startup time and memory for a number of devices.')
+    parser.add_argument('-n', dest='counts', type=int, action='append', help='number of devices (can be repeated, default: 1, 100, 1000)')
+    parser.add_argument('--type', dest='types', action='append', choices=DEVICE_TYPES, help='device type (can be repeated, default: all)')
+    parser.add_argument('--workers', type=int, default=0, help='create the devices with this many worker threads (default: 0 = one after another)')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    types = args.types if args.types else DEVICE_TYPES
+
+    if args.child is not None:
+        run_child(args.child, types, args.workers)
+        return
+
+    for count in args.counts if args.counts else [1, 100, 1000]:
+        command = [sys.executable, os.path.realpath(__file__), "--child", str(count), "--workers", str(args.workers)]
+        for type in types:
+            command += ["--type", type]
+        result = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout.splitlines()[-1])
+        print("%5d devices: import %6.2f s, create %7.2f s (%6.2f ms/device), rss %6.1f MB after import, %7.1f MB with devices (%6.1f kB/device)" % (
+            count, result["import"], result["create"], result["create"] / count * 1000,
+            result["rss_imported"] / 1e6, result["rss_created"] / 1e6,
+            (result["rss_created"] - result["rss_imported"]) / count / 1e3))
+
+
+if __name__ == '__main__':
+    main()
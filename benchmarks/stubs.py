@@ -0,0 +1,68 @@
+# Network free stand-ins for the Ecoflow MQTT client and the Homie MQTT transport.
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+import homie.device_base as device_base
+import model.ecoflow.mqtt_client as mqtt_client
+import model.utils.warm_state as warm_state
+from model.ecoflow.commands import CommandTracker
+from model.utils.settings import Settings
+
+CONFIG_FOLDER = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "configs")
+
+
+class StubClient:
+    connected = False
+    wildcard_subscriptions = False
+
+    def __init__(self):
+        self.commands = CommandTracker(self)
+
+    def subscribe(self, topic, device, qos=1):
+        pass
+
+    def publish(self, topic, data):
+        pass
+
+    def request_device_data(self, device):
+        pass
+
+
+class StubHomieClient:
+    # replaces the paho client of a homie device, publishes are only counted
+    mqtt_connected = True
+
+    def __init__(self, device):
+        self.device = device
+        self.published = 0
+        self.published_bytes = 0
+
+    def publish(self, topic, payload, retain=True, qos=1):
+        self.published += 1
+        self.published_bytes += len(str(payload))
+
+    def subscribe(self, topic, qos=0):
+        pass
+
+    def unsubscribe(self, topic):
+        pass
+
+    def get_mac_ip_address(self):
+        return "00:00:00:00:00:00", "127.0.0.1"
+
+
+def install(homie=True, config_folder=CONFIG_FOLDER):
+    # must be called before any device is created
+    Settings.set("args", argparse.Namespace(config_folder=config_folder))
+    mqtt_client.ecoflow_client = StubClient()
+    # the devices start without the values of a previous run and nothing is saved
+    warm_state.warm_state = warm_state.WarmState(interval=0)
+    if homie:
+        os.environ["HOMIE_MQTT"] = "stub"
+        device_base.connect_mqtt_client = lambda device, mqtt_settings: StubHomieClient(device)
+    else:
+        os.environ.pop("HOMIE_MQTT", None)
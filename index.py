@@ -3,20 +3,21 @@
 import json
 import logging
 
-import curses
 import argparse
+import functools
 import os
-from dotenv import load_dotenv
-
-from model.ecoflow.auth import EcoflowAuthentication
-from model.ecoflow.mqtt_client import init_client, get_client
-from model.ecoflow.powerstream import Ecoflow_Powerstream
-from model.ecoflow.smart_plug import Ecoflow_Smartplug, Simulated_Ecoflow_Smartplug
-from model.ecoflow.delta_max import Ecoflow_DeltaMax
-from model.utils.message_logger import MessageLogger
+from contextlib import nullcontext
+
 from model.utils.settings import Settings
+from model.utils.startup_profile import StartupProfile
+
+# the model modules are imported in main() after the profiler has been installed, device
+# modules (and their protos) only if a configured device needs them
+profile = StartupProfile()
+profile.install()
 
 if os.getenv("IN_DOCKER") != "1":
+    from dotenv import load_dotenv
     load_dotenv()
 
 _LOGGER = logging.getLogger(__name__)
@@ -30,11 +31,21 @@ parser.add_argument('--log-folder', dest='log_folder', default=os.getenv("EF_LOG
                     help='Folder for log files.')
 parser.add_argument('--config-folder', dest='config_folder', default=os.getenv("EF_CONFIG_FOLDER") if os.getenv("EF_CONFIG_FOLDER") is not None else "./configs",
                     help='Folder for log files.')
+parser.add_argument('--control-socket', dest='control_socket', default=os.getenv("EF_CONTROL_SOCKET"),
+                    help='Unix socket that returns a snapshot of the current device states to every client that connects.')
+parser.add_argument('--capture', dest='capture_file', default=os.getenv("EF_CAPTURE_FILE"),
+                    help='Append all received messages to this file (can be replayed with benchmarks/replay.py).')
+parser.add_argument('--profile-startup', dest='profile_startup', action='store_true', default=os.getenv("EF_PROFILE_STARTUP") == "1",
+                    help='Log the import time of every module and the construction time of every device.')
 
 args = parser.parse_args()
 Settings.set("args", args) 
 running = False
 
+if not args.profile_startup:
+    profile.uninstall()
+    profile = None
+
 handlers=[logging.StreamHandler()]
 if args.ncurses_show is not None:
     handlers = [logging.FileHandler(os.path.join(args.log_folder, "ecoflow-bridge.log"))]
@@ -43,8 +54,20 @@ if args.ncurses_show is not None:
 logging.basicConfig(level=logging.INFO, handlers=handlers,
                     format='%(asctime)s - %(name)s - %(threadName)s -  %(levelname)s - %(message)s') 
 
+def measure(kind, name):
+    return profile.measure(kind, name) if profile is not None else nullcontext()
+
 def main(stdscr=None):
     global args
+    from model.ecoflow.auth import EcoflowAuthentication
+    from model.ecoflow.mqtt_client import init_client, get_client
+    from model.ecoflow.registry import get_device_class
+    from model.utils.message_logger import MessageLogger
+    from model.utils.snapshot import StateSnapshot
+    from model.utils.scheduler import get_scheduler
+    from model.utils.warm_state import get_warm_state
+    from model.utils.device_init import DeviceInitializer
+
     user = os.getenv("EF_USERNAME")
     passwd = os.getenv("EF_PASSWORD")
    
@@ -54,54 +77,86 @@ def main(stdscr=None):
             config = json.load(c)
         _LOGGER.info("start authorizing")
         auth = EcoflowAuthentication(user, passwd)
-        auth.authorize()
+        with measure("step", "authorization"):
+            auth.authorize()
         init_client(auth)
+        if args.capture_file is not None:
+            get_client().set_capture(args.capture_file)
         _LOGGER.info('init devices')
 
         message_logger = None
-        clients = []
+        snapshot = None
+        # the ncurses console is filled in the order of the devices
+        initializer = DeviceInitializer(workers=1) if args.ncurses_show is not None else DeviceInitializer()
+        clients = initializer.devices
         if args.raw_log_mode != "none":
             message_logger = MessageLogger(args.raw_log_mode, args.log_folder)
 
+        def create_device(device_class, device):
+            with measure("device", f"{device['type']} {device['serial']}"):
+                client = device_class(device["serial"], auth.user_id, stdscr=stdscr if args.ncurses_show is None or args.ncurses_show == device["serial"] else None)
+            _LOGGER.info(f"{device['type']} has been created.")
+            if message_logger is not None:
+                client.set_message_logger(message_logger)
+            return client
+
+        def devices_ready(devices):
+            get_client().devices_ready(len(devices))
+            # last values of the devices for the next start
+            get_warm_state().start(devices)
+            if profile is not None:
+                profile.report()
+
         try:
+            factories = []
             for device in config["devices"]:
-                client = None
                 if "disabled" in device and device["disabled"] == True:
                     continue
-                if device["type"] == "powerstream":
-                    client = Ecoflow_Powerstream(device["serial"], auth.user_id, stdscr=stdscr if args.ncurses_show is None or args.ncurses_show == device["serial"] else None)
-                elif device["type"] == "smart-plug":
-                    if "simulated" in device and device["simulated"] is True:
-                        client = Simulated_Ecoflow_Smartplug(device["serial"], auth.user_id, stdscr=stdscr if args.ncurses_show is None or args.ncurses_show == device["serial"] else None)
-                    else:
-                        client = Ecoflow_Smartplug(device["serial"], auth.user_id, stdscr=stdscr if args.ncurses_show is None or args.ncurses_show == device["serial"] else None)
-                elif device["type"] == "delta-max":
-                    client = Ecoflow_DeltaMax(device["serial"], auth.user_id, stdscr=stdscr if args.ncurses_show is None or args.ncurses_show == device["serial"] else None)
+                # the device modules are imported here, the devices are created by the initializer
+                device_class = get_device_class(device["type"], simulated="simulated" in device and device["simulated"] is True)
+                if device_class is not None:
+                    factories.append(functools.partial(create_device, device_class, device))
                 else:
                     _LOGGER.error("unsupported device type: %s" % device["type"])
-
-                if client is not None:
-                    _LOGGER.info(f"{device['type']} has been created.")
-                    clients.append(client)
-                    if message_logger is not None:
-                        client.set_message_logger(message_logger)
-            # start run loop
+            initializer.start(factories, on_done=devices_ready)
+            # state snapshot on demand (SIGUSR1 or control socket)
+            snapshot = StateSnapshot(clients, args.log_folder, client=get_client())
+            snapshot.install_signal_handler()
+            if args.control_socket is not None:
+                snapshot.start_control_socket(args.control_socket)
+            if profile is not None:
+                profile.uninstall()
+            # start run loop, the devices subscribe and request their data once they are ready
             get_client().start()
 
         except KeyboardInterrupt:
+            initializer.stop()
             for client in clients:
                 client.stop()
+            get_warm_state().stop()
+            if snapshot is not None:
+                snapshot.stop()
+            get_scheduler().stop()
             _LOGGER.info('STOPPED')
 
         except Exception as e:
+            initializer.stop()
             for client in clients:
                 client.stop()
             raise e
+
+        finally:
+            # the buffered messages are written also if the bridge stops because of an error
+            if get_client().capture is not None:
+                get_client().capture.close()
+            if message_logger is not None:
+                message_logger.stop()
     else:
         _LOGGER.error("no credentials provided")
 
 if __name__ == '__main__':
     if args.ncurses_show is not None:
+        import curses
         curses.wrapper(main)
     else:
         main()
\ No newline at end of file
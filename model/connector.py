@@ -1,19 +1,30 @@
-import json
 import os
-import curses
+import logging
+import time
 
 from model.homie.device import Proto_Device, Json_Device
-import model.protos.options_pb2 as options
+from model.field_plan import FieldPlan, get_message_plan
+from model.utils.change_filter import ChangeFilter
 from model.utils.event_emitter import EventEmitter
 from model.utils.settings import Settings
+from model.value_store import ValueStore, get_layout
+from model.ecoflow.registry import load_config
+
+_LOGGER = logging.getLogger(__name__)
+
+# log the publish statistics every 15 minutes
+STATS_REPORT_INTERVAL = 900
 
 class Connector(EventEmitter):
     def __init__(self, serial, type, name=None, screen=None):
         EventEmitter.__init__(self)
         self.serial = serial
-        self.units = {}
         self.screen = screen
         self.sums = {}
+        # field name -> names of the derived fields that use it
+        self.derived_index = {}
+        # derived fields that need to be recalculated in end_update
+        self.dirty_sums = {}
         self.start_x = 0
         self.start_y = 0
         self._start = [-1, -1, -1]
@@ -24,6 +35,13 @@ class Connector(EventEmitter):
 
         self.proto_message = None
         self.device_config = None
+        self.homie_device = None
+        # current values, shared with the device and the homie properties
+        self.values = ValueStore(get_layout(type))
+
+        # values that have already been published to homie
+        self.change_filter = ChangeFilter(self.values.layout, max_silence=int(os.getenv("HOMIE_MAX_SILENCE")) if os.getenv("HOMIE_MAX_SILENCE") is not None else 300)
+        self.last_stats_report = time.monotonic()
 
         self.mqtt_settings = {
             "MQTT_BROKER": os.getenv("HOMIE_MQTT"),
@@ -38,37 +56,55 @@ class Connector(EventEmitter):
             curses_file = os.path.join(Settings.arg("config_folder"), "ncurses.json")
             self.screen_settings = {}
             if os.path.exists(curses_file):
-                with open(curses_file) as f:
-                    ncurses_config = json.load(f)
-                    if type in ncurses_config:
-                        self.screen_settings = ncurses_config[type]
-                        self.start_x = self.col_width*2
+                ncurses_config = load_config(curses_file)
+                if type in ncurses_config:
+                    # the screen settings are extended per device
+                    self.screen_settings = dict(ncurses_config[type])
+                    self.start_x = self.col_width*2
                         
         except Exception as err:
             raise
 
     def set_proto_message(self, message):
         self.proto_message = message
-        for derived_field in self.proto_message.DESCRIPTOR.GetOptions().Extensions[options.derived_field]:
+        self.add_proto_message(message)
+        for derived_field in get_message_plan(message.DESCRIPTOR).derived_fields:
             if not hasattr(derived_field, "operator") or getattr(derived_field, "operator") == 0:
-                self.sums[derived_field.field_name] = derived_field
+                self.add_sum(derived_field.field_name, derived_field)
         self.init_homie_device()
 
+    def add_proto_message(self, message):
+        # reserve the value slots for all fields of the message
+        self.values.layout.add_message_plan(get_message_plan(message.DESCRIPTOR))
+
     def set_device_config(self, config):
         self.device_config = config
+        self.values.layout.add_device_config(config)
         if "derived_fields" in config:
             for derived_field in config["derived_fields"]:
                 if "operator" not in derived_field or derived_field["operator"] == 0:
-                    self.sums[derived_field["field_name"]] = derived_field
+                    self.add_sum(derived_field["field_name"], derived_field)
         self.init_homie_device()
 
+    def add_sum(self, sum_name, derived_field):
+        self.sums[sum_name] = derived_field
+        for name in self.get_derived_option(derived_field, "fields"):
+            if name not in self.derived_index:
+                self.derived_index[name] = []
+            self.derived_index[name].append(sum_name)
+
+    def get_derived_option(self, derived_field, option):
+        if type(derived_field) == dict:
+            return derived_field[option] if option in derived_field else None
+        return getattr(derived_field, option)
+
     def init_homie_device(self):
         if self.mqtt_settings["MQTT_BROKER"] is not None:
             if self.proto_message is not None:
-                self.homie_device = Proto_Device(self.proto_message, device_id=self.serial.lower(), name=self.name, mqtt_settings=self.mqtt_settings)
+                self.homie_device = Proto_Device(self.proto_message, device_id=self.serial.lower(), name=self.name, mqtt_settings=self.mqtt_settings, values=self.values)
                 self.homie_device.on("set_request", self.on_set_request)
             elif self.device_config is not None:
-                self.homie_device = Json_Device(self.device_config, device_id=self.serial.lower(), name=self.name, mqtt_settings=self.mqtt_settings)
+                self.homie_device = Json_Device(self.device_config, device_id=self.serial.lower(), name=self.name, mqtt_settings=self.mqtt_settings, values=self.values)
                 self.homie_device.on("set_request", self.on_set_request)
         else:
             self.homie_device = None
@@ -81,30 +117,37 @@ class Connector(EventEmitter):
         # just forward this event
         self.emit("set_request", id, value)
 
-    def update_homie(self, value, descriptor=None, node_name=None, id=None, name=None):
-        if self.homie_device is not None:
+    def update_homie(self, slot, value, descriptor=None, node_name=None, id=None, name=None):
+        if self.homie_device is not None and self.should_publish(slot, value, descriptor=descriptor):
             self.homie_device.update(value, descriptor=descriptor, node_name=node_name, id=id, name=name)
 
+    def should_publish(self, slot, value, descriptor=None):
+        if type(descriptor) == FieldPlan:
+            return self.change_filter.should_publish(slot, value, deadband=descriptor.deadband,
+                                                     relative_deadband=descriptor.relative_deadband, max_silence=descriptor.max_silence)
+        elif type(descriptor) == dict:
+            return self.change_filter.should_publish(slot, value,
+                                                     deadband=descriptor["deadband"] if "deadband" in descriptor else 0,
+                                                     relative_deadband=descriptor["relative_deadband"] if "relative_deadband" in descriptor else 0,
+                                                     max_silence=descriptor["max_silence"] if "max_silence" in descriptor else None)
+        return self.change_filter.should_publish(slot, value)
+
     def close(self):
         if self.homie_device:
             self.homie_device.close()
 
-    def __getattr__(self, name: str):
-        if f"_{name}" in self.__dict__:
-            return self.__dict__[f"_{name}"]
-        return None
-
-    def __setattr__(self, name, value):
-        self.__dict__[f"_{name}"] = value
+    def get_value(self, name: str, default=None):
+        return self.values.get_value(name, default)
 
     def set_unit(self, name: str, unit: str):
-        self.units[name] = unit
+        self.values.layout.units[name] = unit
 
     def get_unit(self, name: str):
-        return self.units[name] if name in self.units else None
+        return self.values.layout.units.get(name)
     
-    def value_string(self, name: str):
-        value = getattr(self, name)
+    def value_string(self, name: str, value=None):
+        if value is None:
+            value = self.get_value(name)
         unit = self.get_unit(name)
         if unit is not None:
             value = "%s %s" % (value, unit)
@@ -113,6 +156,10 @@ class Connector(EventEmitter):
     def update_status(self, status: int):
         if self.homie_device is not None:
             self.homie_device.update_status(status)
+
+    def set_restored(self, last_seen: float = None):
+        if self.homie_device is not None:
+            self.homie_device.set_restored(last_seen)
     
     def update(self, descriptor, value, unit=None, display_value=None):
         name = None
@@ -127,40 +174,46 @@ class Connector(EventEmitter):
                 node_name = descriptor["node"]
         else:
             name = descriptor.name
-        setattr(self, name, value)
+        slot = self.values.layout.slot(descriptor)
+        self.values.set(slot, value)
         if unit is not None:
             self.set_unit(name, unit)
         
-        self.update_screen(name, display_value=display_value, node_name=node_name)
+        self.update_screen(name, display_value=display_value, node_name=node_name, value=value)
 
-        for sum_name in self.sums.keys():
-            if name in getattr(self.sums[sum_name], "fields"):
-                self.update_sum(sum_name)
+        # derived fields are calculated once per update cycle in end_update
+        sum_names = descriptor.derived_fields if type(descriptor) == FieldPlan else self.derived_index.get(name)
+        if sum_names:
+            for sum_name in sum_names:
+                self.dirty_sums[sum_name] = True
 
         if update_homie:
-            self.update_homie(value, descriptor=descriptor) 
+            self.update_homie(slot, value, descriptor=descriptor)
 
     def update_sum(self, sum_name):
         sum = 0
         unit = None
         derived_field = self.sums[sum_name]
-        for name in getattr(derived_field, "fields"):
-            val = getattr(self, name)
+        for name in self.get_derived_option(derived_field, "fields"):
+            val = self.get_value(name)
             if val is None:
                 continue
             sum += val
             if unit is None:
                 unit = self.get_unit(name)
         value = round(sum, 1)
-        setattr(self, sum_name, value)
+        slot = self.values.layout.slot(sum_name)
+        self.values.set(slot, value)
         if unit is not None:
-            self.set_unit(name, unit)
-        self.update_homie(value, name=sum_name, node_name=getattr(derived_field, "node"))
+            self.set_unit(sum_name, unit)
+        self.update_homie(slot, value, name=sum_name, node_name=self.get_derived_option(derived_field, "node"))
 
         self.update_screen(sum_name)
         
-    def update_screen(self, name, display_value=None, node_name=None):
+    def update_screen(self, name, display_value=None, node_name=None, value=None):
         if self.screen is not None:
+            # only needed for the ncurses console (--show)
+            import curses
             if not self.fixed_screen and name not in self.screen_settings and self.show_value(name):
                 # find a free spot                
                 if self.start_y+1 >= curses.LINES-1:
@@ -179,7 +232,7 @@ class Connector(EventEmitter):
                 display_name = "%s.%s" % (node_name, name)
             if display_name in self.screen_settings:
                 settings = self.screen_settings[display_name]
-                self.screen.addstr(settings["y"], settings["x"], "%s: %s     " % (settings["name"], display_value if display_value is not None else self.value_string(name)))
+                self.screen.addstr(settings["y"], settings["x"], "%s: %s     " % (settings["name"], display_value if display_value is not None else self.value_string(name, value)))
 
     def init_screen(self, names: list, prefixes=None):
         if self.screen is None:
@@ -212,6 +265,7 @@ class Connector(EventEmitter):
             return self.show_filter(name)
 
     def get_next_spot(self, column=None):
+        import curses
         if column is None:
             # find first spot in any free column
             column = 1
@@ -233,5 +287,16 @@ class Connector(EventEmitter):
         return column, self._start[column]
         
     def end_update(self):
+        if self.dirty_sums:
+            for sum_name in self.dirty_sums:
+                if sum_name in self.sums:
+                    self.update_sum(sum_name)
+            self.dirty_sums.clear()
+        if self.homie_device is not None:
+            self.homie_device.end_update()
         if self.screen is not None:
-            self.screen.refresh()
\ No newline at end of file
+            self.screen.refresh()
+        now = time.monotonic()
+        if now - self.last_stats_report >= STATS_REPORT_INTERVAL:
+            self.last_stats_report = now
+            _LOGGER.info(f"{self.serial} homie publish statistics: {self.change_filter.stats()}")
\ No newline at end of file
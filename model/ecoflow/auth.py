@@ -1,12 +1,32 @@
 import base64
-import requests
 import uuid
 import json
 import logging
+import os
+import time
 
 _LOGGER = logging.getLogger(__name__)
 _LOGGER.setLevel(logging.INFO)
 
+# the MQTT credentials are kept in this file and reused for this many seconds (0 = no cache),
+# an outdated cache is only detected when the MQTT server rejects the credentials
+AUTH_CACHE_FILE = os.getenv("EF_AUTH_CACHE_FILE") if os.getenv("EF_AUTH_CACHE_FILE") is not None else os.path.join(os.path.expanduser("~"), ".cache", "ecoflow-bridge", "auth.json")
+AUTH_CACHE_TTL = float(os.getenv("EF_AUTH_CACHE_TTL")) if os.getenv("EF_AUTH_CACHE_TTL") is not None else 7 * 86400
+# timeout of each call of the Ecoflow API (seconds)
+AUTH_TIMEOUT = float(os.getenv("EF_AUTH_TIMEOUT")) if os.getenv("EF_AUTH_TIMEOUT") is not None else 10
+
+# one connection pool for all calls of the Ecoflow API
+_session = None
+
+
+def get_session():
+    global _session
+    if _session is None:
+        # imported on demand, a start with cached credentials does not need it
+        import requests
+        _session = requests.Session()
+    return _session
+
 class EcoflowException(Exception):
     def __init__(self, *args, **kwargs):
         super().__init__(args, kwargs)
@@ -23,8 +43,21 @@ class EcoflowAuthentication:
         self.mqtt_username = None
         self.mqtt_password = None
         self.client_id = None
-
-    def authorize(self):
+        # True if the MQTT credentials have been read from the cache file
+        self.from_cache = False
+        # duration of the last authorize call (seconds)
+        self.authorize_time = None
+
+    def authorize(self, use_cache: bool = True):
+        started = time.monotonic()
+        if not use_cache or not self.load_cache():
+            self.login()
+            self.save_cache()
+        if self.client_id is None:
+            self.client_id = f"ANDROID_{str(uuid.uuid4()).upper()}_{self.user_id}"
+        self.authorize_time = time.monotonic() - started
+
+    def login(self):
         url = "https://api.ecoflow.com/auth/login"
         headers = {"lang": "en_US", "content-type": "application/json"}
         data = {"email": self.ecoflow_username,
@@ -33,7 +66,7 @@ class EcoflowAuthentication:
                 "userType": "ECOFLOW"}
 
         _LOGGER.info(f"Login to EcoFlow API {url}")
-        request = requests.post(url, json=data, headers=headers)
+        request = get_session().post(url, json=data, headers=headers, timeout=AUTH_TIMEOUT)
         response = self.get_json_response(request)
 
         try:
@@ -51,7 +84,7 @@ class EcoflowAuthentication:
         data = {"userId": self.user_id}
 
         _LOGGER.info(f"Requesting IoT MQTT credentials {url}")
-        request = requests.get(url, data=data, headers=headers)
+        request = get_session().get(url, data=data, headers=headers, timeout=AUTH_TIMEOUT)
         response = self.get_json_response(request)
 
         try:
@@ -64,7 +97,61 @@ class EcoflowAuthentication:
 
         _LOGGER.info(f"Successfully extracted account: {self.mqtt_username}")
         _LOGGER.debug(response["data"])
-        self.client_id = f"ANDROID_{str(uuid.uuid4()).upper()}_{self.user_id}"
+        self.from_cache = False
+
+    def load_cache(self) -> bool:
+        if AUTH_CACHE_TTL <= 0:
+            return False
+        try:
+            with open(AUTH_CACHE_FILE) as f:
+                cache = json.load(f)
+            if cache["username"] != self.ecoflow_username or time.time() - cache["created"] > AUTH_CACHE_TTL:
+                return False
+            self.user_id = cache["user_id"]
+            self.mqtt_url = cache["mqtt_url"]
+            self.mqtt_port = int(cache["mqtt_port"])
+            self.mqtt_username = cache["mqtt_username"]
+            self.mqtt_password = cache["mqtt_password"]
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            _LOGGER.warning(f"ignoring invalid credential cache {AUTH_CACHE_FILE}: {err}")
+            return False
+        _LOGGER.info(f"Using cached MQTT credentials of account: {self.mqtt_username}")
+        self.from_cache = True
+        return True
+
+    def save_cache(self):
+        if AUTH_CACHE_TTL <= 0:
+            return
+        cache = {
+            "username": self.ecoflow_username,
+            "created": time.time(),
+            "user_id": self.user_id,
+            "mqtt_url": self.mqtt_url,
+            "mqtt_port": self.mqtt_port,
+            "mqtt_username": self.mqtt_username,
+            "mqtt_password": self.mqtt_password
+        }
+        try:
+            os.makedirs(os.path.dirname(AUTH_CACHE_FILE) or ".", mode=0o700, exist_ok=True)
+            # only readable by the owner, written to a new file that replaces the old one
+            temp_file = f"{AUTH_CACHE_FILE}.tmp"
+            fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(cache, f)
+            os.chmod(temp_file, 0o600)
+            os.replace(temp_file, AUTH_CACHE_FILE)
+        except OSError as err:
+            _LOGGER.warning(f"writing the credential cache {AUTH_CACHE_FILE} failed: {err}")
+
+    def invalidate_cache(self):
+        try:
+            os.unlink(AUTH_CACHE_FILE)
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            _LOGGER.warning(f"removing the credential cache {AUTH_CACHE_FILE} failed: {err}")
 
     def get_json_response(self, request):
         if request.status_code != 200:
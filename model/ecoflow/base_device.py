@@ -1,72 +1,74 @@
 import logging
 import json
 import re
-import model.protos.platform_pb2 as platform
 import model.protos.powerstream_pb2 as powerstream
-import model.protos.wn511_socket_sys_pb2 as wn511
-import model.protos.options_pb2 as options
-import math
 from typing import Dict
-from model.ecoflow.mqtt_client import get_client
+from model.ecoflow.mqtt_client import get_client, FLEET
+from model.field_plan import get_message_plan
 from model.utils.message_logger import MessageLogger
 from model.ecoflow.constant import *
-import random
+from model.ecoflow.registry import get_pdata_message
+from model.ecoflow.commands import next_seq
+from model.ecoflow.coalescer import SetCommandCoalescer
+from model.ecoflow.encoder import HeaderEncoder
+from model.ecoflow.payload import classify_payload, scan_headers, HeaderInfo, PAYLOAD_JSON, PAYLOAD_PROTO
+from model.utils.warm_state import get_warm_state
+from google.protobuf.message import DecodeError
 import datetime
-import pprint
-from model.utils.interval import InvervalTimer
+import time
 
 _LOGGER = logging.getLogger(__name__)
 
+# device class -> name -> settings detected from the name
+_param_settings = {}
+# types of the values that are saved for the next run
+SAVED_VALUE_TYPES = (bool, int, float, str, list, dict)
+# header of the protobuf data requests, the same for all devices (no cmd_func, cmd_id or device_sn)
+_DATA_REQUEST_ENCODER = HeaderEncoder({"from": "Android", "src": DEFAULT_SRC, "dest": DEFAULT_DEST})
+
 class EcoflowDevice:
     def __init__(self, serial: str, user_id=str, stdscr=None, is_simulated : bool = False, uses_protobuf = False):
         self.screen = stdscr
         self.client = get_client()
         self.device_sn = serial
-        self._param_settings_cache = {}
-        self._properties: Dict[str, any] = {}
+        self.user_id = user_id
         self.is_simulated = is_simulated
+        self.stopped = False
         self._last_heartbeat_time: datetime.datetime = None
         self.uses_protobuf = uses_protobuf
+        self.decode_stats = {
+            PAYLOAD_JSON: 0,
+            PAYLOAD_PROTO: 0,
+            "misclassified": 0,
+            # protobuf messages (and their size) that have not been decoded,
+            # because they belong to another device or nobody handles them
+            "skipped_messages": 0,
+            "skipped_bytes": 0
+        }
+        # time of the last received message (seconds since epoch)
+        self.last_seen = None
+        # last_seen of the state restored from the previous run, None once the device has sent something
+        self.restored_at = None
+        # values that are only valid on the day they have been received (e.g. energy of today)
+        self.daily_values = set()
+        # "cmd_func-cmd_id" -> number of received messages without handler
+        self.unhandled_cmd_ids = {}
         self.default_cmd_func = CmdFuncs.DEFAULT
 
-        self.pp = pprint.PrettyPrinter(indent=4)
-
         self.connector = None
 
         self.message_logger: MessageLogger = None
 
         self.handlers = {}
-        self.pdata_messages = {
-            CmdFuncs.SMART_PLUG: {
-                CmdIds.PLUG_HEARTBEAT: wn511.plug_heartbeat_pack(),
-                CmdIds.TIME_TASK_CONFIG: wn511.time_task_config_post(),
-                CmdIds.SET_PLUG_SWITCH: wn511.plug_switch_message(),
-                CmdIds.SET_PLUG_BRIGHTNESS: wn511.brightness_pack(),
-                CmdIds.SET_UNKNOWN_135: powerstream.SetValue(),
-                CmdIds.SET_MAX_WATTS: wn511.max_watts_pack(),
-                CmdIds.SET_MESH_ENABLE: wn511.mesh_ctrl_pack(),
-                CmdIds.PLUG_POWER_PACK: wn511.PowerPack(),
-                CmdIds.INCLUDE_PLUG: wn511.include_plug()
-            },
-            CmdFuncs.POWERSTREAM: {
-                CmdIds.HEARTBEAT: powerstream.InverterHeartbeat(),
-                CmdIds.HEARTBEAT2: powerstream.InverterHeartbeat2(),
-                CmdIds.SET_PERMANENT_WATTS: wn511.permanent_watts_pack(),
-                CmdIds.SET_SUPPLY_PRIORITY: powerstream.SetValue(),
-                CmdIds.SET_BAT_LOWER: wn511.bat_lower_pack(),
-                CmdIds.SET_BAT_UPPER: wn511.bat_upper_pack(),
-                CmdIds.SET_PLUG_BRIGHTNESS: wn511.brightness_pack(),
-                CmdIds.SET_UNKNOWN_136: powerstream.SetValue(),
-                CmdIds.SET_UNKNOWN_138: powerstream.SetValue(),
-            },
-            32: {
-                11: powerstream.SetValue(),
-            },
-            CmdFuncs.REPORTS: {
-                16: platform.EventRecordReport(),
-                CmdIds.ENERGY_TOTAL_REPORT: platform.BatchEnergyTotalReport()
-            }
-        }   
+        # (cmd_func, cmd_id) of state messages without repeated fields, if they queue up they are
+        # merged into one message (see merge_payloads), they may contain only the changed fields
+        self.coalesce_cmd_ids = set()
+        # set requests are coalesced per setting, set_state_names maps the id of a settable
+        # property to the value that holds the confirmed state (to drop no-op commands)
+        self.set_coalescer = SetCommandCoalescer()
+        self.set_state_names = {}
+        # (cmd_func, cmd_id) -> HeaderEncoder of the messages sent by this device
+        self._encoders = {}
 
         self._data_topic = f"/app/device/property/{self.device_sn}"
         self._status_topic = f"/app/device/status/{self.device_sn}"
@@ -76,16 +78,18 @@ class EcoflowDevice:
         self._get_topic = f"/app/{user_id}/{self.device_sn}/thing/property/get"
         self._get_reply_topic = f"/app/{user_id}/{self.device_sn}/thing/property/get_reply"
         self._all_topics = f"/app/{user_id}/{self.device_sn}/#"
-
-        self.init_subscriptions()
-
-        self._timer = InvervalTimer(120, self.check_connection)
-        self._timer.start()
+        # the subclass subscribes once it is constructed (handlers registered, state restored),
+        # see init_subscriptions
 
     def get_param_settings(self, name):
-        if name not in self._param_settings_cache:
-            self._param_settings_cache[name] = self.detect_param_settings(name)
-        return self._param_settings_cache[name]
+        # the settings only depend on the device class and the name, they are shared by all devices
+        cache = _param_settings.get(type(self))
+        if cache is None:
+            cache = _param_settings.setdefault(type(self), {})
+        settings = cache.get(name)
+        if settings is None:
+            settings = cache[name] = self.detect_param_settings(name)
+        return settings
                     
     def detect_param_settings(self, name) -> dict:
         raw_unit = re.sub(r"([A-Z])", r" \1", name).split()[-1].lower()
@@ -118,42 +122,20 @@ class EcoflowDevice:
             "converter": converter
         }
     
-    def check_connection(self):
-        refresh = False
-        _LOGGER.debug('checking last heatbeat time')
-        if self._last_heartbeat_time is None:
-            refresh = True
-        else:
-            delta = datetime.datetime.now() - self._last_heartbeat_time
-            refresh = delta.total_seconds() > 120
-            _LOGGER.debug('last heartbeat is %s minutes old' % (delta.total_seconds() / 60))
-        if refresh:
-            _LOGGER.info('last heartbeat outdated, requesting new one')
-            self.request_data()
-
     def stop(self):
-        self._timer.cancel()
+        # no more data requests for this device
+        self.stopped = True
+        self.set_coalescer.cancel_all()
     
     def handle_heartbeat(self, pdata, header):
+        fields = get_message_plan(pdata.DESCRIPTOR).fields
         for descriptor, val in pdata.ListFields():
             if val is not None:
-                mapping_options = descriptor.GetOptions().Extensions[options.mapping_options]
-                divisor = mapping_options.divisor if mapping_options.divisor > 1 else 1
-                unit = mapping_options.unit
-                display_val = None
-                if mapping_options.divisor > 1:
-                    divisor = mapping_options.divisor
-                if mapping_options.converter == "minutes":
-                    # time in minutes
-                    h = math.floor(val/60)
-                    m = val % 60
-                    display_val = "%02d:%02d" % (h, m)
-                if divisor != 1:
-                    val = val / divisor
+                field = fields[descriptor.number]
+                val, display_val = field.convert(val)
                 if self.connector is not None:
-                    self.connector.update(descriptor, val, unit, display_value=display_val)
-                self._properties[descriptor.name] = val
-                _LOGGER.debug(f"update received {descriptor.name}: {val} {unit}")
+                    self.connector.update(field, val, field.unit, display_value=display_val)
+                _LOGGER.debug(f"update received {field.name}: {val} {field.unit}")
         if self.connector is not None:
             self.connector.end_update()
         self._last_heartbeat_time = datetime.datetime.now()
@@ -164,14 +146,23 @@ class EcoflowDevice:
         
 
     def get_value(self, name, default=None):
-        if name in self._properties:
-            return self._properties[name]
-        return default
+        if self.connector is None:
+            return default
+        return self.connector.get_value(name, default)
 
     def init_subscriptions(self):
+        # called by the creator of the device after the construction, messages that arrive earlier
+        # would be dropped without handler and a data request could overtake the restored state
         if self.is_simulated:
             self.client.subscribe(self._set_topic, self)
             self.client.subscribe(self._get_topic, self)
+        elif self.client.wildcard_subscriptions:
+            # one subscription per message type for all devices of the account
+            self.client.register_device(self)
+            self.client.subscribe("/app/device/property/+", FLEET)
+            self.client.subscribe("/app/device/status/+", FLEET)
+            self.client.subscribe(f"/app/{self.user_id}/+/thing/property/set_reply", FLEET)
+            self.client.subscribe(f"/app/{self.user_id}/+/thing/property/get_reply", FLEET)
         else:
             self.client.subscribe(self._data_topic, self)
             self.client.subscribe(self._status_topic, self)
@@ -188,13 +179,7 @@ class EcoflowDevice:
 
     def request_data(self):
         if self.uses_protobuf:
-            message = powerstream.SendHeaderMsg()
-            header = message.msg.add()
-            setattr(header, "from", "Android")
-            header.src = DEFAULT_SRC
-            header.dest = DEFAULT_DEST
-            header.seq = self.generate_seq()
-            self.client.publish(self._get_topic, message.SerializeToString())
+            self.client.publish(self._get_topic, _DATA_REQUEST_ENCODER.encode(None, self.generate_seq()))
         else:
             data = {
                 "from": "Android",
@@ -206,13 +191,59 @@ class EcoflowDevice:
             }
             self.client.publish(self._get_topic, json.dumps(data))
 
+    def request_initial_data(self):
+        # the request is queued by the client and sent once it is connected
+        self.client.request_device_data(self)
+
     def on_message(self, client, userdata, mqtt_message):
+        if mqtt_message.topic == self._set_reply_topic:
+            self.handle_set_reply(mqtt_message.payload)
         try:
             self.decode_message(mqtt_message.payload, log_prefix=self.get_log_prefix(mqtt_message.topic))
         except UnicodeDecodeError as error:
             _LOGGER.error(f"UnicodeDecodeError: {error}. Ignoring message and waiting for the next one.")
 
 
+    def coalesce_set_request(self, id, value):
+        if self.is_simulated:
+            self.on_set_request(id, value)
+            return
+        name = self.set_state_names.get(id)
+        self.set_coalescer.submit(id, value, self.on_set_request, current=self.get_value(name) if name is not None else None)
+
+    def get_encoder(self, cmd_func, cmd_id, **fields) -> HeaderEncoder:
+        # the constant header fields must be the same for all messages with this cmd_func and cmd_id
+        encoder = self._encoders.get((cmd_func, cmd_id))
+        if encoder is None:
+            fields.update(cmd_func=cmd_func, cmd_id=cmd_id, device_sn=self.device_sn)
+            encoder = self._encoders[(cmd_func, cmd_id)] = HeaderEncoder(fields)
+        return encoder
+
+    def send_set(self, pdata, cmd_id, callback=None):
+        seq = self.generate_seq()
+        encoder = self.get_encoder(self.default_cmd_func, cmd_id, src=DEFAULT_SRC, dest=DEFAULT_DEST, need_ack=1)
+        return self.send_command(encoder.encode(pdata.SerializeToString(), seq), seq, cmd_id, callback=callback)
+
+    def send_command(self, payload, seq, cmd_id, callback=None):
+        # returns a future with the round trip time, see model/ecoflow/commands.py
+        return self.client.commands.send(self.device_sn, self._set_topic, payload, seq, cmd_id, callback=callback)
+
+    def handle_set_reply(self, payload):
+        try:
+            # routed by the structure of the payload, the length byte of a protobuf header may look like JSON
+            headers = scan_headers(memoryview(payload))
+            if headers is None and self.uses_protobuf:
+                # let the protobuf parser decide, raises a DecodeError for invalid payloads
+                headers = [HeaderInfo.from_message(message) for message in powerstream.SendHeaderMsg.FromString(payload).msg]
+            if headers is None:
+                self.client.commands.handle_reply(self.device_sn, int(json.loads(payload)["id"]))
+                return
+            for header in headers:
+                if header.device_sn in (None, "", self.device_sn):
+                    self.client.commands.handle_reply(self.device_sn, header.seq)
+        except (ValueError, KeyError, TypeError, DecodeError) as err:
+            _LOGGER.debug(f"{self.device_sn} set_reply without seq: {err}")
+
     def get_log_prefix(self, topic):
         if topic == self._data_topic:
             return "DATA"
@@ -240,93 +271,186 @@ class EcoflowDevice:
                 self.handlers[cmd_func][cmd_id] = []
             self.handlers[cmd_func][cmd_id].append(handler)
 
+    def is_coalescable(self, cmd_func, cmd_id):
+        return (cmd_func, cmd_id) in self.coalesce_cmd_ids
+
     def get_pdata_message(self, cmd_func, cmd_id, header=None):
-        if cmd_func in self.pdata_messages:
-            if cmd_id in self.pdata_messages[cmd_func]:
-                return self.pdata_messages[cmd_func][cmd_id]           
+        return get_pdata_message(cmd_func, cmd_id)
 
     def decode_message(self, payload, log_prefix=None):
-        is_json = False
-        try:
-            msg = payload.decode("utf-8")
-            message = json.loads(msg)
-            handled = False
-            is_json = True
-            
-            cmd_id = message["cmdId"] if "cmdId" in message else None
-            cmd_func = message["cmdFunc"] if "cmdFunc" in message else self.default_cmd_func
-            if cmd_id is None and "operateType" in message:
-                cmd_id = message["operateType"]
-            if cmd_id is None and "params" in message and "status" not in message["params"]:
-                cmd_id = "params"
-            if cmd_id is not None:
-                if cmd_func is None and cmd_id in self.handlers:
-                    handled = True
-                    for handler in self.handlers[cmd_id]:
-                        handler(message)
-                elif cmd_func is not None and cmd_func in self.handlers and cmd_id in self.handlers[cmd_func]:
-                    handled = True
-                    for handler in self.handlers[cmd_func][cmd_id]:
-                        handler(message)
-                elif "unhandled" in self.handlers:
-                    handled = True
-                    for handler in self.handlers["unhandled"]:
-                        handler(message)
-                if "*" in self.handlers:
-                    handled = True
-                    for handler in self.handlers["*"]:
-                        handler(message)
-            elif "params" in message and "status" in message["params"]:
-                self.handle_status(message["params"]["status"])
-
-            if self.message_logger is not None:
-                self.message_logger.log_message(message, prefix=f"{self.device_sn}-{log_prefix}", handled=handled, title=self.device_sn, raw=msg)
-            return
-        except Exception as e:
-            if not is_json:
+        self.last_seen = time.time()
+        if self.restored_at is not None:
+            # published with the values of this message
+            self.restored_at = None
+            self.connector.set_restored(None)
+        payload_type = classify_payload(payload, self.uses_protobuf)
+        self.decode_stats[payload_type] += 1
+        if payload_type == PAYLOAD_JSON:
+            try:
+                msg = payload.decode("utf-8")
+                message = json.loads(msg)
+            except ValueError:
+                # not JSON after all
+                self.decode_stats["misclassified"] += 1
                 self.decode_proto(payload, log_prefix=log_prefix)
-            else:
-                raise e
+                return
+            self.decode_json(message, msg, log_prefix=log_prefix)
+        else:
+            try:
+                self.decode_proto(payload, log_prefix=log_prefix)
+            except DecodeError:
+                # not protobuf after all
+                self.decode_stats["misclassified"] += 1
+                msg = payload.decode("utf-8")
+                self.decode_json(json.loads(msg), msg, log_prefix=log_prefix)
+
+    def decode_json(self, message, msg, log_prefix=None):
+        handled = False
+
+        cmd_id = message["cmdId"] if "cmdId" in message else None
+        cmd_func = message["cmdFunc"] if "cmdFunc" in message else self.default_cmd_func
+        if cmd_id is None and "operateType" in message:
+            cmd_id = message["operateType"]
+        if cmd_id is None and "params" in message and "status" not in message["params"]:
+            cmd_id = "params"
+        if cmd_id is not None:
+            if cmd_func is None and cmd_id in self.handlers:
+                handled = True
+                for handler in self.handlers[cmd_id]:
+                    handler(message)
+            elif cmd_func is not None and cmd_func in self.handlers and cmd_id in self.handlers[cmd_func]:
+                handled = True
+                for handler in self.handlers[cmd_func][cmd_id]:
+                    handler(message)
+            elif "unhandled" in self.handlers:
+                handled = True
+                for handler in self.handlers["unhandled"]:
+                    handler(message)
+            if "*" in self.handlers:
+                handled = True
+                for handler in self.handlers["*"]:
+                    handler(message)
+        elif "params" in message and "status" in message["params"]:
+            self.handle_status(message["params"]["status"])
+        if cmd_id is not None and not handled:
+            self.count_unhandled(cmd_func, cmd_id)
+
+        if self.message_logger is not None:
+            self.message_logger.log_message(message, prefix=f"{self.device_sn}-{log_prefix}", handled=handled, title=self.device_sn, raw=msg)
 
     def decode_proto(self, payload, log_prefix=None):
-        try:
+        headers = scan_headers(memoryview(payload))
+        if headers is None:
+            # let the protobuf parser decide, raises a DecodeError for invalid payloads
             packet = powerstream.SendHeaderMsg()
             packet.ParseFromString(payload)
-            for message in packet.msg:
-                pdata = self.get_pdata_message(message.cmd_func, message.cmd_id)
-                if message.device_sn != self.device_sn:
+            headers = [HeaderInfo.from_message(message) for message in packet.msg]
+        try:
+            for header in headers:
+                if header.device_sn != self.device_sn:
+                    self.skip_message(header)
                     continue        
 
-                handled = False
-                cmd_id = message.cmd_id if message.HasField("cmd_id") else 0
-                cmd_func = message.cmd_func if message.HasField("cmd_func") else 0
-                if pdata is not None:
-                    _LOGGER.debug(f"{self.device_sn} decoder found for cmd_func {cmd_func} cmd_id {cmd_id}")
-                    pdata.ParseFromString(message.pdata)
+                cmd_id = header.cmd_id
+                cmd_func = header.cmd_func
+                handlers = None
                 if cmd_func in self.handlers:
                     if cmd_id in self.handlers[cmd_func]:
-                        handled = True
-                        for handler in self.handlers[cmd_func][cmd_id]:
-                            handler(pdata, message)
+                        handlers = self.handlers[cmd_func][cmd_id]
                 elif "unhandled" in self.handlers:
-                    handled = True
-                    for handler in self.handlers["unhandled"]:
-                        handler(pdata, message)
+                    handlers = self.handlers["unhandled"]
                 if "*" in self.handlers:
-                    handled = True
-                    for handler in self.handlers["*"]:
-                        handler(pdata, message)
-                if self.message_logger is not None:
-                    self.message_logger.log_message(message, pdata=pdata, handled=handled, prefix=f"{self.device_sn}-{log_prefix}", title=self.device_sn, raw=payload)
+                    handlers = (handlers if handlers is not None else []) + self.handlers["*"]
+                handled = handlers is not None
                 if not handled:
                     _LOGGER.debug(f"{self.device_sn} no handler registered for cmd_func {cmd_func} cmd_id {cmd_id}")
+                    self.count_unhandled(cmd_func, cmd_id)
+                    if self.message_logger is None or not self.message_logger.accepts(handled):
+                        # nobody is interested in the content
+                        self.skip_message(header)
+                        continue
+
+                pdata = self.get_pdata_message(cmd_func, cmd_id)
+                if pdata is not None:
+                    _LOGGER.debug(f"{self.device_sn} decoder found for cmd_func {cmd_func} cmd_id {cmd_id}")
+                    pdata.ParseFromString(bytes(header.pdata) if header.pdata is not None else b"")
+                # the handlers get the scanned header, the complete Header is parsed only if they
+                # (or the message logger) use header.message
+                if handled:
+                    for handler in handlers:
+                        handler(pdata, header)
+                if self.message_logger is not None:
+                    self.message_logger.log_message(header, pdata=pdata, handled=handled, prefix=f"{self.device_sn}-{log_prefix}", title=self.device_sn, raw=payload)
                 
         except Exception as err:
-            _LOGGER.error(f"Unexpected {err=}, {type(err)=}", payload)
+            _LOGGER.error(f"Unexpected {err=}, {type(err)=}, payload: {payload.hex()}")
             raise err    
+
+    def count_unhandled(self, cmd_func, cmd_id):
+        key = f"{cmd_func}-{cmd_id}"
+        self.unhandled_cmd_ids[key] = self.unhandled_cmd_ids.get(key, 0) + 1
+
+    def get_snapshot_properties(self) -> dict:
+        if self.connector is None:
+            return {}
+        return dict(self.connector.values.items())
+
+    def snapshot(self) -> dict:
+        # current state of the device, created on demand (see model/utils/snapshot.py)
+        derived = {}
+        if self.connector is not None:
+            for name in list(self.connector.sums.keys()):
+                derived[name] = self.connector.get_value(name)
+        return {
+            "type": type(self).__name__,
+            "simulated": self.is_simulated,
+            "last_seen": datetime.datetime.fromtimestamp(self.last_seen).isoformat() if self.last_seen is not None else None,
+            "last_heartbeat": self._last_heartbeat_time.isoformat() if self._last_heartbeat_time is not None else None,
+            # the values are the ones of the previous run until the device sends something
+            "restored_at": datetime.datetime.fromtimestamp(self.restored_at).isoformat() if self.restored_at is not None else None,
+            "properties": self.get_snapshot_properties(),
+            "derived": derived,
+            "unhandled_cmd_ids": dict(self.unhandled_cmd_ids),
+            "set_commands": self.set_coalescer.stats(),
+            "decode_stats": dict(self.decode_stats)
+        }
+
+    def get_saved_state(self) -> dict:
+        # state for the next run (see model/utils/warm_state.py), None if there is nothing to save
+        if self.is_simulated or self.connector is None or self.last_seen is None:
+            return None
+        return {
+            "type": type(self).__name__,
+            "last_seen": self.last_seen,
+            "last_heartbeat": self._last_heartbeat_time.timestamp() if self._last_heartbeat_time is not None else None,
+            "values": {name: value for name, value in self.connector.values.items() if type(value) in SAVED_VALUE_TYPES}
+        }
+
+    def restore_state(self):
+        # restores the state of the previous run, must be called before the homie device is started
+        # to publish the restored values instead of empty ones
+        if self.is_simulated or self.connector is None:
+            return
+        state = get_warm_state().pop(self.device_sn, type(self).__name__)
+        if state is None:
+            return
+        same_day = datetime.date.fromtimestamp(state["last_seen"]) == datetime.date.today()
+        values = self.connector.values
+        for name, value in state["values"].items():
+            if same_day or name not in self.daily_values:
+                values.set_value(name, value)
+        self.last_seen = self.restored_at = state["last_seen"]
+        self.connector.set_restored(self.restored_at)
+        if state["last_heartbeat"] is not None:
+            self._last_heartbeat_time = datetime.datetime.fromtimestamp(state["last_heartbeat"])
+        _LOGGER.info(f"{self.device_sn} state restored, last seen {time.time() - self.last_seen:.0f} seconds ago")
+
+    def skip_message(self, header):
+        self.decode_stats["skipped_messages"] += 1
+        self.decode_stats["skipped_bytes"] += header.size
         
     def decode_pdata(self, header):
         pass
 
     def generate_seq(self):
-        return random.randint(100000, 999999)
+        return next_seq()
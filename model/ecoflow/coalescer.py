@@ -0,0 +1,94 @@
+import logging
+import os
+import threading
+import time
+
+from model.utils.scheduler import get_scheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+# minimum time (seconds) between two commands for the same setting of a device
+SET_MIN_INTERVAL = float(os.getenv("EF_SET_MIN_INTERVAL")) if os.getenv("EF_SET_MIN_INTERVAL") is not None else 1
+
+
+class _Setting:
+    __slots__ = ("sent_at", "sent_value", "pending", "timer")
+
+    def __init__(self) -> None:
+        self.sent_at = None
+        self.sent_value = None
+        # (value, send) of the command waiting for the end of the interval
+        self.pending = None
+        self.timer = None
+
+
+# Limits the commands of one device to one per setting and SET_MIN_INTERVAL. A value that arrives
+# within the interval replaces the value waiting to be sent (latest wins), a value that equals the
+# confirmed state of the device is dropped unless a different value has been sent before.
+class SetCommandCoalescer:
+    def __init__(self, min_interval: float = SET_MIN_INTERVAL) -> None:
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._settings = {}
+        self.stats_counters = {
+            "sent": 0,
+            "coalesced": 0,
+            "suppressed": 0
+        }
+
+    def submit(self, key, value, send, current=None) -> bool:
+        # send(key, value) is called now or at the end of the interval, current is the
+        # confirmed state (None if unknown), returns False if the command is dropped
+        with self._lock:
+            setting = self._settings.get(key)
+            if setting is None:
+                setting = self._settings[key] = _Setting()
+            if current is not None and value == current and (setting.sent_value is None or setting.sent_value == value):
+                if setting.timer is not None:
+                    setting.timer.cancel()
+                    setting.timer = None
+                    setting.pending = None
+                    self.stats_counters["coalesced"] += 1
+                self.stats_counters["suppressed"] += 1
+                return False
+            if setting.timer is not None:
+                setting.pending = (value, send)
+                self.stats_counters["coalesced"] += 1
+                return True
+            now = time.monotonic()
+            if setting.sent_at is not None and now - setting.sent_at < self.min_interval:
+                setting.pending = (value, send)
+                setting.timer = get_scheduler().call_later(setting.sent_at + self.min_interval - now, self._flush, key)
+                return True
+            self._sent(setting, value, now)
+        send(key, value)
+        return True
+
+    def _sent(self, setting, value, now):
+        setting.sent_at = now
+        setting.sent_value = value
+        self.stats_counters["sent"] += 1
+
+    def _flush(self, key):
+        with self._lock:
+            setting = self._settings.get(key)
+            if setting is None or setting.pending is None:
+                return
+            value, send = setting.pending
+            setting.pending = None
+            setting.timer = None
+            self._sent(setting, value, time.monotonic())
+        _LOGGER.debug(f"sending coalesced {key}: {value}")
+        send(key, value)
+
+    def cancel_all(self):
+        with self._lock:
+            for setting in self._settings.values():
+                if setting.timer is not None:
+                    setting.timer.cancel()
+                    setting.timer = None
+                setting.pending = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats_counters, pending=sum(1 for setting in self._settings.values() if setting.pending is not None))
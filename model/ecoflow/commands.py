@@ -0,0 +1,175 @@
+import bisect
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from model.utils.scheduler import get_scheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+# seconds to wait for the set_reply of a command before it is sent again
+COMMAND_TIMEOUT = float(os.getenv("EF_COMMAND_TIMEOUT")) if os.getenv("EF_COMMAND_TIMEOUT") is not None else 5
+# number of times an unanswered command is sent again before it fails
+COMMAND_RETRIES = int(os.getenv("EF_COMMAND_RETRIES")) if os.getenv("EF_COMMAND_RETRIES") is not None else 2
+# upper bounds (seconds) of the round trip histogram
+RTT_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 5, 10]
+
+# the header field is an int32, the counter starts at a random value (like the former random
+# sequence numbers) so replies to commands of a previous run are not matched
+SEQ_LIMIT = 2 ** 31
+_seq_counter = itertools.count(random.randint(100000, 999999))
+_seq_lock = threading.Lock()
+
+
+def next_seq() -> int:
+    with _seq_lock:
+        return next(_seq_counter) % SEQ_LIMIT
+
+
+class CommandTimeout(Exception):
+    pass
+
+
+class RttHistogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        # the last bucket counts the round trips above the largest bound
+        self.counts = [0] * (len(RTT_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, rtt: float):
+        self.counts[bisect.bisect_left(RTT_BUCKETS, rtt)] += 1
+        self.count += 1
+        self.total += rtt
+        self.max = max(self.max, rtt)
+
+    def stats(self) -> dict:
+        buckets = {f"<={limit}s": count for limit, count in zip(RTT_BUCKETS, self.counts)}
+        buckets[f">{RTT_BUCKETS[-1]}s"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "max": round(self.max, 3),
+            "buckets": buckets
+        }
+
+
+class PendingCommand:
+    __slots__ = ("device_sn", "seq", "cmd_id", "topic", "payload", "sent", "attempts", "future", "timer")
+
+    def __init__(self, device_sn, seq, cmd_id, topic, payload) -> None:
+        self.device_sn = device_sn
+        self.seq = seq
+        self.cmd_id = cmd_id
+        self.topic = topic
+        self.payload = payload
+        # time of the first attempt, the round trip includes the retries
+        self.sent = None
+        self.attempts = 0
+        self.future = Future()
+        self.timer = None
+
+
+# Tracks the set commands sent to the devices until their set_reply arrives. Commands are
+# keyed by (device serial, seq), unanswered commands are sent again with the same seq up to
+# COMMAND_RETRIES times, after that their future fails with a CommandTimeout.
+class CommandTracker:
+    def __init__(self, client, timeout: float = COMMAND_TIMEOUT, retries: int = COMMAND_RETRIES) -> None:
+        self.client = client
+        self.timeout = timeout
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._pending = {}
+        # device_sn -> cmd_id -> RttHistogram
+        self._rtt = {}
+        self.stats_counters = {
+            "sent": 0,
+            "retried": 0,
+            "acknowledged": 0,
+            "timed_out": 0,
+            "unmatched_replies": 0
+        }
+
+    def send(self, device_sn: str, topic: str, payload, seq: int, cmd_id, callback=None) -> Future:
+        # the future returns the round trip time in seconds, the callback gets the future
+        command = PendingCommand(device_sn, seq, cmd_id, topic, payload)
+        if callback is not None:
+            command.future.add_done_callback(callback)
+        with self._lock:
+            self._pending[(device_sn, seq)] = command
+            self.stats_counters["sent"] += 1
+        self._publish(command)
+        return command.future
+
+    def _publish(self, command):
+        with self._lock:
+            if self._pending.get((command.device_sn, command.seq)) is not command:
+                # answered in the meantime
+                return
+            if command.sent is None:
+                command.sent = time.monotonic()
+            command.attempts += 1
+            command.timer = get_scheduler().call_later(self.timeout, self._expire, command)
+        self.client.publish(command.topic, command.payload)
+
+    def _expire(self, command):
+        with self._lock:
+            if self._pending.get((command.device_sn, command.seq)) is not command:
+                return
+            if command.attempts <= self.retries:
+                self.stats_counters["retried"] += 1
+                retry = True
+            else:
+                del self._pending[(command.device_sn, command.seq)]
+                self.stats_counters["timed_out"] += 1
+                retry = False
+        if retry:
+            _LOGGER.debug(f"no reply from {command.device_sn} for cmd_id {command.cmd_id} (seq {command.seq}), sending it again")
+            self._publish(command)
+        else:
+            _LOGGER.warning(f"no reply from {command.device_sn} for cmd_id {command.cmd_id} (seq {command.seq}) after {command.attempts} attempts")
+            command.future.set_exception(CommandTimeout(f"{command.device_sn}: cmd_id {command.cmd_id} (seq {command.seq}) not acknowledged"))
+
+    def handle_reply(self, device_sn: str, seq: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            command = self._pending.pop((device_sn, seq), None)
+            if command is None:
+                # a reply to a command of another client or after the last retry
+                self.stats_counters["unmatched_replies"] += 1
+                return False
+            command.timer.cancel()
+            rtt = now - command.sent
+            self.stats_counters["acknowledged"] += 1
+            histograms = self._rtt.get(device_sn)
+            if histograms is None:
+                histograms = self._rtt[device_sn] = {}
+            histogram = histograms.get(command.cmd_id)
+            if histogram is None:
+                histogram = histograms[command.cmd_id] = RttHistogram()
+            histogram.add(rtt)
+        _LOGGER.debug(f"{device_sn} acknowledged cmd_id {command.cmd_id} (seq {seq}) after {rtt:.3f} seconds")
+        command.future.set_result(rtt)
+        return True
+
+    def cancel_all(self):
+        with self._lock:
+            commands = list(self._pending.values())
+            self._pending.clear()
+        for command in commands:
+            command.timer.cancel()
+            command.future.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats_counters,
+                        pending=len(self._pending),
+                        rtt={device_sn: {str(cmd_id): histogram.stats() for cmd_id, histogram in histograms.items()}
+                             for device_sn, histograms in self._rtt.items()})
@@ -3,10 +3,10 @@ from model.connector import Connector
 import logging
 import re
 import math
-import os
 import json
 
 from model.ecoflow.constant import CmdIds
+from model.ecoflow.registry import get_device_config
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,26 +19,31 @@ class Ecoflow_DeltaMax(EcoflowDevice):
         self.connector = Connector(self.device_sn, "delta-max", name="Delta Max", screen=stdscr)
         self.connector.col_width = 38
         self.connector.show_filter = lambda name : name[0:3] in ["bms", "ems", "pd."] and name[0:7] != "pd.icon"
-        self.connector.on("set_request", self.on_set_request)
-        self.config_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'protos', 'delta-max.json')
+        self.connector.on("set_request", self.coalesce_set_request)
+        self.set_state_names.update({
+            "dc-out-state": "pd.dcOutState",
+            "car-state": "mppt.carState",
+            "cfg-ac-enabled": "inv.cfgAcEnabled",
+            "cfg-ac-xboost": "inv.cfgAcXboost"
+        })
         self.config = None
-        with open(self.config_file) as f:
-            try:
-                self.config = json.load(f)
-            except Exception as err:
-                _LOGGER.error('error reading device config file: %s' % self.config_file)
-                _LOGGER.error(err)
+        try:
+            # parsed once and shared by all Delta Max devices
+            self.config = get_device_config("delta-max")
+        except Exception as err:
+            _LOGGER.error('error reading device config file: delta-max.json')
+            _LOGGER.error(err)
         if self.config is not None:
             self.connector.set_device_config(self.config)
 
+        self.restore_state()
         self.connector.start()
 
         self.add_cmd_id_handler(self.handle_heartbeat, [0, "latestQuotas", "params"])
-        self.merged_data = {}
 
     def init_subscriptions(self):        
         super().init_subscriptions()
-        self.request_data()       
+        self.request_initial_data()       
         self.client.subscribe(self._set_topic, self)
         self.client.subscribe(self._get_topic, self) 
 
@@ -78,9 +83,6 @@ class Ecoflow_DeltaMax(EcoflowDevice):
 
         
         if data_map is not None:
-            if self.message_logger is not None:
-                self.merged_data = self.merged_data | data_map
-                self.message_logger.log_message(dict(sorted(self.merged_data.items())), prefix=f"{self.device_sn}-data", title=self.device_sn)
             for name, val in data_map.items():
                 if val is not None:
                     [unit, divisor, special_handler] = self.get_param_settings(name).values()
@@ -136,7 +138,8 @@ class Ecoflow_DeltaMax(EcoflowDevice):
         else:
             _LOGGER.error(f"unhandled set_request for {id}")
 
-    def set_out(self, power, cmdId, name="enabled"):
+    def set_out(self, power, cmdId, name="enabled", callback=None):
+        seq = self.generate_seq()
         params = {
             "id": cmdId
         }
@@ -144,10 +147,10 @@ class Ecoflow_DeltaMax(EcoflowDevice):
         data = {
             "from": "Android",
             "isMatter": 0,
-            "id": "%s" % self.generate_seq(),
+            "id": "%s" % seq,
             "moduleType": 0,
             "operateType": "TCP",
             "params": params,
             "version": "1.1"
         }        
-        self.client.publish(self._set_topic, json.dumps(data))
+        return self.send_command(json.dumps(data), seq, cmdId, callback=callback)
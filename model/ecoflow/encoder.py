@@ -0,0 +1,52 @@
+import model.protos.powerstream_pb2 as powerstream
+from model.ecoflow.payload import encode_varint
+
+# header fields that change with every message, all other fields are constant per encoder
+_PDATA = powerstream.Header.DESCRIPTOR.fields_by_name["pdata"]
+_DATA_LEN = powerstream.Header.DESCRIPTOR.fields_by_name["data_len"]
+_SEQ = powerstream.Header.DESCRIPTOR.fields_by_name["seq"]
+_VARIABLE_FIELDS = [_PDATA, _DATA_LEN, _SEQ]
+# field 1 (SendHeaderMsg.msg), wire type 2 (length delimited)
+_MSG_TAG = b"\x0a"
+
+
+def _tag(field, wire_type) -> bytes:
+    return encode_varint(field.number << 3 | wire_type)
+
+
+_PDATA_TAG = _tag(_PDATA, 2)
+_DATA_LEN_TAG = _tag(_DATA_LEN, 0)
+_SEQ_TAG = _tag(_SEQ, 0)
+
+
+# Encodes a SendHeaderMsg with one Header like Header.SerializeToString() does, but the constant
+# header fields (e.g. src, dest, cmd_func, cmd_id, device_sn) are serialized only once. Every
+# message just splices pdata, data_len and seq between the cached bytes.
+class HeaderEncoder:
+    __slots__ = ("fields", "_before_pdata", "_before_data_len", "_before_seq", "_after_seq")
+
+    def __init__(self, fields: dict) -> None:
+        self.fields = fields
+        segments = [[] for _ in range(len(_VARIABLE_FIELDS) + 1)]
+        numbers = [field.number for field in _VARIABLE_FIELDS]
+        # the serializer writes the fields in the order of their numbers
+        for field in sorted(powerstream.Header.DESCRIPTOR.fields, key=lambda field: field.number):
+            if field.name not in fields:
+                continue
+            if field in _VARIABLE_FIELDS:
+                raise ValueError(f"header field {field.name} is set for every message")
+            header = powerstream.Header()
+            setattr(header, field.name, fields[field.name])
+            segments[sum(1 for number in numbers if number < field.number)].append(header.SerializeToString())
+        self._before_pdata, self._before_data_len, self._before_seq, self._after_seq = [b"".join(segment) for segment in segments]
+
+    def encode(self, pdata: bytes, seq: int) -> bytes:
+        if pdata is None:
+            # header without pdata and data_len (e.g. a data request)
+            header = b"".join((self._before_pdata, self._before_data_len, self._before_seq, _SEQ_TAG, encode_varint(seq), self._after_seq))
+            return b"".join((_MSG_TAG, encode_varint(len(header)), header))
+        # data_len is the length of the pdata, so its varint is the same as the length prefix of the pdata
+        length = encode_varint(len(pdata))
+        header = b"".join((self._before_pdata, _PDATA_TAG, length, pdata, self._before_data_len,
+                           _DATA_LEN_TAG, length, self._before_seq, _SEQ_TAG, encode_varint(seq), self._after_seq))
+        return b"".join((_MSG_TAG, encode_varint(len(header)), header))
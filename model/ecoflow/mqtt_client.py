@@ -1,18 +1,91 @@
 import paho.mqtt.client as mqtt_client
 import logging
+import os
+import threading
 import time
 import ssl
+from functools import lru_cache
 from model.ecoflow.auth import EcoflowAuthentication
+from model.ecoflow.payload import merge_payloads, scan_headers
+from model.utils.backoff import Backoff
+from model.utils.capture import CaptureWriter
+from model.utils.ingest_queue import IngestQueue
+from model.utils.scheduler import get_scheduler
+from model.ecoflow.commands import CommandTracker
+from model.ecoflow.staleness import StalenessTracker
+from model.utils.topic_trie import TopicTrie
 
 _LOGGER = logging.getLogger(__name__)
 
 ecoflow_client = None
 
+# connection states
+DISCONNECTED = "disconnected"
+CONNECTING = "connecting"
+CONNECTED = "connected"
+
+# subscribe to account wide wildcard topics instead of one topic per device and message type
+WILDCARD_SUBSCRIPTIONS = os.getenv("EF_WILDCARD_SUBSCRIPTIONS") == "1"
+# maximum number of topics in one SUBSCRIBE packet
+SUBSCRIBE_BATCH_SIZE = int(os.getenv("EF_SUBSCRIBE_BATCH_SIZE")) if os.getenv("EF_SUBSCRIBE_BATCH_SIZE") is not None else 100
+# subscriptions made while connected are collected for this many seconds and sent together
+SUBSCRIBE_DELAY = 0.1
+
+# subscriber of wildcard topics, the messages are routed to the device by the serial number in the topic
+FLEET = "fleet"
+
+
+@lru_cache(maxsize=4096)
+def parse_device_sn(topic: str):
+    # /app/device/property/{sn} or /app/{user_id}/{sn}/thing/property/...
+    parts = topic.split("/")
+    if len(parts) > 4 and parts[2] == "device":
+        return parts[4]
+    if len(parts) > 3:
+        return parts[3]
+    return None
+
+
 class EcoflowClient:
     def __init__(self, auth: EcoflowAuthentication) -> None:
         self.auth = auth
         self.connected = False
+        self.state = CONNECTING
         self.subscriptions = {}
+        self.subscription_qos = {}
+        self.topics = TopicTrie()
+        self.devices_by_sn = {}
+        self.wildcard_subscriptions = WILDCARD_SUBSCRIPTIONS
+        self._pending_subscriptions = []
+        self._subscribe_timer = None
+        self._subscribe_lock = threading.Lock()
+        # renews rejected credentials while the network loop is stopped
+        self._login_thread = None
+        self._stopping = threading.Event()
+        self.backoff = Backoff(min_delay=1, max_delay=120)
+        # sends the data requests to devices without recent data
+        self.staleness = StalenessTracker(self)
+        # matches the set commands with their replies
+        self.commands = CommandTracker(self)
+        self.connection_stats = {
+            "connects": 0,
+            "disconnects": 0,
+            "last_downtime": None,
+            "last_first_data_latency": None,
+            "auth_time": auth.authorize_time,
+            "auth_cached": auth.from_cache,
+            "first_data_after_start": None,
+            "devices_ready_after_start": None
+        }
+        # the authorization happened before the client has been created
+        self._started_at = time.monotonic() - (auth.authorize_time or 0)
+        self._disconnected_at = None
+        self._connected_at = None
+        self._waiting_for_data = False
+        # records all received messages for a later replay
+        self.capture: CaptureWriter = None
+        # decouples message handling from the network loop
+        self.ingest_queue = IngestQueue(self.dispatch, max_size=int(os.getenv("EF_INGEST_QUEUE_SIZE")) if os.getenv("EF_INGEST_QUEUE_SIZE") is not None else 1000)
 
         self.client = mqtt_client.Client(client_id=auth.client_id,
                                          clean_session=True, reconnect_on_failure=True)
@@ -21,23 +94,49 @@ class EcoflowClient:
         self.client.tls_insecure_set(False)
         self.client.on_connect = self.on_connect
         self.client.on_disconnect = self.on_disconnect
+        self.client.on_connect_fail = self.on_connect_fail
         self.client.on_message = self.on_message
+        self.schedule_reconnect()
 
         _LOGGER.info(f"Connecting to MQTT Broker {self.auth.mqtt_url}:{self.auth.mqtt_port}")
         self.client.connect(self.auth.mqtt_url, self.auth.mqtt_port)
         
 
     def start(self):
+        self.ingest_queue.start()
+        self.staleness.start()
         self.client.loop_forever()
-
-    def stop(self):
-        self.client.disconnect()    
+        while self._login_thread is not None and not self._stopping.is_set():
+            # the network loop has been stopped for a new login
+            self._login_thread.join()
+            self._login_thread = None
+            if self.auth.from_cache:
+                # the login failed, the next attempt uses the rejected credentials again
+                delay = self.backoff.next_delay()
+                if self._stopping.wait(delay):
+                    break
+            _LOGGER.info(f"Connecting to MQTT Broker {self.auth.mqtt_url}:{self.auth.mqtt_port}")
+            self.client.connect_async(self.auth.mqtt_url, self.auth.mqtt_port)
+            self.client.loop_forever(retry_first_connection=True)
 
     def on_connect(self, client, userdata, flags, rc):
         if rc == 0:
             self.connected = True
+            self.state = CONNECTED
+            self.backoff.reset()
+            now = time.monotonic()
+            self.connection_stats["connects"] += 1
+            if self._disconnected_at is not None:
+                self.connection_stats["last_downtime"] = now - self._disconnected_at
+                self._disconnected_at = None
+            self._connected_at = now
+            self._waiting_for_data = True
             _LOGGER.info(f"Connected to Ecoflow MQTT Server")
-        elif rc == -1:
+            self.resubscribe()
+            self.request_all_data()
+            return client
+        self.schedule_reconnect()
+        if rc == -1:
             _LOGGER.error("Failed to connect to MQTT: connection timed out")
         elif rc == 1:
             _LOGGER.error("Failed to connect to MQTT: incorrect protocol version")
@@ -51,36 +150,193 @@ class EcoflowClient:
             _LOGGER.error("Failed to connect to MQTT: not authorised")
         else:
             _LOGGER.error(f"Failed to connect to MQTT: another error occured: {rc}")
+        if rc in (4, 5) and self.auth.from_cache:
+            self.renew_credentials()
 
         return client
     
+    def renew_credentials(self):
+        # the cached credentials have been rejected, they are replaced before the next attempt,
+        # the login must not block the network loop, so it is stopped until the login is done
+        if self._login_thread is not None:
+            return
+        _LOGGER.warning("cached MQTT credentials have been rejected, logging in again")
+        self.auth.invalidate_cache()
+        self._login_thread = threading.Thread(target=self.login, name="mqtt-login", daemon=True)
+        self._login_thread.start()
+        self.client.disconnect()
+
+    def login(self):
+        try:
+            self.auth.authorize(use_cache=False)
+        except Exception as err:
+            _LOGGER.error(f"Login failed: {err}")
+            return
+        self.client.username_pw_set(self.auth.mqtt_username, self.auth.mqtt_password)
+        self.connection_stats["auth_time"] = self.auth.authorize_time
+        self.connection_stats["auth_cached"] = False
+
     def on_disconnect(self, client, userdata, rc):
+        self.connected = False
+        self.state = DISCONNECTED
+        self.staleness.pause()
+        self.connection_stats["disconnects"] += 1
+        if self._disconnected_at is None:
+            self._disconnected_at = time.monotonic()
         if rc != 0:
-            _LOGGER.error(f"Unexpected MQTT disconnection: {rc}. Will auto-reconnect")
-            time.sleep(5)
-            # self.client.reconnect() ??
+            delay = self.schedule_reconnect()
+            _LOGGER.error(f"Unexpected MQTT disconnection: {rc}. Will auto-reconnect in {delay:.1f} seconds")
+
+    def on_connect_fail(self, client, userdata):
+        delay = self.schedule_reconnect()
+        _LOGGER.error(f"Failed to connect to MQTT. Next attempt in {delay:.1f} seconds")
+
+    def schedule_reconnect(self):
+        # the paho network loop waits this long before the next connection attempt,
+        # setting min and max to the same value replaces paho's own backoff with ours
+        delay = self.backoff.next_delay()
+        self.client.reconnect_delay_set(min_delay=delay, max_delay=delay)
+        if self.state != CONNECTED:
+            self.state = CONNECTING
+        return delay
+
+    def resubscribe(self):
+        # the session is not persisted (clean_session=True), so all subscriptions must be renewed
+        with self._subscribe_lock:
+            self._pending_subscriptions.clear()
+            topics = list(self.subscriptions.keys())
+        self.send_subscriptions(topics)
+        _LOGGER.info(f"subscribed to {len(topics)} topics")
+
+    def send_subscriptions(self, topics):
+        for index in range(0, len(topics), SUBSCRIBE_BATCH_SIZE):
+            self.client.subscribe([(topic, self.subscription_qos[topic]) for topic in topics[index:index+SUBSCRIBE_BATCH_SIZE]])
+
+    def flush_subscriptions(self):
+        with self._subscribe_lock:
+            topics = self._pending_subscriptions
+            self._pending_subscriptions = []
+            self._subscribe_timer = None
+        if len(topics) > 0 and self.connected:
+            self.send_subscriptions(topics)
+
+    def get_devices(self):
+        with self._subscribe_lock:
+            devices = list(self.devices_by_sn.values())
+            subscriptions = [list(subscribers) for subscribers in self.subscriptions.values()]
+        for subscribers in subscriptions:
+            for device in subscribers:
+                if device is not FLEET and device not in devices:
+                    devices.append(device)
+        return [device for device in devices if not device.is_simulated]
+
+    def get_subscribers(self, topic):
+        devices = []
+        for subscriber in self.topics.match(topic):
+            if subscriber is FLEET:
+                subscriber = self.devices_by_sn.get(parse_device_sn(topic))
+                if subscriber is None:
+                    continue
+            if subscriber not in devices:
+                devices.append(subscriber)
+        return devices
+
+    def devices_ready(self, count: int):
+        # called once all configured devices have been initialised
+        ready_after = time.monotonic() - self._started_at
+        self.connection_stats["devices_ready_after_start"] = ready_after
+        first_data = self.connection_stats["first_data_after_start"]
+        _LOGGER.info(f"all {count} devices ready {ready_after:.3f} seconds after the start"
+                     + (f", first message received after {first_data:.3f} seconds" if first_data is not None else ""))
+
+    def request_all_data(self):
+        # the requests are spread by the staleness tracker, devices with recent data are skipped
+        self.staleness.request_all()
+
+    def request_device_data(self, device):
+        self.staleness.request(device)
 
     def on_message(self, client, userdata, mqtt_message):
-        if mqtt_message.topic in self.subscriptions:
-            for device in self.subscriptions[mqtt_message.topic]:
-                device.on_message(client, userdata, mqtt_message)
-                
+        if self._waiting_for_data:
+            self._waiting_for_data = False
+            now = time.monotonic()
+            latency = now - self._connected_at
+            self.connection_stats["last_first_data_latency"] = latency
+            if self.connection_stats["first_data_after_start"] is None:
+                self.connection_stats["first_data_after_start"] = now - self._started_at
+                _LOGGER.info(f"first message received {latency:.3f} seconds after connecting, {now - self._started_at:.3f} seconds after the start "
+                             f"({'cached credentials' if self.connection_stats['auth_cached'] else 'full login'}, authorization took {self.auth.authorize_time:.3f} seconds)")
+            else:
+                _LOGGER.info(f"first message received {latency:.3f} seconds after connecting")
+        if self.capture is not None:
+            self.capture.write(mqtt_message.topic, mqtt_message.payload)
+        devices = self.get_subscribers(mqtt_message.topic)
+        if devices:
+            self.ingest_queue.put(mqtt_message, key=self.get_coalesce_key(mqtt_message, devices), merge=self.merge_queued)
+
+    def merge_queued(self, queued, mqtt_message):
+        # heartbeats may contain only the changed fields, the fields of the queued message are kept
+        mqtt_message.payload = merge_payloads(queued.payload, mqtt_message.payload)
+        return mqtt_message
+
+    def get_coalesce_key(self, mqtt_message, devices):
+        # only state messages that can be merged (e.g. heartbeats) are combined with an older queued message
+        headers = scan_headers(mqtt_message.payload)
+        if headers is None or len(headers) != 1:
+            return None
+        header = headers[0]
+        for device in devices:
+            if not device.is_coalescable(header.cmd_func, header.cmd_id):
+                return None
+        return (mqtt_message.topic, header.device_sn, header.cmd_func, header.cmd_id)
+
+    def dispatch(self, mqtt_message):
+        for device in self.get_subscribers(mqtt_message.topic):
+            device.on_message(self.client, None, mqtt_message)
 
     def subscribe(self, topic, device, qos=1):
-        self.client.subscribe(topic, qos)
-        if topic not in self.subscriptions:
-            self.subscriptions[topic] = [device]
-        elif device not in self.subscriptions[topic]:
-            self.subscriptions[topic].append(device)
+        # devices are initialised in parallel while the network loop is running
+        self.topics.add(topic, device)
+        with self._subscribe_lock:
+            self.subscription_qos[topic] = qos
+            if topic not in self.subscriptions:
+                self.subscriptions[topic] = [device]
+                if self.connected:
+                    # subscriptions made before the connection has been established are sent in on_connect
+                    self._pending_subscriptions.append(topic)
+                    if self._subscribe_timer is None:
+                        self._subscribe_timer = get_scheduler().call_later(SUBSCRIBE_DELAY, self.flush_subscriptions)
+            elif device not in self.subscriptions[topic]:
+                self.subscriptions[topic].append(device)
+
+    def set_capture(self, path):
+        self.capture = CaptureWriter(path)
+        _LOGGER.info(f"capturing received messages in {path}")
+
+    def register_device(self, device):
+        # device receives the messages of the FLEET wildcard subscriptions
+        with self._subscribe_lock:
+            self.devices_by_sn[device.device_sn] = device
 
     def unsuscribe(self, topic, device):
         if topic in self.subscriptions and device in self.subscriptions[topic]:
             self.subscriptions[topic].remove(device)
+            self.topics.remove(topic, device)
 
     def publish(self, topic, data):
         self.client.publish(topic, data)
     
     def stop(self):
+        self._stopping.set()
+        self.staleness.stop()
+        self.commands.cancel_all()
+        with self._subscribe_lock:
+            if self._subscribe_timer is not None:
+                self._subscribe_timer.cancel()
+                self._subscribe_timer = None
+        self.ingest_queue.stop()
+        if self.capture is not None:
+            self.capture.close()
         self.client.loop_stop()
         self.client.disconnect()
 
@@ -0,0 +1,179 @@
+import model.protos.powerstream_pb2 as powerstream
+
+PAYLOAD_JSON = "json"
+PAYLOAD_PROTO = "proto"
+
+_WHITESPACE = b" \t\r\n"
+_JSON_START = b"{["
+# field 1 (SendHeaderMsg.msg), wire type 2 (length delimited)
+_PROTO_START = 0x0a
+
+
+def classify_payload(payload: bytes, uses_protobuf: bool = False) -> str:
+    # decide which decoder to use by looking at the first significant byte,
+    # the device type is only used as a hint if the payload is not conclusive
+    if payload and payload[0] == _PROTO_START:
+        # the tag of SendHeaderMsg.msg is the same byte as \n, it must be tested before
+        # whitespace is skipped (the length that follows may be any byte, e.g. "{")
+        return PAYLOAD_PROTO
+    for byte in payload:
+        if byte in _WHITESPACE:
+            continue
+        if byte in _JSON_START:
+            return PAYLOAD_JSON
+        break
+    return PAYLOAD_PROTO if uses_protobuf else PAYLOAD_JSON
+
+
+# field numbers of the Header message (see powerstream.proto)
+_HEADER_PDATA = 1
+_HEADER_CMD_FUNC = 8
+_HEADER_CMD_ID = 9
+_HEADER_SEQ = 14
+_HEADER_DEVICE_SN = 25
+
+
+def read_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+# single byte varints, used for most lengths and header values
+_SMALL_VARINTS = [bytes((value,)) for value in range(0x80)]
+
+
+def encode_varint(value: int) -> bytes:
+    if value < 0:
+        # negative int32/int64 values are encoded as 64 bit two's complement
+        value += 1 << 64
+    if value < 0x80:
+        return _SMALL_VARINTS[value]
+    result = bytearray()
+    while value > 0x7f:
+        result.append((value & 0x7f) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def skip_field(data, pos, wire_type):
+    if wire_type == 0:
+        _, pos = read_varint(data, pos)
+    elif wire_type == 1:
+        pos += 8
+    elif wire_type == 2:
+        length, pos = read_varint(data, pos)
+        pos += length
+    elif wire_type == 5:
+        pos += 4
+    else:
+        raise ValueError(f"unsupported wire type {wire_type}")
+    return pos
+
+
+class HeaderInfo:
+    # fields of a Header read by the scanner, the complete Header message is only parsed on demand
+    __slots__ = ("cmd_func", "cmd_id", "device_sn", "seq", "pdata", "_payload", "_start", "_end", "_message")
+
+    def __init__(self, cmd_func=0, cmd_id=0, device_sn=None, seq=0, pdata=None, payload=None, start=0, end=0, message=None):
+        self.cmd_func = cmd_func
+        self.cmd_id = cmd_id
+        self.device_sn = device_sn
+        self.seq = seq
+        self.pdata = pdata
+        self._payload = payload
+        self._start = start
+        self._end = end
+        self._message = message
+
+    @property
+    def size(self) -> int:
+        return self._end - self._start
+
+    @property
+    def message(self):
+        if self._message is None:
+            self._message = powerstream.Header()
+            self._message.ParseFromString(bytes(self._payload[self._start:self._end]))
+        return self._message
+
+    @staticmethod
+    def from_message(message):
+        return HeaderInfo(cmd_func=message.cmd_func, cmd_id=message.cmd_id, device_sn=message.device_sn, seq=message.seq,
+                          pdata=message.pdata, start=0, end=message.ByteSize(), message=message)
+
+
+def scan_headers(payload):
+    # returns a HeaderInfo for all headers of a SendHeaderMsg without parsing the whole message,
+    # None if the payload cannot be scanned. Pass a memoryview to avoid copying the pdata.
+    try:
+        headers = []
+        pos = 0
+        while pos < len(payload):
+            if payload[pos] != _PROTO_START:
+                return None
+            length, start = read_varint(payload, pos + 1)
+            end = start + length
+            if end > len(payload):
+                return None
+            headers.append(scan_header(payload, start, end))
+            pos = end
+        return headers
+    except (IndexError, ValueError, UnicodeDecodeError):
+        return None
+
+
+def merge_payloads(older: bytes, newer: bytes) -> bytes:
+    # merges two messages with one header each into one message, the header fields are taken from
+    # the newer message. The pdata of both are concatenated, which is parsed like older.MergeFrom(newer):
+    # fields that the newer (partial) message does not contain keep the value of the older one.
+    # Repeated fields would be appended, so only messages without repeated fields may be merged.
+    older_headers = scan_headers(older)
+    if older_headers is None or len(older_headers) != 1:
+        return newer
+    message = powerstream.SendHeaderMsg.FromString(newer)
+    if len(message.msg) != 1:
+        return newer
+    header = message.msg[0]
+    header.pdata = bytes(older_headers[0].pdata) + header.pdata
+    if header.HasField("data_len"):
+        header.data_len = len(header.pdata)
+    return message.SerializeToString()
+
+
+def scan_header(payload, start, end):
+    header = HeaderInfo(payload=payload, start=start, end=end)
+    pos = start
+    while pos < end:
+        tag, pos = read_varint(payload, pos)
+        field_number = tag >> 3
+        wire_type = tag & 0x07
+        if field_number == _HEADER_CMD_FUNC and wire_type == 0:
+            header.cmd_func, pos = read_varint(payload, pos)
+        elif field_number == _HEADER_CMD_ID and wire_type == 0:
+            header.cmd_id, pos = read_varint(payload, pos)
+        elif field_number == _HEADER_SEQ and wire_type == 0:
+            header.seq, pos = read_varint(payload, pos)
+            if header.seq >= 1 << 63:
+                # negative int32
+                header.seq -= 1 << 64
+        elif field_number == _HEADER_DEVICE_SN and wire_type == 2:
+            length, pos = read_varint(payload, pos)
+            header.device_sn = bytes(payload[pos:pos+length]).decode("utf-8")
+            pos += length
+        elif field_number == _HEADER_PDATA and wire_type == 2:
+            length, pos = read_varint(payload, pos)
+            header.pdata = payload[pos:pos+length]
+            pos += length
+        else:
+            pos = skip_field(payload, pos, wire_type)
+    if pos != end:
+        raise ValueError("header exceeds message boundary")
+    return header
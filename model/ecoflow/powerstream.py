@@ -2,7 +2,8 @@ from model.ecoflow.base_device import EcoflowDevice
 from model.connector import Connector
 
 from homie.node.node_base import Node_Base
-from homie.node.property.property_integer import Property_Integer
+from model.homie.device import Store_Integer
+from model.value_store import INT
 
 import model.protos.powerstream_pb2 as powerstream
 import model.protos.wn511_socket_sys_pb2 as wn511
@@ -14,6 +15,9 @@ import datetime
 _LOGGER = logging.getLogger(__name__)
 _LOGGER.setLevel(logging.DEBUG)
 
+# daily energy values, kept in the value store of the connector
+ENERGY_VALUES = ["today_total", "today_to_plugs", "today_from_battery", "today_to_battery", "today_from_solar", "today_from_pv1", "today_from_pv2"]
+
 class Ecoflow_Powerstream(EcoflowDevice):
     def __init__(self, serial: str, user_id: str, stdscr=None):
         super().__init__(serial, user_id, stdscr, uses_protobuf=True)
@@ -31,55 +35,81 @@ class Ecoflow_Powerstream(EcoflowDevice):
         proto_message = powerstream.InverterHeartbeat()
         proto_message2 = powerstream.InverterHeartbeat2()
         self.connector.set_proto_message(proto_message)
-        self.connector.on("set_request", self.on_set_request)
+        self.connector.add_proto_message(proto_message2)
+        for name in ENERGY_VALUES:
+            self.connector.values.layout.add(name, INT)
+        self.connector.on("set_request", self.coalesce_set_request)
+        self.set_state_names.update({
+            "permanent-watts": "permanentWatts",
+            "upper-limit": "upperLimit",
+            "lower-limit": "lowerLimit",
+            "inv-brightness": "invBrightness",
+            "supply-priority": "supplyPriority",
+            "feed-priority": "feedPriority"
+        })
+        self.daily_values.update(ENERGY_VALUES)
         fields = [x.name for x in proto_message.DESCRIPTOR.fields]
         for x in proto_message2.DESCRIPTOR.fields:
             fields.append(x.name)
         self.connector.init_screen(fields)
         self.customize_homie()
+        self.restore_state()
         self.connector.start()
         self.default_cmd_func = CmdFuncs.POWERSTREAM
         self.add_cmd_id_handler(self.handle_heartbeat, [CmdIds.HEARTBEAT, CmdIds.HEARTBEAT2])
         self.add_cmd_id_handler(self.handle_energy_total_report, [CmdIds.ENERGY_TOTAL_REPORT], CmdFuncs.REPORTS)
+        # the energy reports are not merged, each of them may contain other watth items
+        self.coalesce_cmd_ids.update([
+            (CmdFuncs.POWERSTREAM, CmdIds.HEARTBEAT),
+            (CmdFuncs.POWERSTREAM, CmdIds.HEARTBEAT2)
+        ])
 
     def init_subscriptions(self):        
         super().init_subscriptions()
-        self.request_data()
+        self.request_initial_data()
 
     def customize_homie(self):
         homie = self.connector.homie_device
         if homie is None:
             return
 
+        values = self.connector.values
         node = Node_Base(homie, "energy", "Energy", "energy")
         homie.add_node(node)
         _LOGGER.debug(f"node {node.id} has been added")
 
-        self.today_total = Property_Integer(node, "today-total", name="Today total", unit="Wh", value=0, settable=False)
+        self.today_total = Store_Integer(node, "today-total", name="Today total", unit="Wh", value=0, settable=False)
+        self.today_total.bind(values, values.layout.slot("today_total"))
         node.add_property(self.today_total)
         _LOGGER.debug(f"property {self.today_total.name} has been added to node {node.name}")
 
-        self.today_to_plugs = Property_Integer(node, "today-to-plugs", name="Today to plugs", unit="Wh", value=0, settable=False)
+        self.today_to_plugs = Store_Integer(node, "today-to-plugs", name="Today to plugs", unit="Wh", value=0, settable=False)
+        self.today_to_plugs.bind(values, values.layout.slot("today_to_plugs"))
         node.add_property(self.today_to_plugs)
         _LOGGER.debug(f"property {self.today_to_plugs.name} has been added to node {node.name}")
 
-        self.today_from_battery = Property_Integer(node, "today-from-battery", name="Today from battery", unit="Wh", value=0, settable=False)
+        self.today_from_battery = Store_Integer(node, "today-from-battery", name="Today from battery", unit="Wh", value=0, settable=False)
+        self.today_from_battery.bind(values, values.layout.slot("today_from_battery"))
         node.add_property(self.today_from_battery)
         _LOGGER.debug(f"property {self.today_from_battery.name} has been added to node {node.name}")
 
-        self.today_to_battery = Property_Integer(node, "today-to-battery", name="Today to battery", unit="Wh", value=0, settable=False)
+        self.today_to_battery = Store_Integer(node, "today-to-battery", name="Today to battery", unit="Wh", value=0, settable=False)
+        self.today_to_battery.bind(values, values.layout.slot("today_to_battery"))
         node.add_property(self.today_to_battery)
         _LOGGER.debug(f"property {self.today_to_battery.name} has been added to node {node.name}")
 
-        self.today_from_solar = Property_Integer(node, "today-from-solar", name="Today from solar", unit="Wh", value=0, settable=False)
+        self.today_from_solar = Store_Integer(node, "today-from-solar", name="Today from solar", unit="Wh", value=0, settable=False)
+        self.today_from_solar.bind(values, values.layout.slot("today_from_solar"))
         node.add_property(self.today_from_solar)
         _LOGGER.debug(f"property {self.today_from_solar.name} has been added to node {node.name}")
 
-        self.today_from_pv1 = Property_Integer(node, "today-from-pv1", name="Today from PV1", unit="Wh", value=0, settable=False)
+        self.today_from_pv1 = Store_Integer(node, "today-from-pv1", name="Today from PV1", unit="Wh", value=0, settable=False)
+        self.today_from_pv1.bind(values, values.layout.slot("today_from_pv1"))
         node.add_property(self.today_from_pv1)
         _LOGGER.debug(f"property {self.today_from_pv1.name} has been added to node {node.name}")
 
-        self.today_from_pv2 = Property_Integer(node, "today-from-pv2", name="Today from PV2", unit="Wh", value=0, settable=False)
+        self.today_from_pv2 = Store_Integer(node, "today-from-pv2", name="Today from PV2", unit="Wh", value=0, settable=False)
+        self.today_from_pv2.bind(values, values.layout.slot("today_from_pv2"))
         node.add_property(self.today_from_pv2)
         _LOGGER.debug(f"property {self.today_from_pv2.name} has been added to node {node.name}")
 
@@ -102,37 +132,41 @@ class Ecoflow_Powerstream(EcoflowDevice):
                 self.set_today_from_pv2(sum(item.watth))
             else:
                 _LOGGER.warning("unhandled watth_type: %s, sum: %s" % (item.watth_type, sum(item.watth)))    
+        self.connector.end_update()
+
+    def set_energy_value(self, name, val) -> bool:
+        values = self.connector.values
+        if values.get_value(name) == val:
+            return False
+        values.set_value(name, val)
+        property = getattr(self, name)
+        if property is not None:
+            # published with the next flush, like the values of the heartbeats
+            self.connector.homie_device.set_property_value(property, val)
+        return True
 
     def set_today_from_battery(self, val):
-        if self.today_from_battery.value != val:
-            self.today_from_battery.value = val
+        if self.set_energy_value("today_from_battery", val):
             self.update_today_from_solar()
 
     def set_today_to_plugs(self, val):
-        if self.today_to_plugs.value != val:
-            self.today_to_plugs.value = val
+        self.set_energy_value("today_to_plugs", val)
 
     def set_today_to_battery(self, val):
-        if self.today_to_battery.value != val:
-            self.today_to_battery.value = val
+        self.set_energy_value("today_to_battery", val)
 
     def set_today_from_pv1(self, val):
-        if self.today_from_pv1.value != val:
-            self.today_from_pv1.value = val
+        self.set_energy_value("today_from_pv1", val)
 
     def set_today_from_pv2(self, val):
-        if self.today_from_pv2.value != val:
-            self.today_from_pv2.value = val
+        self.set_energy_value("today_from_pv2", val)
 
     def set_today_total(self, val):
-        if self.today_total.value != val:
-            self.today_total.value = val
+        if self.set_energy_value("today_total", val):
             self.update_today_from_solar()
 
     def update_today_from_solar(self):
-        val = self.today_total.value - self.today_from_battery.value
-        if self.today_from_solar.value != val:
-            self.today_from_solar.value = val            
+        self.set_energy_value("today_from_solar", self.get_value("today_total", 0) - self.get_value("today_from_battery", 0))
 
     def on_set_request(self, id, value):
         _LOGGER.debug(f"received set-request for {id} with value: {value}")
@@ -157,46 +191,31 @@ class Ecoflow_Powerstream(EcoflowDevice):
     def set_output_power(self, power):
         pdata = wn511.permanent_watts_pack()
         pdata.permanent_watts = min(round(self.get_value("ratedPower", default=800)*10), max(0, round(power * 10)))
-        self.send_set(pdata, CmdIds.SET_PERMANENT_WATTS)
+        return self.send_set(pdata, CmdIds.SET_PERMANENT_WATTS)
 
     def set_bat_lower(self, limit):
         pdata = wn511.bat_lower_pack()
         pdata.lower_limit = max(0, min(30, limit))
-        self.send_set(pdata, CmdIds.SET_BAT_LOWER)
+        return self.send_set(pdata, CmdIds.SET_BAT_LOWER)
 
     def set_bat_upper(self, limit):
         pdata = wn511.bat_upper_pack()
         pdata.upper_limit = max(50, min(100, limit))
-        self.send_set(pdata, CmdIds.SET_BAT_UPPER)
+        return self.send_set(pdata, CmdIds.SET_BAT_UPPER)
 
     def set_brightness(self, value):
         pdata = wn511.brightness_pack()
         pdata.brightness = max(0, min(100, value))
-        self.send_set(pdata, CmdIds.SET_BRIGHTNESS)
+        return self.send_set(pdata, CmdIds.SET_BRIGHTNESS)
 
     def set_supply_priority(self, value):
         if value >= 0 and value <= 1:
             pdata = powerstream.SetValue()
             pdata.value = value
-            self.send_set(pdata, CmdIds.SET_SUPPLY_PRIORITY)        
+            return self.send_set(pdata, CmdIds.SET_SUPPLY_PRIORITY)        
 
     def set_feed_priority(self, value):
         if value >= 0 and value <= 1:
             pdata = powerstream.SetValue()
             pdata.value = value
-            self.send_set(pdata, CmdIds.SET_FEED_PRIORITY)        
-
-    def send_set(self, pdata, cmd_id):
-        message = powerstream.SendHeaderMsg()
-        header = message.msg.add()
-        header.src = DEFAULT_SRC
-        header.dest = DEFAULT_DEST
-        header.cmd_func = CmdFuncs.POWERSTREAM
-        header.cmd_id = cmd_id
-        header.pdata = pdata.SerializeToString()
-        header.data_len = len(header.pdata)
-        header.need_ack = 1
-        header.seq = self.generate_seq()
-        header.device_sn = self.device_sn
-        #self.log_raw("SET AC", message.SerializeToString(), message, pdata)
-        self.client.publish(self._set_topic, message.SerializeToString())
+            return self.send_set(pdata, CmdIds.SET_FEED_PRIORITY)
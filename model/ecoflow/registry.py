@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+from model.ecoflow.constant import *
+
+CONFIG_FOLDER = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'protos')
+
+PLATFORM = "model.protos.platform_pb2"
+POWERSTREAM = "model.protos.powerstream_pb2"
+WN511 = "model.protos.wn511_socket_sys_pb2"
+
+# cmd_func -> cmd_id -> (module, name) of the message class of the pdata, the module
+# is imported when the first message of the type is decoded
+PDATA_MESSAGES = {
+    CmdFuncs.SMART_PLUG: {
+        CmdIds.PLUG_HEARTBEAT: (WN511, "plug_heartbeat_pack"),
+        CmdIds.TIME_TASK_CONFIG: (WN511, "time_task_config_post"),
+        CmdIds.SET_PLUG_SWITCH: (WN511, "plug_switch_message"),
+        CmdIds.SET_PLUG_BRIGHTNESS: (WN511, "brightness_pack"),
+        CmdIds.SET_UNKNOWN_135: (POWERSTREAM, "SetValue"),
+        CmdIds.SET_MAX_WATTS: (WN511, "max_watts_pack"),
+        CmdIds.SET_MESH_ENABLE: (WN511, "mesh_ctrl_pack"),
+        CmdIds.PLUG_POWER_PACK: (WN511, "PowerPack"),
+        CmdIds.INCLUDE_PLUG: (WN511, "include_plug")
+    },
+    CmdFuncs.POWERSTREAM: {
+        CmdIds.HEARTBEAT: (POWERSTREAM, "InverterHeartbeat"),
+        CmdIds.HEARTBEAT2: (POWERSTREAM, "InverterHeartbeat2"),
+        CmdIds.SET_PERMANENT_WATTS: (WN511, "permanent_watts_pack"),
+        CmdIds.SET_SUPPLY_PRIORITY: (POWERSTREAM, "SetValue"),
+        CmdIds.SET_BAT_LOWER: (WN511, "bat_lower_pack"),
+        CmdIds.SET_BAT_UPPER: (WN511, "bat_upper_pack"),
+        CmdIds.SET_PLUG_BRIGHTNESS: (WN511, "brightness_pack"),
+        CmdIds.SET_UNKNOWN_136: (POWERSTREAM, "SetValue"),
+        CmdIds.SET_UNKNOWN_138: (POWERSTREAM, "SetValue"),
+    },
+    32: {
+        11: (POWERSTREAM, "SetValue"),
+    },
+    CmdFuncs.REPORTS: {
+        16: (PLATFORM, "EventRecordReport"),
+        CmdIds.ENERGY_TOTAL_REPORT: (PLATFORM, "BatchEnergyTotalReport")
+    }
+}
+
+# device type in config.json -> (module, name) of the device class, the module is imported
+# when the first device of the type is created
+DEVICE_TYPES = {
+    "powerstream": ("model.ecoflow.powerstream", "Ecoflow_Powerstream"),
+    "smart-plug": ("model.ecoflow.smart_plug", "Ecoflow_Smartplug"),
+    "delta-max": ("model.ecoflow.delta_max", "Ecoflow_DeltaMax")
+}
+# device types that can be simulated ("simulated": true), all others are created as real devices
+SIMULATED_DEVICE_TYPES = {
+    "smart-plug": ("model.ecoflow.smart_plug", "Simulated_Ecoflow_Smartplug")
+}
+
+# (module, name) -> message class
+_classes = {}
+# message objects used for parsing, one per message class and thread
+_scratch = threading.local()
+
+_configs = {}
+_configs_lock = threading.Lock()
+
+
+def _resolve(entry):
+    module, name = entry
+    # __import__ instead of importlib.import_module, so the import shows up in the startup profile
+    return getattr(__import__(module, fromlist=[name]), name)
+
+
+def get_pdata_class(cmd_func, cmd_id):
+    messages = PDATA_MESSAGES.get(cmd_func)
+    entry = messages.get(cmd_id) if messages is not None else None
+    if entry is None:
+        return None
+    message_class = _classes.get(entry)
+    if message_class is None:
+        message_class = _classes[entry] = _resolve(entry)
+    return message_class
+
+
+def get_device_class(type: str, simulated: bool = False):
+    # None for unknown types
+    entry = SIMULATED_DEVICE_TYPES.get(type) if simulated else None
+    if entry is None:
+        entry = DEVICE_TYPES.get(type)
+    return _resolve(entry) if entry is not None else None
+
+
+def get_pdata_message(cmd_func, cmd_id):
+    # the returned message is reused for the next message of the same type in this thread,
+    # copy it if it is needed after the handlers have returned
+    message_class = get_pdata_class(cmd_func, cmd_id)
+    if message_class is None:
+        return None
+    messages = getattr(_scratch, "messages", None)
+    if messages is None:
+        messages = _scratch.messages = {}
+    message = messages.get(message_class)
+    if message is None:
+        message = messages[message_class] = message_class()
+    return message
+
+
+def load_config(path: str):
+    # parsed json file, read once and shared by all devices (do not modify)
+    path = os.path.realpath(path)
+    with _configs_lock:
+        if path not in _configs:
+            with open(path) as f:
+                _configs[path] = json.load(f)
+        return _configs[path]
+
+
+def get_device_config(name: str) -> dict:
+    return load_config(os.path.join(CONFIG_FOLDER, f"{name}.json"))
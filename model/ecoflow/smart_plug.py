@@ -1,10 +1,9 @@
 from model.ecoflow.base_device import EcoflowDevice
 from model.connector import Connector
 from model.protos.wn511_socket_sys_pb2 import plug_switch_message, plug_heartbeat_pack, brightness_pack, max_watts_pack, plug_ack_message
-from model.protos.powerstream_pb2 import SendHeaderMsg 
 from model.ecoflow.constant import *
 import logging
-from model.utils.interval import InvervalTimer
+from model.utils.scheduler import get_scheduler
 
 _LOGGER = logging.getLogger(__name__)
 _LOGGER.setLevel(logging.DEBUG)
@@ -14,12 +13,19 @@ class Ecoflow_Smartplug(EcoflowDevice):
         super().__init__(serial, user_id, stdscr=stdscr, is_simulated=is_simulated, uses_protobuf=True)
         self.default_cmd_func = CmdFuncs.SMART_PLUG
         self.connector = Connector(self.device_sn, "smartplug", name="Smart-Plug", screen=stdscr)
-        proto_message = self.get_pdata_message(CmdFuncs.SMART_PLUG, CmdIds.PLUG_HEARTBEAT)
-        self.connector.set_proto_message(proto_message)
-        self.connector.on("set_request", self.on_set_request)
+        self.connector.set_proto_message(plug_heartbeat_pack())
+        self.connector.on("set_request", self.coalesce_set_request)
+        # the brightness is reported in another scale than it is set
+        self.set_state_names.update({
+            "switch": "switch",
+            "max-watts": "max_watts"
+        })
+        self.restore_state()
         self.connector.start()
 
         self.add_cmd_id_handler(self.handle_heartbeat, [CmdIds.PLUG_HEARTBEAT])
+        if not is_simulated:
+            self.coalesce_cmd_ids.add((CmdFuncs.SMART_PLUG, CmdIds.PLUG_HEARTBEAT))
 
     def on_set_request(self, id, value):
         if id == "switch":
@@ -31,39 +37,24 @@ class Ecoflow_Smartplug(EcoflowDevice):
 
     def init_subscriptions(self):        
         super().init_subscriptions()
-        self.request_data()
+        self.request_initial_data()
 
     def set_brightness(self, value):
         pdata = brightness_pack()
         value = max(0, min(100, value))
         pdata.brightness = int(value * 10.23)
-        self.send_set(pdata, CmdIds.SET_PLUG_BRIGHTNESS)
+        return self.send_set(pdata, CmdIds.SET_PLUG_BRIGHTNESS)
 
     def set_max_watts(self, value):
         pdata = max_watts_pack()
         pdata.max_watts = max(0, min(PLUG_MAX_WATTS_LIMIT, value))
-        self.send_set(pdata, CmdIds.SET_MAX_WATTS)        
+        return self.send_set(pdata, CmdIds.SET_MAX_WATTS)        
 
     def set_plug_switch(self, on: bool):
         pdata = plug_switch_message()
         pdata.plug_switch = 1 if on is True else 0
 
-        self.send_set(pdata, CmdIds.SET_PLUG_SWITCH)      
-
-    def send_set(self, pdata, cmd_id):
-        message = SendHeaderMsg()
-        header = message.msg.add()
-        header.src = DEFAULT_SRC
-        header.dest = DEFAULT_DEST
-        header.cmd_func = CmdFuncs.SMART_PLUG
-        header.cmd_id = cmd_id
-        header.pdata = pdata.SerializeToString()
-        header.data_len = len(header.pdata)
-        header.need_ack = 1
-        header.seq = self.generate_seq()
-        header.device_sn = self.device_sn
-        #self.log_raw("SET AC", message.SerializeToString(), message, pdata)
-        self.client.publish(self._set_topic, message.SerializeToString())
+        return self.send_set(pdata, CmdIds.SET_PLUG_SWITCH)
 
 
 class Simulated_Ecoflow_Smartplug(Ecoflow_Smartplug):    
@@ -92,17 +83,20 @@ class Simulated_Ecoflow_Smartplug(Ecoflow_Smartplug):
 
         self.add_cmd_id_handler(self.handle_data_request, [0])
 
-        self._timer = InvervalTimer(self._states["heartbeat_frequency"], self.flush_changes)
         _LOGGER.debug(f"starting timer with {self._states['heartbeat_frequency']} seconds interval.")
-        self._timer.start()
+        self._flush_timer = get_scheduler().call_every(self._states["heartbeat_frequency"], self.flush_changes, jitter=1)
 
     def init_subscriptions(self):        
         self.client.subscribe(self._set_topic, self)
         self.client.subscribe(self._get_topic, self)
 
+    def stop(self):
+        super().stop()
+        self._flush_timer.cancel()
+
     def handle_data_request(self, pdata, header):
         pdata = plug_heartbeat_pack()
-        for name, value in self._states.entries():
+        for name, value in self._states.items():
             setattr(pdata, name, value)
         self.send_heartbeat(pdata)
 
@@ -137,22 +131,6 @@ class Simulated_Ecoflow_Smartplug(Ecoflow_Smartplug):
 
 
     def send_heartbeat(self, pdata, is_reply=True):
-        message = SendHeaderMsg()
-        header = message.msg.add()
-        header.src = DEFAULT_DEST
-        header.dest = DEFAULT_SRC
-        header.d_src = 1
-        header.d_dest = 1
-        header.cmd_func = CmdFuncs.SMART_PLUG
-        header.cmd_id = CmdIds.PLUG_HEARTBEAT
-        header.pdata = pdata.SerializeToString()
-        header.data_len = len(header.pdata)
-        header.need_ack = 1
-        header.version = 3
-        header.payload_ver = 3
-        header.seq = self.generate_seq()
-        header.device_sn = self.device_sn
-        #self.log_raw("SET AC", message.SerializeToString(), message, pdata)
-        self.client.publish(self._get_reply_topic if is_reply else self._data_topic, message.SerializeToString())
-
-        
+        encoder = self.get_encoder(CmdFuncs.SMART_PLUG, CmdIds.PLUG_HEARTBEAT, src=DEFAULT_DEST, dest=DEFAULT_SRC, d_src=1, d_dest=1,
+                                   need_ack=1, version=3, payload_ver=3)
+        self.client.publish(self._get_reply_topic if is_reply else self._data_topic, encoder.encode(pdata.SerializeToString(), self.generate_seq()))
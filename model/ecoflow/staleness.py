@@ -0,0 +1,196 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from model.utils.scheduler import get_scheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+# minimum delay between two data requests (seconds) and the random delay added to it
+REQUEST_STAGGER = float(os.getenv("EF_REQUEST_STAGGER")) if os.getenv("EF_REQUEST_STAGGER") is not None else 0.2
+REQUEST_JITTER = float(os.getenv("EF_REQUEST_JITTER")) if os.getenv("EF_REQUEST_JITTER") is not None else 0.1
+# a device that has not sent anything for this many seconds is asked for its data
+STALE_AFTER = float(os.getenv("EF_STALE_AFTER")) if os.getenv("EF_STALE_AFTER") is not None else 120
+# no request is sent to a device that has sent data within this many seconds
+REQUEST_SKIP_RECENT = float(os.getenv("EF_REQUEST_SKIP_RECENT")) if os.getenv("EF_REQUEST_SKIP_RECENT") is not None else 30
+# a request without answer is repeated after this many seconds at the earliest
+REQUEST_TIMEOUT = 60
+# how often the devices are checked (seconds)
+CHECK_INTERVAL = 10
+# upper bounds (seconds) of the staleness histogram
+STALENESS_BUCKETS = [30, 120, 600, 3600]
+
+
+# Requests the current data from devices that have not sent anything for a while. The requests
+# of the whole fleet go through one queue (oldest data first) and are sent at a bounded rate,
+# so a reconnect or a broker outage does not cause a burst of requests.
+class StalenessTracker:
+    def __init__(self, client) -> None:
+        self.client = client
+        self._lock = threading.Lock()
+        # (last seen, sequence, device) of the devices waiting for a request
+        self._queue = []
+        self._queued = set()
+        self._sequence = 0
+        # device -> time of the last request that has not been answered yet
+        self._outstanding = {}
+        self._sender = None
+        self._check_task = None
+        self._sent_times = deque()
+        self.stats_counters = {
+            "requested": 0,
+            "sent": 0,
+            "skipped_recent": 0,
+            "skipped_restored": 0,
+            "deduplicated": 0,
+            "failed": 0
+        }
+
+    def start(self):
+        if self._check_task is None:
+            self._check_task = get_scheduler().call_every(CHECK_INTERVAL, self.check, jitter=CHECK_INTERVAL / 10)
+
+    def stop(self):
+        with self._lock:
+            if self._check_task is not None:
+                self._check_task.cancel()
+                self._check_task = None
+            self.pause()
+
+    def pause(self):
+        # e.g. while disconnected, the queue is kept
+        if self._sender is not None:
+            self._sender.cancel()
+            self._sender = None
+
+    def get_age(self, device, now=None) -> float:
+        # seconds since the device has sent something, None if it never has
+        if device.last_seen is None:
+            return None
+        return (now if now is not None else time.time()) - device.last_seen
+
+    def is_outstanding(self, device, now) -> bool:
+        sent = self._outstanding.get(device)
+        if sent is None:
+            return False
+        if (device.last_seen is not None and device.last_seen >= sent) or now - sent >= REQUEST_TIMEOUT:
+            # answered or timed out
+            del self._outstanding[device]
+            return False
+        return True
+
+    def request(self, device):
+        with self._lock:
+            self._request(device, time.time())
+            self._start_sender()
+
+    def request_all(self):
+        now = time.time()
+        with self._lock:
+            for device in self.client.get_devices():
+                self._request(device, now)
+            self._start_sender()
+
+    def check(self):
+        now = time.time()
+        with self._lock:
+            for device in list(self._outstanding.keys()):
+                self.is_outstanding(device, now)
+            for device in self.client.get_devices():
+                age = self.get_age(device, now)
+                if age is None or age > STALE_AFTER:
+                    self._request(device, now)
+            self._start_sender()
+
+    def _request(self, device, now):
+        self.stats_counters["requested"] += 1
+        if getattr(device, "stopped", False):
+            return
+        if device in self._queued or self.is_outstanding(device, now):
+            self.stats_counters["deduplicated"] += 1
+            return
+        self._sequence += 1
+        heapq.heappush(self._queue, (device.last_seen if device.last_seen is not None else 0, self._sequence, device))
+        self._queued.add(device)
+
+    def _start_sender(self):
+        if self._sender is None and self._queue and self.client.connected:
+            self._sender = get_scheduler().call_later(0, self._send_next)
+
+    def _send_next(self):
+        with self._lock:
+            self._sender = None
+            if not self.client.connected:
+                return
+            now = time.time()
+            device = None
+            while self._queue and device is None:
+                _, _, device = heapq.heappop(self._queue)
+                self._queued.discard(device)
+                age = self.get_age(device, now)
+                if age is not None and age < REQUEST_SKIP_RECENT:
+                    # the device has sent data in the meantime
+                    self.stats_counters["skipped_recent"] += 1
+                    device = None
+                elif age is not None and age < STALE_AFTER and getattr(device, "restored_at", None) is not None:
+                    # the values of the previous run are recent enough, check() requests
+                    # the data if the device does not send anything before they are stale
+                    self.stats_counters["skipped_restored"] += 1
+                    device = None
+            if device is not None:
+                self._outstanding[device] = now
+                self.stats_counters["sent"] += 1
+                self._sent_times.append(now)
+            if self._queue:
+                self._sender = get_scheduler().call_later(REQUEST_STAGGER, self._send_next, jitter=REQUEST_JITTER)
+        if device is not None:
+            try:
+                device.request_data()
+            except Exception as err:
+                self.stats_counters["failed"] += 1
+                _LOGGER.error(f"data request for {device.device_sn} failed: {err}")
+
+    def request_rate(self, now=None) -> float:
+        # requests per second during the last minute
+        now = now if now is not None else time.time()
+        while self._sent_times and self._sent_times[0] < now - 60:
+            self._sent_times.popleft()
+        return len(self._sent_times) / 60
+
+    def staleness(self, now=None) -> dict:
+        now = now if now is not None else time.time()
+        ages = []
+        histogram = {f"<{limit}s": 0 for limit in STALENESS_BUCKETS}
+        histogram[f">={STALENESS_BUCKETS[-1]}s"] = 0
+        histogram["never"] = 0
+        for device in self.client.get_devices():
+            age = self.get_age(device, now)
+            if age is None:
+                histogram["never"] += 1
+                continue
+            ages.append(age)
+            for limit in STALENESS_BUCKETS:
+                if age < limit:
+                    histogram[f"<{limit}s"] += 1
+                    break
+            else:
+                histogram[f">={STALENESS_BUCKETS[-1]}s"] += 1
+        ages.sort()
+        return {
+            "histogram": histogram,
+            "median": round(ages[len(ages) // 2], 1) if ages else None,
+            "p90": round(ages[int(len(ages) * 0.9)], 1) if ages else None,
+            "max": round(ages[-1], 1) if ages else None
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.time()
+            return dict(self.stats_counters,
+                        queued=len(self._queue),
+                        outstanding=len(self._outstanding),
+                        request_rate=round(self.request_rate(now), 3),
+                        staleness=self.staleness(now))
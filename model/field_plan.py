@@ -0,0 +1,84 @@
+import math
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List
+
+import model.protos.options_pb2 as options
+
+
+@lru_cache(maxsize=None)
+def get_property_id(id, name):
+    if id != "" and id is not None:
+        return id
+    name = re.sub('[^0-9a-zA-Z]+', '-', name)
+    # CamelCase to camel-case
+    return re.sub(r'(?<!^)(?=[A-Z])', '-', name).lower()
+
+
+class FieldPlan:
+    __slots__ = ("number", "name", "descriptor", "options", "divisor", "unit", "converter", "node", "id", "derived_fields",
+                 "deadband", "relative_deadband", "max_silence")
+
+    def __init__(self, descriptor):
+        mapping_options = descriptor.GetOptions().Extensions[options.mapping_options]
+        self.number = descriptor.number
+        self.name = descriptor.name
+        self.descriptor = descriptor
+        self.options = mapping_options
+        self.divisor = mapping_options.divisor if mapping_options.divisor > 1 else 1
+        self.unit = mapping_options.unit
+        self.converter = mapping_options.converter if mapping_options.converter != "" else None
+        self.node = mapping_options.node
+        self.id = get_property_id(mapping_options.id, descriptor.name)
+        # the options are float32, 0.1 would be 0.10000000149
+        self.deadband = float(f"{mapping_options.deadband:.6g}")
+        self.relative_deadband = float(f"{mapping_options.relative_deadband:.6g}")
+        self.max_silence = mapping_options.max_silence if mapping_options.HasField("max_silence") else None
+        # names of the derived fields that must be recalculated when this field changes
+        self.derived_fields: List[str] = []
+
+    def convert(self, val):
+        display_val = None
+        if self.converter == "minutes":
+            # time in minutes
+            h = math.floor(val/60)
+            m = val % 60
+            display_val = "%02d:%02d" % (h, m)
+        if self.divisor != 1:
+            val = val / self.divisor
+        return val, display_val
+
+
+class MessagePlan:
+    def __init__(self, message_descriptor):
+        self.name = message_descriptor.full_name
+        message_options = message_descriptor.GetOptions()
+        self.homie_nodes = list(message_options.Extensions[options.homie_node])
+        self.derived_fields = list(message_options.Extensions[options.derived_field])
+        self.fields: Dict[int, FieldPlan] = {}
+        self.fields_by_name: Dict[str, FieldPlan] = {}
+        for descriptor in message_descriptor.fields:
+            field = FieldPlan(descriptor)
+            self.fields[field.number] = field
+            self.fields_by_name[field.name] = field
+        for derived_field in self.derived_fields:
+            for name in derived_field.fields:
+                if name in self.fields_by_name:
+                    self.fields_by_name[name].derived_fields.append(derived_field.field_name)
+
+
+_message_plans: Dict[str, MessagePlan] = {}
+_message_plans_lock = threading.Lock()
+
+
+def get_message_plan(message_descriptor) -> MessagePlan:
+    plan = _message_plans.get(message_descriptor.full_name)
+    if plan is None:
+        # the field plans are used as keys, there must be only one plan per message type
+        with _message_plans_lock:
+            plan = _message_plans.get(message_descriptor.full_name)
+            if plan is None:
+                plan = MessagePlan(message_descriptor)
+                _message_plans[message_descriptor.full_name] = plan
+    return plan
@@ -1,9 +1,12 @@
 from homie.device_base import Device_Base
 from homie.node.node_base import Node_Base
-import model.protos.options_pb2 as options
+from model.field_plan import get_message_plan, get_property_id
 import logging
-import re
+import datetime
 import json
+import os
+import threading
+import time
 
 from homie.node.property.property_integer import Property_Integer
 from homie.node.property.property_float import Property_Float
@@ -12,10 +15,17 @@ from homie.node.property.property_enum import Property_Enum
 from homie.node.property.property_string import Property_String
 from homie.node.property.property_battery import Property_Battery
 from model.utils.event_emitter import EventEmitter
+from model.utils.token_bucket import TokenBucket
+from model.utils.scheduler import get_scheduler
+from model.value_store import ValueStore, StoreLayout, FLOAT
 
 _LOGGER = logging.getLogger(__name__)
 _LOGGER.setLevel(logging.DEBUG)
 
+# rate limit for property publishes shared by all devices (messages per second, 0 = unlimited)
+publish_bucket = TokenBucket(float(os.getenv("HOMIE_PUBLISH_RATE")) if os.getenv("HOMIE_PUBLISH_RATE") is not None else 0,
+                             float(os.getenv("HOMIE_PUBLISH_BURST")) if os.getenv("HOMIE_PUBLISH_BURST") is not None else None)
+
 class Mapped_Device(Device_Base, EventEmitter):
     def __init__(
         self,
@@ -25,14 +35,55 @@ class Mapped_Device(Device_Base, EventEmitter):
         homie_settings=None,
         mqtt_settings=None,
         temp_unit="C", 
-        simulated=False      
+        simulated=False,
+        values=None
     ):
         super().__init__(device_id, name, homie_settings, mqtt_settings)
         EventEmitter.__init__(self)
         self.temp_unit = temp_unit
         self.simulated = simulated
+        # the property values are read from the value store of the connector
+        self.values = values if values is not None else ValueStore(StoreLayout("homie"))
+
+        # property values collected during an update, published in flush()
+        self._pending = {}
+        self._pending_since = None
+        self._window_published = 0
+        self._flush_timer = None
+        self._publish_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.publish_stats = {
+            "flushes": 0,
+            "published": 0,
+            "last_burst": 0,
+            "max_burst": 0,
+            "last_flush_latency": 0,
+            "max_flush_latency": 0
+        }
 
         self.initialize(device_config)
+        self.add_bridge_node()
+
+    def add_bridge_node(self):
+        # state of the values that is known to the bridge only, e.g. values restored after a restart
+        node = Node_Base(self, "bridge", "Bridge", "bridge")
+        self.add_node(node)
+        self.restored_property = Property_Boolean(node, id="restored", name="Values of the previous run", settable=False, value=False)
+        node.add_property(self.restored_property)
+        self.restored_last_seen_property = Property_String(node, id="restored-last-seen", name="Last seen before the restart", settable=False, value="")
+        node.add_property(self.restored_last_seen_property)
+
+    def set_restored(self, last_seen: float = None):
+        # the values of the previous run are published as current values until the device sends something,
+        # last_seen is the time the device has sent them, None once it has sent new data
+        last_seen = datetime.datetime.fromtimestamp(last_seen).isoformat(timespec="seconds") if last_seen is not None else ""
+        if self.start_time is None:
+            # published by start()
+            self.restored_property._value = last_seen != ""
+            self.restored_last_seen_property._value = last_seen
+        else:
+            self.set_property_value(self.restored_property, last_seen != "")
+            self.set_property_value(self.restored_last_seen_property, last_seen)
 
     def _set_value(self, event, id, value):
         _LOGGER.debug(f"{event} setter for {id} has been called with value '{value}'")
@@ -42,21 +93,77 @@ class Mapped_Device(Device_Base, EventEmitter):
         self.state = "ready" if status > 0 else "disconnected"
 
     def get_id(self, id, name):
-        if id != "" and id is not None:
-            return id
-        name = re.sub('[^0-9a-zA-Z]+', '-', name)
-        # CamelCase to camel-case
-        return re.sub(r'(?<!^)(?=[A-Z])', '-', name).lower()
+        return get_property_id(id, name)
     
     def update(self, value, descriptor=None, node_name=None, id=None, name=None):
         pass
 
+    def set_property_value(self, property, value):
+        with self._publish_lock:
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            self._pending[property] = value
+
+    def end_update(self):
+        self.flush()
+
+    def flush(self):
+        # the values are taken under the lock and published outside of it, so the message
+        # handling can collect new values meanwhile. _flush_lock keeps the batches of two
+        # flushes (message handling and timer) in order.
+        with self._flush_lock:
+            batch = self._take_pending()
+            for property, value in batch:
+                property.value = value
+
+    def _take_pending(self) -> list:
+        with self._publish_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return []
+            batch = []
+            while self._pending and publish_bucket.take():
+                property = next(iter(self._pending))
+                batch.append((property, self._pending.pop(property)))
+            self._window_published += len(batch)
+
+            if self._pending:
+                # rate limit reached, publish the rest later
+                self._flush_timer = get_scheduler().call_later(publish_bucket.wait_time(), self.flush)
+            else:
+                # everything collected since the first pending value is published now
+                latency = time.monotonic() - self._pending_since
+                stats = self.publish_stats
+                stats["flushes"] += 1
+                stats["published"] += self._window_published
+                stats["last_burst"] = self._window_published
+                stats["max_burst"] = max(stats["max_burst"], self._window_published)
+                stats["last_flush_latency"] = latency
+                stats["max_flush_latency"] = max(stats["max_flush_latency"], latency)
+                self._pending_since = None
+                self._window_published = 0
+            return batch
+
+    def close(self, *args):
+        with self._publish_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        super().close(*args)
+
 
 class Proto_Device(Mapped_Device):
 
     def initialize(self, proto_message):
+        plan = get_message_plan(proto_message.DESCRIPTOR)
+        # homie properties resolved from the field plans
+        self.field_properties = {}
+        self.derived_properties = {}
+
         # init nodes from message options
-        for homie_node in proto_message.DESCRIPTOR.GetOptions().Extensions[options.homie_node]:
+        for homie_node in plan.homie_nodes:
             retain = True
             if hasattr(homie_node, "no_retain") and getattr(homie_node, "no_retain") is True:
                 retain = False
@@ -68,17 +175,18 @@ class Proto_Device(Mapped_Device):
             _LOGGER.debug(f"node {homie_node.id} has been added")
 
         # add properties to nodes
-        for descriptor in proto_message.DESCRIPTOR.fields:
-            mapping_options = descriptor.GetOptions().Extensions[options.mapping_options]
-            if mapping_options.node != "":
-                node = self.get_node(mapping_options.node)
+        for field in plan.fields.values():
+            descriptor = field.descriptor
+            mapping_options = field.options
+            if field.node != "":
+                node = self.get_node(field.node)
                 if node is not None:
                     args = [node]
-                    id = self.get_id(mapping_options.id, descriptor.name)
+                    id = field.id
                     kwargs = {
                         "id": id,
                         "name": mapping_options.display_name if mapping_options.display_name != "" else descriptor.name,
-                        "unit": mapping_options.unit,
+                        "unit": field.unit,
                         "settable": False
                     }                    
                     if (not self.simulated and mapping_options.HasField("settable") and mapping_options.settable is True) or (self.simulated and mapping_options.HasField("simulated_settable") and mapping_options.simulated_settable is True):
@@ -86,61 +194,58 @@ class Proto_Device(Mapped_Device):
                         _LOGGER.debug(f"adding set event for {id}")
                         kwargs["set_value"] = (lambda v, name=id, event="set_request": self._set_value(event, name, v))
 
+                    property = None
                     if descriptor.type == descriptor.TYPE_BOOL:                        
-                        property = Property_Boolean(*args, **kwargs)
+                        property = Store_Boolean(*args, **kwargs)
                     elif descriptor.type in [descriptor.TYPE_UINT32, descriptor.TYPE_INT32, descriptor.TYPE_SINT32, descriptor.TYPE_FIXED32, descriptor.TYPE_SFIXED32]:
-                        if mapping_options.divisor > 1:
+                        if field.divisor > 1:
                             # must be a float
-                            property = Property_Float(*args, **kwargs)
+                            property = Store_Float(*args, **kwargs)
                         else:
                             # integer
-                            property = Property_Integer(*args, **kwargs)
+                            property = Store_Integer(*args, **kwargs)
                     elif descriptor.type in [descriptor.TYPE_UINT64, descriptor.TYPE_INT64, descriptor.TYPE_SINT64, descriptor.TYPE_FIXED64, descriptor.TYPE_SFIXED64]:
                         _LOGGER.error(f"64bit integers are not supported by homie. skipping field {descriptor.name}")
                     elif descriptor.type == descriptor.TYPE_ENUM:
                         kwargs["data_format"] = ",".join(descriptor.enum_type.values_by_name.keys())
-                        property = Property_Enum(*args, **kwargs)
+                        property = Store_Enum(*args, **kwargs)
                     elif descriptor.type == descriptor.TYPE_FLOAT:
-                        property = Property_Float(*args, **kwargs)
+                        property = Store_Float(*args, **kwargs)
                     elif descriptor.type == descriptor.TYPE_STRING:
-                        property = Property_String(*args, **kwargs)
+                        property = Store_String(*args, **kwargs)
 
-
-                    node.add_property(property)
-                    _LOGGER.debug(f"property {property.name} has been added to node {node.name}")
+                    if property is not None:
+                        property.bind(self.values, self.values.layout.add_field(field))
+                        node.add_property(property)
+                        self.field_properties[field] = property
+                        _LOGGER.debug(f"property {property.name} has been added to node {node.name}")
                 else:
-                    _LOGGER.error(f"node {mapping_options.node} does not exists field {descriptor.name} will not be mapped to homie!")
+                    _LOGGER.error(f"node {field.node} does not exists field {descriptor.name} will not be mapped to homie!")
 
         # add derived properties
-        for derived_field in proto_message.DESCRIPTOR.GetOptions().Extensions[options.derived_field]:
+        for derived_field in plan.derived_fields:
             if derived_field.node != "":
                 node = self.get_node(derived_field.node)
                 if node is not None:
                     # must be a float
-                    property = Property_Float(node,
+                    property = Store_Float(node,
                         id=self.get_id("", derived_field.field_name),
                         name=derived_field.display_name if derived_field.display_name != "" else derived_field.id,
                         unit=derived_field.unit,
                         settable=False
                         )
+                    property.bind(self.values, self.values.layout.add(derived_field.field_name, FLOAT))
                     node.add_property(property)
-                _LOGGER.debug(f"derived property {property.name} has been added to node {node.name}")        
+                    self.derived_properties[derived_field.field_name] = property
+                    _LOGGER.debug(f"derived property {property.name} has been added to node {node.name}")        
    
     def update(self, value, descriptor=None, node_name=None, id=None, name=None):
-        mapping_options = descriptor.GetOptions().Extensions[options.mapping_options] if descriptor is not None else None
-        node = None
-        if node_name is not None:
-            node = self.get_node(node_name)
-        elif mapping_options is not None and mapping_options.node != "":
-            node = self.get_node(mapping_options.node)
-        if node is not None:
-            property_name = None
-            if id is not None or name is not None:
-                property_name = self.get_id(id, name)
-            elif mapping_options is not None:
-                property_name = self.get_id(mapping_options.id, descriptor.name)
-            if property_name is not None:
-                node.get_property(property_name).value = value    
+        if descriptor is not None:
+            property = self.field_properties.get(descriptor)
+        else:
+            property = self.derived_properties.get(name)
+        if property is not None:
+            self.set_property_value(property, value)
 
 
 class Property_Number_Boolean(Property_Boolean):
@@ -182,6 +287,66 @@ class Property_Json(Property_String):
         except:
             return None
 
+class Store_Value:
+    # homie property without a copy of its value, the value is read from the value store of the device
+    store = None
+    slot = None
+
+    def bind(self, store: ValueStore, slot: int):
+        if self._value is not None and store.get(slot) is None:
+            store.set(slot, self._value)
+        self._value = None
+        self.store = store
+        self.slot = slot
+
+    @property
+    def value(self):
+        if self.store is None:
+            return self._value
+        return self.store.get(self.slot)
+
+    @value.setter
+    def value(self, value):
+        if self.validate_value(value):
+            if self.store is None:
+                self._value = value
+            self.publish(self.topic, self.get_payload_from_value(value), True, 1)
+        else:
+            _LOGGER.warning(f"Invalid Value: Device {self.node.device.name} Node {self.node.name} Property {self.name} Value {value}")
+
+
+class Store_Integer(Store_Value, Property_Integer):
+    pass
+
+
+class Store_Float(Store_Value, Property_Float):
+    pass
+
+
+class Store_Boolean(Store_Value, Property_Boolean):
+    pass
+
+
+class Store_Number_Boolean(Store_Value, Property_Number_Boolean):
+    pass
+
+
+class Store_Enum(Store_Value, Property_Enum):
+    pass
+
+
+class Store_String(Store_Value, Property_String):
+    pass
+
+
+class Store_Battery(Store_Value, Property_Battery):
+    pass
+
+
+class Store_Json(Store_Value, Property_Json):
+    pass
+
+
 class Json_Device(Mapped_Device):
      
      def initialize(self, device_config):
@@ -217,32 +382,33 @@ class Json_Device(Mapped_Device):
 
                     if "type" in descriptor:
                         if descriptor["type"] == "boolean":                        
-                            property = Property_Boolean(*args, **kwargs)
+                            property = Store_Boolean(*args, **kwargs)
                         elif descriptor["type"] == "number-boolean":                        
-                            property = Property_Number_Boolean(*args, **kwargs)
+                            property = Store_Number_Boolean(*args, **kwargs)
                         elif descriptor["type"] == "number":
                             if descriptor["divisor"] > 1:
                                 # must be a float
-                                property = Property_Float(*args, **kwargs)
+                                property = Store_Float(*args, **kwargs)
                             else:
                                 # integer
-                                property = Property_Integer(*args, **kwargs)
+                                property = Store_Integer(*args, **kwargs)
                         elif descriptor["type"] == "float":
-                            property = Property_Float(*args, **kwargs)
+                            property = Store_Float(*args, **kwargs)
                         elif descriptor["type"] == "string":
-                            property = Property_String(*args, **kwargs)
+                            property = Store_String(*args, **kwargs)
                         elif descriptor["type"] == "battery":
-                            property = Property_Battery(*args, **kwargs)
+                            property = Store_Battery(*args, **kwargs)
                         elif descriptor["type"] == "json":
-                            property = Property_Json(*args, **kwargs)
+                            property = Store_Json(*args, **kwargs)
                     else:
                         if descriptor["divisor"] > 1:
                             # must be a float
-                            property = Property_Float(*args, **kwargs)
+                            property = Store_Float(*args, **kwargs)
                         else:
                             # integer
-                            property = Property_Integer(*args, **kwargs)
+                            property = Store_Integer(*args, **kwargs)
 
+                    property.bind(self.values, self.values.layout.slot(descriptor))
                     node.add_property(property)
                     _LOGGER.debug(f"property {property.name} [{property.data_type}] has been added to node {node.name}")
                 else:
@@ -255,12 +421,13 @@ class Json_Device(Mapped_Device):
                     node = self.get_node(derived_field["node"])
                     if node is not None:
                         # must be a float
-                        property = Property_Float(node,
+                        property = Store_Float(node,
                             id=self.get_id("", derived_field["field_name"]),
                             name=derived_field["display_name"] if "display_name" in derived_field and derived_field["display_name"] != "" else derived_field["id"],
                             unit=derived_field["unit"],
                             settable=False
                             )
+                        property.bind(self.values, self.values.layout.add(derived_field["field_name"], FLOAT))
                         node.add_property(property)
                     _LOGGER.debug(f"derived property {property.name} has been added to node {node.name}")        
 
@@ -279,4 +446,4 @@ class Json_Device(Mapped_Device):
             elif mapping_options is not None:
                 property_name = self.get_id(mapping_options["id"] if "id" in mapping_options else None, descriptor["name"])
             if property_name is not None:
-                node.get_property(property_name).value = value    
+                self.set_property_value(node.get_property(property_name), value)
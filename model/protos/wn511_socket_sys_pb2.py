@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 from model.protos import options_pb2 as model_dot_protos_dot_options__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n#model/protos/wn511_socket_sys.proto\x12\x0cmodel.protos\x1a\x1amodel/protos/options.proto\"\xca\x01\n\x08rtc_data\x12\x11\n\x04week\x18\x01 \x01(\x05H\x00\x88\x01\x01\x12\x10\n\x03sec\x18\x02 \x01(\x05H\x01\x88\x01\x01\x12\x10\n\x03min\x18\x03 \x01(\x05H\x02\x88\x01\x01\x12\x11\n\x04hour\x18\x04 \x01(\x05H\x03\x88\x01\x01\x12\x10\n\x03\x64\x61y\x18\x05 \x01(\x05H\x04\x88\x01\x01\x12\x12\n\x05month\x18\x06 \x01(\x05H\x05\x88\x01\x01\x12\x11\n\x04year\x18\x07 \x01(\x05H\x06\x88\x01\x01\x42\x07\n\x05_weekB\x06\n\x04_secB\x06\n\x04_minB\x07\n\x05_hourB\x06\n\x04_dayB\x08\n\x06_monthB\x07\n\x05_year\"\xab\x02\n\x13time_range_strategy\x12\x16\n\tis_config\x18\x01 \x01(\x08H\x00\x88\x01\x01\x12\x16\n\tis_enable\x18\x02 \x01(\x08H\x01\x88\x01\x01\x12\x16\n\ttime_mode\x18\x03 \x01(\x05H\x02\x88\x01\x01\x12\x16\n\ttime_data\x18\x04 \x01(\x05H\x03\x88\x01\x01\x12/\n\nstart_time\x18\x05 \x01(\x0b\x32\x16.model.protos.rtc_dataH\x04\x88\x01\x01\x12.\n\tstop_time\x18\x06 \x01(\x0b\x32\x16.model.protos.rtc_dataH\x05\x88\x01\x01\x42\x0c\n\n_is_configB\x0c\n\n_is_enableB\x0c\n\n_time_modeB\x0c\n\n_time_dataB\r\n\x0b_start_timeB\x0c\n\n_stop_time\",\n\x10plug_ack_message\x12\x10\n\x03\x61\x63k\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\x06\n\x04_ack\"\xfa\x05\n\x13plug_heartbeat_pack\x12\x15\n\x08\x65rr_code\x18\x01 \x01(\x05H\x00\x88\x01\x01\x12\x16\n\twarn_code\x18\x02 \x01(\x05H\x01\x88\x01\x01\x12\x14\n\x07\x63ountry\x18\x03 \x01(\x05H\x02\x88\x01\x01\x12\x11\n\x04town\x18\x04 \x01(\x05H\x03\x88\x01\x01\x12\x14\n\x07max_cur\x18\x05 \x01(\x05H\x04\x88\x01\x01\x12\"\n\x04temp\x18\x06 \x01(\x05\x42\x0f\x92\xb5\x18\x0b\x12\x01\x43*\x06statesH\x05\x88\x01\x01\x12#\n\x04\x66req\x18\x07 \x01(\x05\x42\x10\x92\xb5\x18\x0c\x12\x02Hz*\x06statesH\x06\x88\x01\x01\x12\x14\n\x07\x63urrent\x18\x08 \x01(\x05H\x07\x88\x01\x01\x12\"\n\x04volt\x18\t \x01(\x05\x42\x0f\x92\xb5\x18\x0b\x12\x01V*\x06statesH\x08\x88\x01\x01\x12\'\n\x05watts\x18\n \x01(\x05\x42\x13\x92\xb5\x18\x0f\x08\n\x12\x01W*\x06states@\x01H\t\x88\x01\x01\x12%\n\x06switch\x18\x0b \x01(\x08\x42\x10\x92\xb5\x18\x0c*\x08\x63ontrols8\x01H\n\x88\x01\x01\x12,\n\nbrightness\x18\x0c \x01(\x05\x42\x13\x92\xb5\x18\x0f\x08\n\x12\x01%*\x06states8\x01H\x0b\x88\x01\x01\x12)\n\tmax_watts\x18\r \x01(\x05\x42\x11\x92\xb5\x18\r\x12\x01W*\x06states8\x01H\x0c\x88\x01\x01\x12 \n\x13heartbeat_frequency\x18\x0e \x01(\x05H\r\x88\x01\x01\x12*\n\x0bmesh_enable\x18\x0f \x01(\x08\x42\x10\x92\xb5\x18\x0c*\x08\x63ontrols8\x01H\x0e\x88\x01\x01:>\x8a\xb5\x18\x18\n\x06states\x12\x06States\x1a\x06states\x8a\xb5\x18\x1e\n\x08\x63ontrols\x12\x08\x43ontrols\x1a\x08\x63ontrolsB\x0b\n\t_err_codeB\x0c\n\n_warn_codeB\n\n\x08_countryB\x07\n\x05_townB\n\n\x08_max_curB\x07\n\x05_tempB\x07\n\x05_freqB\n\n\x08_currentB\x07\n\x05_voltB\x08\n\x06_wattsB\t\n\x07_switchB\r\n\x0b_brightnessB\x0c\n\n_max_wattsB\x16\n\x14_heartbeat_frequencyB\x0e\n\x0c_mesh_enable\"?\n\x13plug_switch_message\x12\x18\n\x0bplug_switch\x18\x01 \x01(\rH\x00\x88\x01\x01\x42\x0e\n\x0c_plug_switch\"9\n\x0f\x62rightness_pack\x12\x17\n\nbrightness\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\r\n\x0b_brightness\"0\n\x0cmax_cur_pack\x12\x14\n\x07max_cur\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\n\n\x08_max_cur\":\n\x0e\x62\x61t_upper_pack\x12\x18\n\x0bupper_limit\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\x0e\n\x0c_upper_limit\":\n\x0e\x62\x61t_lower_pack\x12\x18\n\x0blower_limit\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\x0e\n\x0c_lower_limit\"H\n\x14permanent_watts_pack\x12\x1c\n\x0fpermanent_watts\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\x12\n\x10_permanent_watts\"\x9f\x01\n\x10time_task_config\x12\x16\n\ttask_name\x18\x01 \x01(\tH\x00\x88\x01\x01\x12:\n\ntime_range\x18\x02 \x01(\x0b\x32!.model.protos.time_range_strategyH\x01\x88\x01\x01\x12\x11\n\x04type\x18\x03 \x01(\x05H\x02\x88\x01\x01\x42\x0c\n\n_task_nameB\r\n\x0b_time_rangeB\x07\n\x05_type\"L\n\x15time_task_config_post\x12\x33\n\x0btask_config\x18\x01 \x03(\x0b\x32\x1e.model.protos.time_task_config\"}\n\tPowerItem\x12\x16\n\ttimestamp\x18\x01 \x01(\x03H\x00\x88\x01\x01\x12\x15\n\x08timezone\x18\x02 \x01(\tH\x01\x88\x01\x01\x12\x17\n\nplug_power\x18\x03 \x01(\x05H\x02\x88\x01\x01\x42\x0c\n\n_timestampB\x0b\n\t_timezoneB\r\n\x0b_plug_power\"`\n\tPowerPack\x12\x14\n\x07sys_seq\x18\x01 \x01(\x05H\x00\x88\x01\x01\x12\x31\n\x10sys_power_stream\x18\x02 \x03(\x0b\x32\x17.model.protos.PowerItemB\n\n\x08_sys_seq\"0\n\x0cPowerAckPack\x12\x14\n\x07sys_seq\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\n\n\x08_sys_seq\"6\n\x0emax_watts_pack\x12\x16\n\tmax_watts\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\x0c\n\n_max_watts\":\n\x0emesh_ctrl_pack\x12\x18\n\x0bmesh_enable\x18\x01 \x01(\rH\x00\x88\x01\x01\x42\x0e\n\x0c_mesh_enable\",\n\x08ret_pack\x12\x14\n\x07ret_sta\x18\x01 \x01(\x08H\x00\x88\x01\x01\x42\n\n\x08_ret_sta\":\n\x0cinclude_plug\x12\x19\n\x0cinclude_plug\x18\x01 \x01(\x08H\x00\x88\x01\x01\x42\x0f\n\r_include_plugb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n#model/protos/wn511_socket_sys.proto\x12\x0cmodel.protos\x1a\x1amodel/protos/options.proto\"\xca\x01\n\x08rtc_data\x12\x11\n\x04week\x18\x01 \x01(\x05H\x00\x88\x01\x01\x12\x10\n\x03sec\x18\x02 \x01(\x05H\x01\x88\x01\x01\x12\x10\n\x03min\x18\x03 \x01(\x05H\x02\x88\x01\x01\x12\x11\n\x04hour\x18\x04 \x01(\x05H\x03\x88\x01\x01\x12\x10\n\x03\x64\x61y\x18\x05 \x01(\x05H\x04\x88\x01\x01\x12\x12\n\x05month\x18\x06 \x01(\x05H\x05\x88\x01\x01\x12\x11\n\x04year\x18\x07 \x01(\x05H\x06\x88\x01\x01\x42\x07\n\x05_weekB\x06\n\x04_secB\x06\n\x04_minB\x07\n\x05_hourB\x06\n\x04_dayB\x08\n\x06_monthB\x07\n\x05_year\"\xab\x02\n\x13time_range_strategy\x12\x16\n\tis_config\x18\x01 \x01(\x08H\x00\x88\x01\x01\x12\x16\n\tis_enable\x18\x02 \x01(\x08H\x01\x88\x01\x01\x12\x16\n\ttime_mode\x18\x03 \x01(\x05H\x02\x88\x01\x01\x12\x16\n\ttime_data\x18\x04 \x01(\x05H\x03\x88\x01\x01\x12/\n\nstart_time\x18\x05 \x01(\x0b\x32\x16.model.protos.rtc_dataH\x04\x88\x01\x01\x12.\n\tstop_time\x18\x06 \x01(\x0b\x32\x16.model.protos.rtc_dataH\x05\x88\x01\x01\x42\x0c\n\n_is_configB\x0c\n\n_is_enableB\x0c\n\n_time_modeB\x0c\n\n_time_dataB\r\n\x0b_start_timeB\x0c\n\n_stop_time\",\n\x10plug_ack_message\x12\x10\n\x03\x61\x63k\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\x06\n\x04_ack\"\xff\x05\n\x13plug_heartbeat_pack\x12\x15\n\x08\x65rr_code\x18\x01 \x01(\x05H\x00\x88\x01\x01\x12\x16\n\twarn_code\x18\x02 \x01(\x05H\x01\x88\x01\x01\x12\x14\n\x07\x63ountry\x18\x03 \x01(\x05H\x02\x88\x01\x01\x12\x11\n\x04town\x18\x04 \x01(\x05H\x03\x88\x01\x01\x12\x14\n\x07max_cur\x18\x05 \x01(\x05H\x04\x88\x01\x01\x12\"\n\x04temp\x18\x06 \x01(\x05\x42\x0f\x92\xb5\x18\x0b\x12\x01\x43*\x06statesH\x05\x88\x01\x01\x12#\n\x04\x66req\x18\x07 \x01(\x05\x42\x10\x92\xb5\x18\x0c\x12\x02Hz*\x06statesH\x06\x88\x01\x01\x12\x14\n\x07\x63urrent\x18\x08 \x01(\x05H\x07\x88\x01\x01\x12\'\n\x04volt\x18\t \x01(\x05\x42\x14\x92\xb5\x18\x10\x12\x01V*\x06statesM\x00\x00\x00@H\x08\x88\x01\x01\x12\'\n\x05watts\x18\n \x01(\x05\x42\x13\x92\xb5\x18\x0f\x08\n\x12\x01W*\x06states@\x01H\t\x88\x01\x01\x12%\n\x06switch\x18\x0b \x01(\x08\x42\x10\x92\xb5\x18\x0c*\x08\x63ontrols8\x01H\n\x88\x01\x01\x12,\n\nbrightness\x18\x0c \x01(\x05\x42\x13\x92\xb5\x18\x0f\x08\n\x12\x01%*\x06states8\x01H\x0b\x88\x01\x01\x12)\n\tmax_watts\x18\r \x01(\x05\x42\x11\x92\xb5\x18\r\x12\x01W*\x06states8\x01H\x0c\x88\x01\x01\x12 \n\x13heartbeat_frequency\x18\x0e \x01(\x05H\r\x88\x01\x01\x12*\n\x0bmesh_enable\x18\x0f \x01(\x08\x42\x10\x92\xb5\x18\x0c*\x08\x63ontrols8\x01H\x0e\x88\x01\x01:>\x8a\xb5\x18\x18\n\x06states\x12\x06States\x1a\x06states\x8a\xb5\x18\x1e\n\x08\x63ontrols\x12\x08\x43ontrols\x1a\x08\x63ontrolsB\x0b\n\t_err_codeB\x0c\n\n_warn_codeB\n\n\x08_countryB\x07\n\x05_townB\n\n\x08_max_curB\x07\n\x05_tempB\x07\n\x05_freqB\n\n\x08_currentB\x07\n\x05_voltB\x08\n\x06_wattsB\t\n\x07_switchB\r\n\x0b_brightnessB\x0c\n\n_max_wattsB\x16\n\x14_heartbeat_frequencyB\x0e\n\x0c_mesh_enable\"?\n\x13plug_switch_message\x12\x18\n\x0bplug_switch\x18\x01 \x01(\rH\x00\x88\x01\x01\x42\x0e\n\x0c_plug_switch\"9\n\x0f\x62rightness_pack\x12\x17\n\nbrightness\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\r\n\x0b_brightness\"0\n\x0cmax_cur_pack\x12\x14\n\x07max_cur\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\n\n\x08_max_cur\":\n\x0e\x62\x61t_upper_pack\x12\x18\n\x0bupper_limit\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\x0e\n\x0c_upper_limit\":\n\x0e\x62\x61t_lower_pack\x12\x18\n\x0blower_limit\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\x0e\n\x0c_lower_limit\"H\n\x14permanent_watts_pack\x12\x1c\n\x0fpermanent_watts\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\x12\n\x10_permanent_watts\"\x9f\x01\n\x10time_task_config\x12\x16\n\ttask_name\x18\x01 \x01(\tH\x00\x88\x01\x01\x12:\n\ntime_range\x18\x02 \x01(\x0b\x32!.model.protos.time_range_strategyH\x01\x88\x01\x01\x12\x11\n\x04type\x18\x03 \x01(\x05H\x02\x88\x01\x01\x42\x0c\n\n_task_nameB\r\n\x0b_time_rangeB\x07\n\x05_type\"L\n\x15time_task_config_post\x12\x33\n\x0btask_config\x18\x01 \x03(\x0b\x32\x1e.model.protos.time_task_config\"}\n\tPowerItem\x12\x16\n\ttimestamp\x18\x01 \x01(\x03H\x00\x88\x01\x01\x12\x15\n\x08timezone\x18\x02 \x01(\tH\x01\x88\x01\x01\x12\x17\n\nplug_power\x18\x03 \x01(\x05H\x02\x88\x01\x01\x42\x0c\n\n_timestampB\x0b\n\t_timezoneB\r\n\x0b_plug_power\"`\n\tPowerPack\x12\x14\n\x07sys_seq\x18\x01 \x01(\x05H\x00\x88\x01\x01\x12\x31\n\x10sys_power_stream\x18\x02 \x03(\x0b\x32\x17.model.protos.PowerItemB\n\n\x08_sys_seq\"0\n\x0cPowerAckPack\x12\x14\n\x07sys_seq\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\n\n\x08_sys_seq\"6\n\x0emax_watts_pack\x12\x16\n\tmax_watts\x18\x01 \x01(\x05H\x00\x88\x01\x01\x42\x0c\n\n_max_watts\":\n\x0emesh_ctrl_pack\x12\x18\n\x0bmesh_enable\x18\x01 \x01(\rH\x00\x88\x01\x01\x42\x0e\n\x0c_mesh_enable\",\n\x08ret_pack\x12\x14\n\x07ret_sta\x18\x01 \x01(\x08H\x00\x88\x01\x01\x42\n\n\x08_ret_sta\":\n\x0cinclude_plug\x12\x19\n\x0cinclude_plug\x18\x01 \x01(\x08H\x00\x88\x01\x01\x42\x0f\n\r_include_plugb\x06proto3')
 
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'model.protos.wn511_socket_sys_pb2', globals())
@@ -26,7 +26,7 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _PLUG_HEARTBEAT_PACK.fields_by_name['freq']._options = None
   _PLUG_HEARTBEAT_PACK.fields_by_name['freq']._serialized_options = b'\222\265\030\014\022\002Hz*\006states'
   _PLUG_HEARTBEAT_PACK.fields_by_name['volt']._options = None
-  _PLUG_HEARTBEAT_PACK.fields_by_name['volt']._serialized_options = b'\222\265\030\013\022\001V*\006states'
+  _PLUG_HEARTBEAT_PACK.fields_by_name['volt']._serialized_options = b'\222\265\030\020\022\001V*\006statesM\000\000\000@'
   _PLUG_HEARTBEAT_PACK.fields_by_name['watts']._options = None
   _PLUG_HEARTBEAT_PACK.fields_by_name['watts']._serialized_options = b'\222\265\030\017\010\n\022\001W*\006states@\001'
   _PLUG_HEARTBEAT_PACK.fields_by_name['switch']._options = None
@@ -46,35 +46,35 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _PLUG_ACK_MESSAGE._serialized_start=588
   _PLUG_ACK_MESSAGE._serialized_end=632
   _PLUG_HEARTBEAT_PACK._serialized_start=635
-  _PLUG_HEARTBEAT_PACK._serialized_end=1397
-  _PLUG_SWITCH_MESSAGE._serialized_start=1399
-  _PLUG_SWITCH_MESSAGE._serialized_end=1462
-  _BRIGHTNESS_PACK._serialized_start=1464
-  _BRIGHTNESS_PACK._serialized_end=1521
-  _MAX_CUR_PACK._serialized_start=1523
-  _MAX_CUR_PACK._serialized_end=1571
-  _BAT_UPPER_PACK._serialized_start=1573
-  _BAT_UPPER_PACK._serialized_end=1631
-  _BAT_LOWER_PACK._serialized_start=1633
-  _BAT_LOWER_PACK._serialized_end=1691
-  _PERMANENT_WATTS_PACK._serialized_start=1693
-  _PERMANENT_WATTS_PACK._serialized_end=1765
-  _TIME_TASK_CONFIG._serialized_start=1768
-  _TIME_TASK_CONFIG._serialized_end=1927
-  _TIME_TASK_CONFIG_POST._serialized_start=1929
-  _TIME_TASK_CONFIG_POST._serialized_end=2005
-  _POWERITEM._serialized_start=2007
-  _POWERITEM._serialized_end=2132
-  _POWERPACK._serialized_start=2134
-  _POWERPACK._serialized_end=2230
-  _POWERACKPACK._serialized_start=2232
-  _POWERACKPACK._serialized_end=2280
-  _MAX_WATTS_PACK._serialized_start=2282
-  _MAX_WATTS_PACK._serialized_end=2336
-  _MESH_CTRL_PACK._serialized_start=2338
-  _MESH_CTRL_PACK._serialized_end=2396
-  _RET_PACK._serialized_start=2398
-  _RET_PACK._serialized_end=2442
-  _INCLUDE_PLUG._serialized_start=2444
-  _INCLUDE_PLUG._serialized_end=2502
+  _PLUG_HEARTBEAT_PACK._serialized_end=1402
+  _PLUG_SWITCH_MESSAGE._serialized_start=1404
+  _PLUG_SWITCH_MESSAGE._serialized_end=1467
+  _BRIGHTNESS_PACK._serialized_start=1469
+  _BRIGHTNESS_PACK._serialized_end=1526
+  _MAX_CUR_PACK._serialized_start=1528
+  _MAX_CUR_PACK._serialized_end=1576
+  _BAT_UPPER_PACK._serialized_start=1578
+  _BAT_UPPER_PACK._serialized_end=1636
+  _BAT_LOWER_PACK._serialized_start=1638
+  _BAT_LOWER_PACK._serialized_end=1696
+  _PERMANENT_WATTS_PACK._serialized_start=1698
+  _PERMANENT_WATTS_PACK._serialized_end=1770
+  _TIME_TASK_CONFIG._serialized_start=1773
+  _TIME_TASK_CONFIG._serialized_end=1932
+  _TIME_TASK_CONFIG_POST._serialized_start=1934
+  _TIME_TASK_CONFIG_POST._serialized_end=2010
+  _POWERITEM._serialized_start=2012
+  _POWERITEM._serialized_end=2137
+  _POWERPACK._serialized_start=2139
+  _POWERPACK._serialized_end=2235
+  _POWERACKPACK._serialized_start=2237
+  _POWERACKPACK._serialized_end=2285
+  _MAX_WATTS_PACK._serialized_start=2287
+  _MAX_WATTS_PACK._serialized_end=2341
+  _MESH_CTRL_PACK._serialized_start=2343
+  _MESH_CTRL_PACK._serialized_end=2401
+  _RET_PACK._serialized_start=2403
+  _RET_PACK._serialized_end=2447
+  _INCLUDE_PLUG._serialized_start=2449
+  _INCLUDE_PLUG._serialized_end=2507
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,19 @@
+import random
+
+
+class Backoff:
+    def __init__(self, min_delay: float = 1, max_delay: float = 120, factor: float = 2, jitter: float = 0.5):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        # fraction of the delay that is randomized
+        self.jitter = jitter
+        self.attempt = 0
+
+    def next_delay(self) -> float:
+        delay = min(self.max_delay, self.min_delay * (self.factor ** self.attempt))
+        self.attempt += 1
+        return random.uniform(delay * (1 - self.jitter), delay)
+
+    def reset(self):
+        self.attempt = 0
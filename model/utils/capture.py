@@ -0,0 +1,97 @@
+import logging
+import os
+import struct
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# file layout: MAGIC followed by records of
+#   timestamp (float64, seconds since epoch), topic length (uint16), payload length (uint32), topic (utf-8), payload
+MAGIC = b"EFCAP\x01"
+_RECORD_HEADER = struct.Struct("<dHI")
+# the file is flushed at most once per interval (seconds)
+FLUSH_INTERVAL = 1
+
+
+class CaptureWriter:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.records = 0
+        self._lock = threading.Lock()
+        try:
+            self._file = open(path, "r+b")
+        except FileNotFoundError:
+            self._file = open(path, "w+b")
+        try:
+            self._open_for_append()
+        except Exception:
+            self._file.close()
+            raise
+        self._last_flush = time.monotonic()
+
+    def _open_for_append(self):
+        size = self._file.seek(0, os.SEEK_END)
+        if size == 0:
+            self._file.write(MAGIC)
+            return
+        self._file.seek(0)
+        if self._file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.path} is not a capture file")
+        # a record that was cut off (e.g. by a crash) would shift all records appended after it
+        end = complete_length(self._file, size)
+        if end < size:
+            _LOGGER.warning(f"removing an incomplete record of {size - end} bytes at the end of {self.path}")
+            self._file.truncate(end)
+        self._file.seek(end)
+
+    def write(self, topic: str, payload: bytes, timestamp: float = None):
+        topic = topic.encode("utf-8")
+        record = _RECORD_HEADER.pack(timestamp if timestamp is not None else time.time(), len(topic), len(payload))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(record)
+            self._file.write(topic)
+            self._file.write(payload)
+            self.records += 1
+            now = time.monotonic()
+            if now - self._last_flush >= FLUSH_INTERVAL:
+                self._file.flush()
+                self._last_flush = now
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def complete_length(f, size: int) -> int:
+    # length of the capture up to the end of the last complete record, f is positioned after MAGIC
+    end = f.tell()
+    while end + _RECORD_HEADER.size <= size:
+        _, topic_length, payload_length = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+        record_end = end + _RECORD_HEADER.size + topic_length + payload_length
+        if record_end > size:
+            break
+        end = f.seek(record_end)
+    return end
+
+
+def read_capture(path: str):
+    # yields (timestamp, topic, payload) for all complete records,
+    # an incomplete record at the end (e.g. after a crash) is ignored
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a capture file")
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            timestamp, topic_length, payload_length = _RECORD_HEADER.unpack(header)
+            topic = f.read(topic_length)
+            payload = f.read(payload_length)
+            if len(topic) < topic_length or len(payload) < payload_length:
+                return
+            yield timestamp, topic.decode("utf-8"), payload
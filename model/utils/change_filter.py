@@ -0,0 +1,67 @@
+import time
+from array import array
+
+from model.value_store import ValueStore, StoreLayout
+
+# a change of exactly the deadband is published, the differences of converted values
+# (e.g. 50.2 - 50.1 = 0.09999999999999432) are compared with this tolerance
+_DEADBAND_TOLERANCE = 1 - 1e-6
+
+
+# Remembers the last published value of every field (by its slot in the value store layout).
+# Unchanged values (or changes within the deadband) are suppressed until max_silence seconds
+# have passed since the last publish.
+class ChangeFilter:
+    def __init__(self, layout: StoreLayout, max_silence=None):
+        self.max_silence = max_silence
+        self._last = ValueStore(layout)
+        self._last_time = array("d")
+        self.published = 0
+        self.suppressed = 0
+
+    def should_publish(self, slot: int, value, deadband=0, relative_deadband=0, max_silence=None, now=None):
+        if now is None:
+            now = time.monotonic()
+        last_value = self._last.get(slot)
+        if last_value is not None:
+            if max_silence is None:
+                max_silence = self.max_silence
+            if not max_silence or now - self._last_time[slot] < max_silence:
+                if self.is_within_deadband(value, last_value, deadband, relative_deadband):
+                    self.suppressed += 1
+                    return False
+        self._last.set(slot, value)
+        if slot >= len(self._last_time):
+            self._last_time.extend([0.0] * (slot + 1 - len(self._last_time)))
+        self._last_time[slot] = now
+        self.published += 1
+        return True
+
+    def is_within_deadband(self, value, last_value, deadband, relative_deadband):
+        if value == last_value:
+            return True
+        if (deadband or relative_deadband) and is_number(value) and is_number(last_value):
+            diff = abs(value - last_value)
+            return diff < deadband * _DEADBAND_TOLERANCE or diff < abs(last_value) * relative_deadband * _DEADBAND_TOLERANCE
+        return False
+
+    def forget(self, slot=None):
+        if slot is None:
+            self._last.clear()
+        else:
+            self._last.clear(slot)
+
+    def suppression_ratio(self):
+        total = self.published + self.suppressed
+        return self.suppressed / total if total > 0 else 0
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "suppressed": self.suppressed,
+            "suppression_ratio": round(self.suppression_ratio(), 3)
+        }
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
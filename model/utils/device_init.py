@@ -0,0 +1,76 @@
+import logging
+import os
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+_LOGGER = logging.getLogger(__name__)
+
+# number of devices that are initialised at the same time
+INIT_WORKERS = int(os.getenv("EF_INIT_WORKERS")) if os.getenv("EF_INIT_WORKERS") is not None else 4
+
+
+# Creates the configured devices (homie device tree, homie announcement) with a
+# bounded pool of worker threads in the background, so the Ecoflow MQTT loop can run meanwhile.
+# The first device is created before the others, it creates the MQTT client that all homie
+# devices share (the homie library does not lock its creation). Devices are added to `devices`
+# and subscribe (and request their data) as soon as they are ready.
+class DeviceInitializer:
+    def __init__(self, workers: int = INIT_WORKERS) -> None:
+        self.workers = max(1, workers)
+        self.devices = []
+        self.stopped = False
+        self._executor = None
+        self._thread = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, factories: list, on_done=None):
+        # factories are functions that create one device each, on_done(devices) is called
+        # once all of them have returned
+        self._thread = threading.Thread(target=self._run, args=(factories, on_done), name="device-init", daemon=True)
+        self._thread.start()
+
+    def _run(self, factories, on_done):
+        if factories:
+            self._create(factories[0])
+        if len(factories) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="device-init") as executor:
+                self._executor = executor
+                try:
+                    for _ in executor.map(self._create, factories[1:]):
+                        pass
+                except CancelledError:
+                    pass
+        self._done.set()
+        if on_done is not None and not self.stopped:
+            on_done(self.devices)
+
+    def _create(self, factory):
+        if self.stopped:
+            return
+        try:
+            device = factory()
+        except Exception as err:
+            _LOGGER.exception(f"device initialisation failed: {err}")
+            return
+        if device is None:
+            return
+        with self._lock:
+            if not self.stopped:
+                self.devices.append(device)
+                # the device is complete (handlers, message logger, restored state), it may receive messages now
+                device.init_subscriptions()
+                return
+        # created while shutting down
+        device.stop()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def stop(self):
+        # devices that are not being created yet are skipped, the ones that are ready
+        # afterwards are stopped right away
+        with self._lock:
+            self.stopped = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# Bounded queue between the MQTT network thread and the message handling.
+# Items that are put with a key replace a queued item with the same key (latest wins, or
+# merge(queued, item) if given), items without key are always queued. If the queue is full the oldest item is dropped.
+class IngestQueue:
+    def __init__(self, handler, max_size: int = 1000, name: str = "ingest"):
+        self.handler = handler
+        self.max_size = max_size
+        self.name = name
+        self._items = OrderedDict()
+        self._condition = threading.Condition()
+        self._counter = 0
+        self._thread = None
+        self._running = False
+
+        self.enqueued = 0
+        self.handled = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.latency_total = 0
+        self.latency_max = 0
+
+    def put(self, item, key=None, merge=None):
+        with self._condition:
+            now = time.monotonic()
+            self.enqueued += 1
+            if key is not None and key in self._items:
+                # keep the position in the queue, but only handle the latest item
+                if merge is not None:
+                    item = merge(self._items[key][1], item)
+                self._items[key] = (now, item)
+                self.coalesced += 1
+            else:
+                if key is None:
+                    self._counter += 1
+                    key = self._counter
+                if len(self._items) >= self.max_size:
+                    self._items.popitem(last=False)
+                    self.dropped += 1
+                    if self.dropped % 100 == 1:
+                        _LOGGER.warning(f"{self.name} queue full, {self.dropped} messages dropped so far")
+                self._items[key] = (now, item)
+                self.max_depth = max(self.max_depth, len(self._items))
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        with self._condition:
+            if not self._items and not self._condition.wait_for(lambda: self._items or not self._running, timeout):
+                return None, None
+            if not self._items:
+                return None, None
+            _, (enqueued, item) = self._items.popitem(last=False)
+            return enqueued, item
+
+    def process(self, enqueued, item):
+        try:
+            self.handler(item)
+        except Exception as err:
+            _LOGGER.exception(f"error handling queued message: {err}")
+        latency = time.monotonic() - enqueued
+        self.handled += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def run(self):
+        while self._running:
+            enqueued, item = self.get()
+            if item is not None:
+                self.process(enqueued, item)
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def depth(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "handled": self.handled,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "avg_latency_ms": round(self.latency_total / self.handled * 1000, 3) if self.handled > 0 else 0,
+            "max_latency_ms": round(self.latency_max * 1000, 3)
+        }
@@ -1,6 +0,0 @@
-from threading import Timer
-
-class InvervalTimer(Timer):
-    def run(self):
-        while not self.finished.wait(self.interval):
-            self.function(*self.args, **self.kwargs)
\ No newline at end of file
@@ -1,16 +1,63 @@
 import os
+import gzip
 import json
+import logging
+import shutil
+import threading
+import time
+from collections import deque
 from google.protobuf.json_format import MessageToDict
 
+_LOGGER = logging.getLogger(__name__)
+
+# rotate the log file when it exceeds this size (bytes) or age (seconds)
+LOG_MAX_BYTES = int(os.getenv("EF_LOG_MAX_BYTES")) if os.getenv("EF_LOG_MAX_BYTES") is not None else 10 * 1024 * 1024
+LOG_MAX_AGE = int(os.getenv("EF_LOG_MAX_AGE")) if os.getenv("EF_LOG_MAX_AGE") is not None else 24 * 3600
+# number of rotated files that are kept
+LOG_BACKUPS = int(os.getenv("EF_LOG_BACKUPS")) if os.getenv("EF_LOG_BACKUPS") is not None else 5
+# compress rotated files
+LOG_GZIP = os.getenv("EF_LOG_GZIP") == "1"
+# maximum number of messages waiting to be written, the oldest ones are dropped if the writer falls behind
+LOG_BUFFER_SIZE = int(os.getenv("EF_LOG_BUFFER_SIZE")) if os.getenv("EF_LOG_BUFFER_SIZE") is not None else 10000
+# the writer wakes up when this many messages are waiting or after FLUSH_INTERVAL seconds
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1
+
+LOG_FILE = "messages.ndjson"
+
+
+# Writes the raw messages as one JSON object per line. log_message only queues the message,
+# the conversion and the file access happen in a separate writer thread.
 class MessageLogger:
-    def __init__(self, mode: str, target_folder: str="") -> None:
+    def __init__(self, mode: str, target_folder: str="", max_bytes: int=LOG_MAX_BYTES, max_age: int=LOG_MAX_AGE,
+                 backups: int=LOG_BACKUPS, compress: bool=LOG_GZIP, buffer_size: int=LOG_BUFFER_SIZE) -> None:
         self.mode = mode
         if os.path.isdir(target_folder):
             self.target_folder = target_folder
             self.delete_old_files()
         else:
             raise Exception('logging folder does not exist.')
-        
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backups = backups
+        self.compress = compress
+        self.path = os.path.join(self.target_folder, LOG_FILE)
+
+        self._buffer = deque()
+        self._buffer_size = buffer_size
+        self._condition = threading.Condition()
+        self._running = True
+        self._file = None
+        self._opened_at = None
+
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+
+        self._thread = threading.Thread(target=self.run, name="message-logger", daemon=True)
+        self._thread.start()
+
     def delete_old_files(self):
         for filename in os.listdir(self.target_folder):
             file_path = os.path.join(self.target_folder, filename)
@@ -21,42 +68,122 @@ class MessageLogger:
                 print('Failed to delete %s. Reason: %s' % (file_path, e))
 
 
+    def accepts(self, handled: bool) -> bool:
+        return not (self.mode == "none" or (self.mode == "unhandled" and handled))
+
     def log_message(self, message, pdata=None, handled=False, raw:bytes=None, prefix: str=None, title: str=None):
-        if self.mode == "none" or (self.mode == "unhandled" and handled):
+        if not self.accepts(handled):
             return
+        if pdata is not None and type(pdata) != bytes:
+            # the pdata messages are reused by the devices, keep the type and decode the bytes later
+            pdata = (type(pdata), message.pdata if hasattr(message, "pdata") else pdata.SerializeToString())
+        with self._condition:
+            if len(self._buffer) >= self._buffer_size:
+                self._buffer.popleft()
+                self.dropped += 1
+                if self.dropped % 100 == 1:
+                    _LOGGER.warning(f"message log buffer full, {self.dropped} messages dropped so far")
+            self._buffer.append((time.time(), message, pdata, handled, raw, prefix, title))
+            if len(self._buffer) >= BATCH_SIZE:
+                self._condition.notify()
+
+    def run(self):
+        while True:
+            with self._condition:
+                if self._running and len(self._buffer) < BATCH_SIZE:
+                    self._condition.wait(FLUSH_INTERVAL)
+                records = self._buffer
+                self._buffer = deque()
+                running = self._running
+            if records:
+                try:
+                    self.write(records)
+                except Exception as err:
+                    _LOGGER.error(f"writing message log failed: {err}")
+            if not running:
+                break
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def write(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(json.dumps(self.to_dict(*record), separators=(",", ":"), default=str))
+            except Exception as err:
+                _LOGGER.error(f"message could not be logged: {err}")
+        if self._file is not None and (self._file.tell() >= self.max_bytes or time.time() - self._opened_at >= self.max_age):
+            self.rotate()
+        if self._file is None:
+            self._file = open(self.path, "a")
+            self._opened_at = time.time()
+        self._file.write("\n".join(lines))
+        self._file.write("\n")
+        self._file.flush()
+        self.written += len(lines)
+        self.batches += 1
+
+    def to_dict(self, timestamp, message, pdata, handled, raw, prefix, title) -> dict:
+        record = {"time": round(timestamp, 3)}
+        if title is not None:
+            record["device"] = title
+        if prefix is not None:
+            record["prefix"] = prefix
+        record["handled"] = handled
+        if type(raw) == bytes:
+            record["raw"] = raw.hex()
+        elif type(raw) == str:
+            record["raw"] = raw
+
+        if hasattr(message, "message"):
+            # header scanned by the device (HeaderInfo), parsed here instead of in the message handling
+            message = message.message
         if type(message) == bytes:
-            file_name = "binary.RAW"
+            record["message"] = {"raw": message.hex()}
         elif type(message) == dict:
-            # JSON 
-            if 'cmdFunc' in message and 'cmdId' in message:
-                file_name = f"{message['cmdFunc']}-{message['cmdId']}.RAW"
-            else:
-                file_name = "json.RAW"
+            record["message"] = message
         else:
-            file_name = f"{message.cmd_func}-{message.cmd_id}.RAW"
-        if prefix is not None:
-            file_name = f"{prefix.replace(' ', '_')}_{file_name}"
-        with open(os.path.join(self.target_folder, file_name), "w") as f:
-            if title is not None:
-                f.write(f"{title}:\n")
-            if raw is not None:
-                if type(raw) == bytes:
-                    f.write("RAW: %s\n" % raw.hex())
-                elif type(raw) == str:
-                    f.write("RAW: %s\n" % raw)
-            message_dict = {}
-            if type(message) == bytes:
-                message_dict["raw"] = message.hex()
-            elif type(message) == dict:
-                message_dict = message
-            else:
-                message_dict = MessageToDict(message)
-                
-            if pdata is not None:
-                if type(pdata) == bytes:
-                    message_dict["pdata"] = pdata.hex()
-                else:
-                    message_dict["pdata"] = MessageToDict(pdata)
-
-            f.write(f"{json.dumps(message_dict, indent=4)}")
-            f.write("\n")
\ No newline at end of file
+            record["message"] = MessageToDict(message)
+
+        if type(pdata) == bytes:
+            record["pdata"] = pdata.hex()
+        elif pdata is not None:
+            pdata_type, data = pdata
+            decoded = pdata_type()
+            decoded.ParseFromString(bytes(data) if data is not None else b"")
+            record["pdata"] = MessageToDict(decoded)
+        return record
+
+    def rotate(self):
+        self._file.close()
+        self._file = None
+        now = time.time()
+        rotated = os.path.join(self.target_folder, "messages-%s.%03d.ndjson" % (time.strftime("%Y%m%d-%H%M%S", time.localtime(now)), now % 1 * 1000))
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.unlink(rotated)
+        self.rotations += 1
+        backups = sorted(filename for filename in os.listdir(self.target_folder)
+                         if filename.startswith("messages-") and (filename.endswith(".ndjson") or filename.endswith(".ndjson.gz")))
+        for filename in backups[:max(0, len(backups) - self.backups)]:
+            os.unlink(os.path.join(self.target_folder, filename))
+
+    def stop(self):
+        # writes the remaining messages
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "rotations": self.rotations
+        }
@@ -0,0 +1,155 @@
+import heapq
+import logging
+import math
+import os
+import random
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# due times are rounded up to multiples of the resolution (seconds), all tasks of the same
+# slot run in one wakeup, so the wakeups per second do not grow with the number of tasks
+SCHEDULER_RESOLUTION = float(os.getenv("EF_SCHEDULER_RESOLUTION")) if os.getenv("EF_SCHEDULER_RESOLUTION") is not None else 0.05
+
+
+class ScheduledTask:
+    __slots__ = ("function", "args", "interval", "jitter", "base", "due", "queued", "cancelled", "scheduler")
+
+    def __init__(self, scheduler, function, args, interval, jitter):
+        self.scheduler = scheduler
+        self.function = function
+        self.args = args
+        # None for tasks that run once
+        self.interval = interval
+        self.jitter = jitter
+        # due time without jitter, the next run of a periodic task is based on it
+        self.base = None
+        self.due = None
+        self.queued = False
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self.scheduler.cancelled(self)
+
+    def __lt__(self, other):
+        return self.due < other.due
+
+
+# Runs delayed and periodic tasks (e.g. the connection check of every device) from one thread.
+# The tasks must return quickly, a slow task delays all others.
+class Scheduler:
+    def __init__(self, resolution: float = SCHEDULER_RESOLUTION) -> None:
+        self.resolution = resolution
+        self._heap = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = True
+        self._cancelled = 0
+        self.stats_counters = {
+            "wakeups": 0,
+            "runs": 0,
+            "errors": 0
+        }
+
+    def call_later(self, delay: float, function, *args, jitter: float = 0) -> ScheduledTask:
+        task = ScheduledTask(self, function, args, None, jitter)
+        self._schedule(task, time.monotonic() + delay)
+        return task
+
+    def call_every(self, interval: float, function, *args, jitter: float = 0) -> ScheduledTask:
+        # the first run is after one interval, every run is delayed by a random part of the jitter
+        task = ScheduledTask(self, function, args, interval, jitter)
+        self._schedule(task, time.monotonic() + interval)
+        return task
+
+    def _schedule(self, task, base):
+        task.base = base
+        due = base + random.uniform(0, task.jitter) if task.jitter > 0 else base
+        task.due = math.ceil(due / self.resolution) * self.resolution
+        with self._condition:
+            if not self._running or task.cancelled:
+                return
+            task.queued = True
+            heapq.heappush(self._heap, task)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="scheduler", daemon=True)
+                self._thread.start()
+            elif self._heap[0] is task:
+                # the new task is due before the one the thread is waiting for
+                self._condition.notify()
+
+    def cancelled(self, task):
+        with self._condition:
+            if not task.queued:
+                return
+            self._cancelled += 1
+            if self._cancelled > 100 and self._cancelled > len(self._heap) / 2:
+                # drop the cancelled tasks instead of waiting until they are due
+                for queued in self._heap:
+                    if queued.cancelled:
+                        queued.queued = False
+                self._heap = [queued for queued in self._heap if not queued.cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+    def run(self):
+        while True:
+            due = []
+            with self._condition:
+                while self._running and (not self._heap or self._heap[0].due > time.monotonic()):
+                    self._condition.wait(self._heap[0].due - time.monotonic() if self._heap else None)
+                if not self._running:
+                    return
+                self.stats_counters["wakeups"] += 1
+                now = time.monotonic()
+                while self._heap and self._heap[0].due <= now:
+                    task = heapq.heappop(self._heap)
+                    task.queued = False
+                    if task.cancelled:
+                        self._cancelled -= 1
+                    else:
+                        due.append(task)
+            for task in due:
+                if task.cancelled:
+                    continue
+                try:
+                    task.function(*task.args)
+                except Exception as err:
+                    self.stats_counters["errors"] += 1
+                    _LOGGER.error(f"scheduled task {getattr(task.function, '__qualname__', task.function)} failed: {err}")
+                self.stats_counters["runs"] += 1
+                if task.interval is not None and not task.cancelled:
+                    # runs that have been missed (e.g. after a suspend) are skipped
+                    self._schedule(task, max(task.base + task.interval, time.monotonic()))
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            for task in self._heap:
+                task.cancelled = True
+                task.queued = False
+            self._heap = []
+            self._cancelled = 0
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._condition:
+            tasks = len(self._heap) - self._cancelled
+        return dict(self.stats_counters, tasks=tasks)
+
+
+scheduler: Scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    global scheduler
+    with _scheduler_lock:
+        if scheduler is None:
+            scheduler = Scheduler()
+        return scheduler
@@ -0,0 +1,88 @@
+import datetime
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+
+from model.utils.scheduler import get_scheduler
+from model.utils.warm_state import get_warm_state
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# Dumps the current state of all devices on demand, either to a file in the log folder
+# when the process receives SIGUSR1 or to every client that connects to the control socket
+# (e.g. `socat - UNIX-CONNECT:/tmp/ecoflow.sock`). Nothing is written in the steady state.
+class StateSnapshot:
+    def __init__(self, devices: list, target_folder: str, client=None) -> None:
+        self.devices = devices
+        self.target_folder = target_folder
+        self.client = client
+        self._socket = None
+        self._lock = threading.Lock()
+
+    def create(self) -> dict:
+        snapshot = {
+            "time": datetime.datetime.now().isoformat(),
+            "devices": {}
+        }
+        if self.client is not None:
+            snapshot["client"] = {
+                "state": self.client.state,
+                "connection": dict(self.client.connection_stats),
+                "ingest_queue": self.client.ingest_queue.stats(),
+                "data_requests": self.client.staleness.stats(),
+                "commands": self.client.commands.stats()
+            }
+        snapshot["scheduler"] = get_scheduler().stats()
+        snapshot["warm_state"] = get_warm_state().stats()
+        for device in list(self.devices):
+            try:
+                snapshot["devices"][device.device_sn] = device.snapshot()
+            except Exception as err:
+                snapshot["devices"][device.device_sn] = {"error": str(err)}
+        return snapshot
+
+    def dump(self) -> str:
+        with self._lock:
+            file_path = os.path.join(self.target_folder, "state-%s.json" % datetime.datetime.now().strftime("%Y%m%d-%H%M%S"))
+            with open(file_path, "w") as f:
+                json.dump(self.create(), f, indent=4, default=str)
+            _LOGGER.info(f"state snapshot written to {file_path}")
+            return file_path
+
+    def install_signal_handler(self, signum=signal.SIGUSR1):
+        # the signal handler runs in the main thread (MQTT loop), the file is written in another thread
+        signal.signal(signum, lambda *args: threading.Thread(target=self.dump, name="snapshot", daemon=True).start())
+
+    def start_control_socket(self, path: str):
+        if os.path.exists(path):
+            os.unlink(path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(path)
+        os.chmod(path, 0o600)
+        self._socket.listen(1)
+        threading.Thread(target=self.serve, name="control-socket", daemon=True).start()
+        _LOGGER.info(f"control socket listening on {path}")
+
+    def serve(self):
+        while self._socket is not None:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                break
+            with connection:
+                try:
+                    connection.sendall(json.dumps(self.create(), default=str).encode("utf-8") + b"\n")
+                except OSError as err:
+                    _LOGGER.error(f"sending the state snapshot failed: {err}")
+
+    def stop(self):
+        if self._socket is not None:
+            path = self._socket.getsockname()
+            self._socket.close()
+            self._socket = None
+            if os.path.exists(path):
+                os.unlink(path)
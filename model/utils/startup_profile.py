@@ -0,0 +1,68 @@
+import builtins
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_LOGGER = logging.getLogger(__name__)
+
+# number of modules listed in the report
+REPORT_MODULES = 25
+
+
+# Measures the startup (index.py --profile-startup): the import time of every module imported
+# by the main thread (total, including the modules it imports, and self) and the duration of
+# steps like the authorization or the construction of each device.
+class StartupProfile:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        # module -> [total seconds, self seconds]
+        self.imports = {}
+        # (kind, name, seconds)
+        self.steps = []
+        self._thread = threading.main_thread()
+        self._original_import = None
+        # time spent in the imports of the modules that are currently imported
+        self._children = []
+
+    def install(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level != 0 or name in sys.modules or threading.current_thread() is not self._thread:
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            self.imports[name] = [elapsed, elapsed - children]
+
+    @contextmanager
+    def measure(self, kind: str, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((kind, name, time.perf_counter() - start))
+
+    def report(self):
+        _LOGGER.info(f"startup took {time.perf_counter() - self.started:.3f} seconds")
+        modules = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)
+        _LOGGER.info(f"{len(modules)} modules imported in {sum(times[1] for _, times in modules):.3f} seconds, slowest (self / total):")
+        for name, (total, own) in modules[:REPORT_MODULES]:
+            _LOGGER.info(f"  {own * 1000:8.1f} ms {total * 1000:8.1f} ms  {name}")
+        for kind, name, elapsed in self.steps:
+            _LOGGER.info(f"{kind} {name}: {elapsed * 1000:.1f} ms")
@@ -0,0 +1,34 @@
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = None):
+        # rate = tokens per second, a rate <= 0 means unlimited
+        self.rate = rate
+        self.burst = burst if burst is not None and burst > 0 else max(rate, 1)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def take(self, tokens: float = 1) -> bool:
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens: float = 1) -> float:
+        # seconds until the requested amount of tokens is available
+        if self.rate <= 0:
+            return 0
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0, (tokens - self._tokens) / self.rate)
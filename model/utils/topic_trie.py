@@ -0,0 +1,81 @@
+import threading
+from typing import Dict, List
+
+
+class _TrieNode:
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.values = []
+
+
+# Maps MQTT topic filters (with + and # wildcards) to values
+class TopicTrie:
+    def __init__(self):
+        self._root = _TrieNode()
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def add(self, topic_filter: str, value):
+        with self._lock:
+            self._add(topic_filter, value)
+
+    def _add(self, topic_filter, value):
+        node = self._root
+        for level in topic_filter.split("/"):
+            if level not in node.children:
+                node.children[level] = _TrieNode()
+            node = node.children[level]
+        if value not in node.values:
+            node.values.append(value)
+        self._cache.clear()
+
+    def remove(self, topic_filter: str, value):
+        with self._lock:
+            self._remove(topic_filter, value)
+
+    def _remove(self, topic_filter, value):
+        path = []
+        node = self._root
+        for level in topic_filter.split("/"):
+            if level not in node.children:
+                return
+            path.append((node, level))
+            node = node.children[level]
+        if value in node.values:
+            node.values.remove(value)
+        # remove empty branches
+        for parent, level in reversed(path):
+            child = parent.children[level]
+            if child.values or child.children:
+                break
+            del parent.children[level]
+        self._cache.clear()
+
+    def match(self, topic: str) -> List:
+        values = self._cache.get(topic)
+        if values is None:
+            with self._lock:
+                values = []
+                self._match(self._root, topic.split("/"), 0, values)
+                self._cache[topic] = values
+        return values
+
+    def _match(self, node, levels, index, values):
+        if "#" in node.children:
+            # matches the parent level and everything below
+            self._add_values(node.children["#"], values)
+        if index == len(levels):
+            self._add_values(node, values)
+            return
+        level = levels[index]
+        if level in node.children:
+            self._match(node.children[level], levels, index + 1, values)
+        if "+" in node.children:
+            self._match(node.children["+"], levels, index + 1, values)
+
+    def _add_values(self, node, values):
+        for value in node.values:
+            if value not in values:
+                values.append(value)
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from model.utils.scheduler import get_scheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+# file with the last values of all devices, restored after a restart
+WARM_STATE_FILE = os.path.expanduser(os.getenv("EF_WARM_STATE_FILE") if os.getenv("EF_WARM_STATE_FILE") is not None else "~/.cache/ecoflow-bridge/state.json")
+# seconds between two saves, 0 disables saving and restoring
+WARM_STATE_INTERVAL = float(os.getenv("EF_WARM_STATE_INTERVAL")) if os.getenv("EF_WARM_STATE_INTERVAL") is not None else 60
+# the state of a device that has not sent anything for this many seconds is not restored
+WARM_STATE_MAX_AGE = float(os.getenv("EF_WARM_STATE_MAX_AGE")) if os.getenv("EF_WARM_STATE_MAX_AGE") is not None else 86400
+
+VERSION = 1
+
+
+# Saves the last values, the last seen and the last heartbeat time of every device periodically
+# to a compact json file and hands them to the devices of the next run (see EcoflowDevice.restore_state),
+# so the homie properties have sane values before the devices have sent anything.
+class WarmState:
+    def __init__(self, path: str = WARM_STATE_FILE, interval: float = WARM_STATE_INTERVAL, max_age: float = WARM_STATE_MAX_AGE) -> None:
+        self.path = path
+        self.interval = interval
+        self.max_age = max_age
+        self.devices = []
+        # serial -> state of the previous run
+        self._states = {}
+        self._task = None
+        self._lock = threading.Lock()
+        self.stats_counters = {
+            "loaded": 0,
+            "restored": 0,
+            "saves": 0,
+            "failed_saves": 0,
+            "failed_devices": 0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def load(self):
+        if not self.enabled:
+            return
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+            if state.get("version") != VERSION:
+                _LOGGER.warning(f"ignoring warm state {self.path} of version {state.get('version')}")
+                return
+            self._states = state["devices"]
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as err:
+            _LOGGER.warning(f"ignoring invalid warm state {self.path}: {err}")
+            return
+        self.stats_counters["loaded"] = len(self._states)
+        _LOGGER.info(f"loaded the state of {len(self._states)} devices from {self.path}")
+
+    def pop(self, serial: str, type: str) -> dict:
+        # state of the device from the previous run, None if there is none or it is too old
+        with self._lock:
+            state = self._states.pop(serial, None)
+            if state is None or state.get("type") != type:
+                return None
+            last_seen = state.get("last_seen")
+            if last_seen is None or time.time() - last_seen > self.max_age:
+                return None
+            self.stats_counters["restored"] += 1
+            return state
+
+    def start(self, devices: list):
+        self.devices = devices
+        if self.enabled and self._task is None:
+            self._task = get_scheduler().call_every(self.interval, self.save, jitter=self.interval / 10)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.save()
+
+    def save(self):
+        states = {}
+        for device in list(self.devices):
+            try:
+                state = device.get_saved_state()
+            except Exception as err:
+                self.stats_counters["failed_devices"] += 1
+                _LOGGER.warning(f"{device.device_sn} state not saved: {err}")
+                continue
+            if state is not None:
+                states[device.device_sn] = state
+        with self._lock:
+            try:
+                folder = os.path.dirname(self.path)
+                if folder != "":
+                    os.makedirs(folder, exist_ok=True)
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, "w") as f:
+                    json.dump({"version": VERSION, "time": time.time(), "devices": states}, f, separators=(",", ":"))
+                os.replace(temp_path, self.path)
+                self.stats_counters["saves"] += 1
+            except OSError as err:
+                self.stats_counters["failed_saves"] += 1
+                _LOGGER.error(f"saving the warm state to {self.path} failed: {err}")
+
+    def stats(self) -> dict:
+        return dict(self.stats_counters, devices=len(self.devices))
+
+
+warm_state: WarmState = None
+_warm_state_lock = threading.Lock()
+
+
+def get_warm_state() -> WarmState:
+    global warm_state
+    with _warm_state_lock:
+        if warm_state is None:
+            warm_state = WarmState()
+            warm_state.load()
+        return warm_state
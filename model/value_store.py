@@ -0,0 +1,207 @@
+import threading
+from array import array
+from typing import Dict, List
+
+from model.field_plan import FieldPlan
+
+# slot kinds
+INT = 0
+FLOAT = 1
+BOOL = 2
+OBJECT = 3
+
+# slot states
+_UNSET = 0
+_NUMBER = 1
+_OBJECT = 2
+
+
+def get_field_kind(field: FieldPlan) -> int:
+    descriptor = field.descriptor
+    if descriptor.type == descriptor.TYPE_BOOL:
+        return BOOL
+    if descriptor.type in [descriptor.TYPE_FLOAT, descriptor.TYPE_DOUBLE]:
+        return FLOAT
+    if descriptor.type in [descriptor.TYPE_STRING, descriptor.TYPE_BYTES, descriptor.TYPE_MESSAGE, descriptor.TYPE_GROUP] \
+            or descriptor.label == descriptor.LABEL_REPEATED:
+        return OBJECT
+    # integers and enums, converted to float by the divisor
+    return FLOAT if field.divisor != 1 else INT
+
+
+def get_config_kind(config: dict) -> int:
+    type = config["type"] if "type" in config else "number"
+    if type in ["number", "battery"]:
+        return FLOAT if "divisor" in config and config["divisor"] != 1 else INT
+    if type == "float":
+        return FLOAT
+    if type in ["boolean", "number-boolean"]:
+        return BOOL
+    return OBJECT
+
+
+# Slot index of every field of a device type. The layout is shared by all devices of the same type,
+# the values are stored per device in a ValueStore.
+class StoreLayout:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.slots: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.kinds: List[int] = []
+        # position of the slot in the array of its kind
+        self.offsets: List[int] = []
+        self.sizes = [0, 0]
+        self.field_slots: Dict[FieldPlan, int] = {}
+        # units are the same for all devices of a type
+        self.units: Dict[str, str] = {}
+        # (node, name) of a device config entry -> slot of its key
+        self.config_slots: Dict[tuple, int] = {}
+        # devices of the same type are created in parallel, lookups of existing slots need no lock
+        self._lock = threading.RLock()
+
+    def add(self, name: str, kind: int = OBJECT) -> int:
+        slot = self.slots.get(name)
+        if slot is None:
+            with self._lock:
+                slot = self.slots.get(name)
+                if slot is None:
+                    slot = len(self.names)
+                    if kind == FLOAT:
+                        self.sizes[1] += 1
+                        self.offsets.append(self.sizes[1] - 1)
+                    elif kind in [INT, BOOL]:
+                        self.sizes[0] += 1
+                        self.offsets.append(self.sizes[0] - 1)
+                    else:
+                        self.offsets.append(-1)
+                    self.names.append(name)
+                    # the sizes include the slot before it is counted in kinds (see ValueStore._grow)
+                    self.kinds.append(kind)
+                    self.slots[name] = slot
+        return slot
+
+    def add_field(self, field: FieldPlan) -> int:
+        slot = self.field_slots.get(field)
+        if slot is None:
+            with self._lock:
+                slot = self.add(field.name, get_field_kind(field))
+                self.field_slots[field] = slot
+        return slot
+
+    def add_message_plan(self, plan):
+        for field in plan.fields.values():
+            self.add_field(field)
+        for derived_field in plan.derived_fields:
+            self.add(derived_field.field_name, FLOAT)
+
+    def add_device_config(self, config: dict):
+        with self._lock:
+            for name, descriptor in config["properties"].items():
+                self.config_slots[(descriptor["node"], descriptor["name"])] = self.add(name, get_config_kind(descriptor))
+        if "derived_fields" in config:
+            for derived_field in config["derived_fields"]:
+                self.add(derived_field["field_name"], FLOAT)
+
+    def slot(self, descriptor) -> int:
+        # slot of a FieldPlan, a device config entry or a plain name, unknown fields get a new slot
+        if type(descriptor) == FieldPlan:
+            slot = self.field_slots.get(descriptor)
+            return slot if slot is not None else self.add_field(descriptor)
+        if type(descriptor) == dict:
+            slot = self.config_slots.get((descriptor.get("node"), descriptor["name"]))
+            return slot if slot is not None else self.add(descriptor["name"])
+        slot = self.slots.get(descriptor)
+        return slot if slot is not None else self.add(descriptor)
+
+
+_layouts: Dict[str, StoreLayout] = {}
+_layouts_lock = threading.Lock()
+
+
+def get_layout(name: str) -> StoreLayout:
+    layout = _layouts.get(name)
+    if layout is None:
+        with _layouts_lock:
+            layout = _layouts.get(name)
+            if layout is None:
+                layout = StoreLayout(name)
+                _layouts[name] = layout
+    return layout
+
+
+# Current values of one device. Numbers are kept in typed arrays, other values (strings, json)
+# and values that do not match the kind of their slot in a dict.
+class ValueStore:
+    __slots__ = ("layout", "_ints", "_floats", "_state", "_objects")
+
+    def __init__(self, layout: StoreLayout) -> None:
+        self.layout = layout
+        self._ints = array("q")
+        self._floats = array("d")
+        self._state = bytearray()
+        self._objects = {}
+        self._grow()
+
+    def _grow(self):
+        layout = self.layout
+        count = len(layout.kinds)
+        if len(self._ints) < layout.sizes[0]:
+            self._ints.extend([0] * (layout.sizes[0] - len(self._ints)))
+        if len(self._floats) < layout.sizes[1]:
+            self._floats.extend([0.0] * (layout.sizes[1] - len(self._floats)))
+        if len(self._state) < count:
+            self._state.extend(bytes(count - len(self._state)))
+
+    def set(self, slot: int, value):
+        if slot >= len(self._state):
+            # the layout has grown since the store has been created
+            self._grow()
+        kind = self.layout.kinds[slot]
+        value_type = type(value)
+        if kind == FLOAT and (value_type == float or value_type == int):
+            self._floats[self.layout.offsets[slot]] = value
+        elif kind == INT and value_type == int and -(1 << 63) <= value < (1 << 63):
+            self._ints[self.layout.offsets[slot]] = value
+        elif kind == BOOL and (value_type == bool or value_type == int and value in (0, 1)):
+            self._ints[self.layout.offsets[slot]] = 1 if value else 0
+        else:
+            self._objects[slot] = value
+            self._state[slot] = _OBJECT
+            return
+        if self._state[slot] == _OBJECT:
+            del self._objects[slot]
+        self._state[slot] = _NUMBER
+
+    def get(self, slot: int, default=None):
+        state = self._state[slot] if slot < len(self._state) else _UNSET
+        if state == _NUMBER:
+            kind = self.layout.kinds[slot]
+            if kind == FLOAT:
+                return self._floats[self.layout.offsets[slot]]
+            if kind == BOOL:
+                return self._ints[self.layout.offsets[slot]] == 1
+            return self._ints[self.layout.offsets[slot]]
+        if state == _OBJECT:
+            # another thread (e.g. saving the warm state) may read while the value becomes a number
+            return self._objects.get(slot, default)
+        return default
+
+    def clear(self, slot: int = None):
+        if slot is None:
+            self._objects.clear()
+            self._state[:] = bytes(len(self._state))
+        elif slot < len(self._state):
+            self._objects.pop(slot, None)
+            self._state[slot] = _UNSET
+
+    def set_value(self, name: str, value):
+        self.set(self.layout.slot(name), value)
+
+    def get_value(self, name: str, default=None):
+        slot = self.layout.slots.get(name)
+        return self.get(slot, default) if slot is not None else default
+
+    def items(self):
+        for slot, state in enumerate(self._state):
+            if state != _UNSET:
+                yield self.layout.names[slot], self.get(slot)
@@ -0,0 +1,59 @@
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+
+class FakeTask:
+    def __init__(self, due, function, args) -> None:
+        self.due = due
+        self.function = function
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+# Replaces time.monotonic and the scheduler of a module, the scheduled functions run
+# when the time is advanced past their due time.
+class FakeClock:
+    def __init__(self, monkeypatch) -> None:
+        self.monkeypatch = monkeypatch
+        self.now = 1000.0
+        self.tasks = []
+
+    def install(self, module):
+        self.monkeypatch.setattr(module, "time", types.SimpleNamespace(monotonic=self.monotonic, time=self.monotonic))
+        self.monkeypatch.setattr(module, "get_scheduler", lambda: self)
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def call_later(self, delay, function, *args, jitter=0):
+        task = FakeTask(self.now + delay, function, args)
+        self.tasks.append(task)
+        return task
+
+    def pending(self) -> list:
+        return [task for task in self.tasks if not task.cancelled]
+
+    def advance(self, seconds):
+        end = self.now + seconds
+        while True:
+            due = sorted((task for task in self.pending() if task.due <= end), key=lambda task: task.due)
+            if not due:
+                break
+            task = due[0]
+            self.tasks.remove(task)
+            self.now = task.due
+            task.function(*task.args)
+        self.now = end
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    return FakeClock(monkeypatch)
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from model.utils.capture import CaptureWriter, MAGIC, read_capture
+
+
+def write_capture(path, records):
+    writer = CaptureWriter(path)
+    for topic, payload in records:
+        writer.write(topic, payload, timestamp=1.0)
+    writer.close()
+
+
+def test_append(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    write_capture(path, [("a", b"1"), ("b", b"22")])
+    write_capture(path, [("c", b"333")])
+    assert [(topic, payload) for _, topic, payload in read_capture(path)] == [("a", b"1"), ("b", b"22"), ("c", b"333")]
+
+
+@pytest.mark.parametrize("cut", [1, 5, 15, 17])
+def test_incomplete_record_is_removed(tmp_path, cut):
+    path = str(tmp_path / "capture.bin")
+    write_capture(path, [("a", b"1"), ("topic", b"payload")])
+    complete = os.path.getsize(path)
+    # the last record (14 bytes header, 5 bytes topic, 7 bytes payload) is cut off
+    with open(path, "r+b") as f:
+        f.truncate(complete - cut)
+    write_capture(path, [("c", b"333")])
+    assert [(topic, payload) for _, topic, payload in read_capture(path)] == [("a", b"1"), ("c", b"333")]
+
+
+def test_empty_file(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    open(path, "wb").close()
+    write_capture(path, [("a", b"1")])
+    with open(path, "rb") as f:
+        assert f.read(len(MAGIC)) == MAGIC
+    assert len(list(read_capture(path))) == 1
+
+
+def test_not_a_capture(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    with open(path, "wb") as f:
+        f.write(b"something else")
+    with pytest.raises(ValueError):
+        CaptureWriter(path)
@@ -0,0 +1,62 @@
+import pytest
+
+import model.protos.powerstream_pb2 as powerstream
+from model.field_plan import get_message_plan
+from model.utils.change_filter import ChangeFilter
+from model.value_store import StoreLayout, FLOAT
+
+
+def create_filter(max_silence=None):
+    layout = StoreLayout("test")
+    return ChangeFilter(layout, max_silence=max_silence), layout.add("value", FLOAT)
+
+
+def test_deadband_options_are_rounded():
+    fields = {field.name: field for field in get_message_plan(powerstream.InverterHeartbeat.DESCRIPTOR).fields.values()}
+    assert fields["pv1InputCur"].deadband == 0.1
+    assert fields["invFreq"].deadband == 0.1
+
+
+# converted values of one step of a field with divisor 10
+@pytest.mark.parametrize("last,value", [(500, 501), (501, 502), (2, 3), (502, 501)])
+def test_change_of_exactly_the_deadband_is_published(last, value):
+    change_filter, slot = create_filter()
+    assert change_filter.should_publish(slot, last / 10, deadband=0.1, now=0)
+    assert change_filter.should_publish(slot, value / 10, deadband=0.1, now=1)
+
+
+def test_change_within_the_deadband_is_suppressed():
+    change_filter, slot = create_filter()
+    assert change_filter.should_publish(slot, 50.0, deadband=0.5, now=0)
+    assert not change_filter.should_publish(slot, 50.4, deadband=0.5, now=1)
+    assert not change_filter.should_publish(slot, 49.6, deadband=0.5, now=2)
+    # compared with the last published value, not the last received one
+    assert change_filter.should_publish(slot, 50.5, deadband=0.5, now=3)
+    assert change_filter.stats() == {"published": 2, "suppressed": 2, "suppression_ratio": 0.5}
+
+
+def test_relative_deadband():
+    change_filter, slot = create_filter()
+    assert change_filter.should_publish(slot, 200.0, relative_deadband=0.01, now=0)
+    assert not change_filter.should_publish(slot, 201.9, relative_deadband=0.01, now=1)
+    assert change_filter.should_publish(slot, 202.0, relative_deadband=0.01, now=2)
+    assert not change_filter.should_publish(slot, 200.0 + 0.99 * 2.02, relative_deadband=0.01, now=3)
+
+
+def test_unchanged_value_is_published_after_max_silence():
+    change_filter, slot = create_filter(max_silence=300)
+    assert change_filter.should_publish(slot, 1.0, now=0)
+    assert not change_filter.should_publish(slot, 1.0, now=299)
+    assert change_filter.should_publish(slot, 1.0, now=300)
+    assert not change_filter.should_publish(slot, 1.0, now=301)
+    # the max_silence of the field overrides the default, 0 disables it
+    assert change_filter.should_publish(slot, 1.0, max_silence=10, now=311)
+    assert not change_filter.should_publish(slot, 1.0, max_silence=0, now=10000)
+
+
+def test_one_step_of_a_proto_field_is_published():
+    fields = {field.name: field for field in get_message_plan(powerstream.InverterHeartbeat.DESCRIPTOR).fields.values()}
+    change_filter, slot = create_filter()
+    field = fields["invFreq"]
+    assert change_filter.should_publish(slot, field.convert(500)[0], deadband=field.deadband, now=0)
+    assert change_filter.should_publish(slot, field.convert(501)[0], deadband=field.deadband, now=1)
@@ -0,0 +1,89 @@
+import pytest
+
+import model.ecoflow.coalescer as coalescer
+from model.ecoflow.coalescer import SetCommandCoalescer
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def send(sent):
+    return lambda key, value: sent.append((key, value))
+
+
+@pytest.fixture
+def commands(clock):
+    clock.install(coalescer)
+    return SetCommandCoalescer(min_interval=1)
+
+
+def test_first_command_is_sent_immediately(commands, send, sent):
+    assert commands.submit("permanent-watts", 100, send)
+    assert sent == [("permanent-watts", 100)]
+
+
+def test_min_interval_and_latest_wins(commands, clock, send, sent):
+    commands.submit("permanent-watts", 100, send)
+    clock.advance(0.2)
+    commands.submit("permanent-watts", 110, send)
+    commands.submit("permanent-watts", 120, send)
+    assert sent == [("permanent-watts", 100)]
+    clock.advance(0.7)
+    assert sent == [("permanent-watts", 100)]
+    # one interval after the first command
+    clock.advance(0.1)
+    assert sent == [("permanent-watts", 100), ("permanent-watts", 120)]
+    stats = commands.stats()
+    assert (stats["sent"], stats["coalesced"], stats["pending"]) == (2, 1, 0)
+
+
+def test_command_after_the_interval_is_sent_immediately(commands, clock, send, sent):
+    commands.submit("permanent-watts", 100, send)
+    clock.advance(1)
+    commands.submit("permanent-watts", 110, send)
+    assert sent == [("permanent-watts", 100), ("permanent-watts", 110)]
+    assert not clock.pending()
+
+
+def test_settings_are_limited_separately(commands, send, sent):
+    commands.submit("permanent-watts", 100, send)
+    commands.submit("upper-limit", 90, send)
+    assert sent == [("permanent-watts", 100), ("upper-limit", 90)]
+
+
+def test_command_for_the_current_state_is_dropped(commands, send, sent):
+    assert not commands.submit("permanent-watts", 100, send, current=100)
+    assert sent == []
+    assert commands.submit("permanent-watts", 110, send, current=100)
+    assert commands.stats()["suppressed"] == 1
+
+
+def test_current_state_cancels_the_waiting_command(commands, clock, send, sent):
+    commands.submit("permanent-watts", 100, send, current=50)
+    commands.submit("permanent-watts", 110, send, current=100)
+    # the device confirmed 100 (the last sent value), going back to it drops the waiting 110
+    assert not commands.submit("permanent-watts", 100, send, current=100)
+    clock.advance(1)
+    assert sent == [("permanent-watts", 100)]
+    stats = commands.stats()
+    assert (stats["coalesced"], stats["suppressed"], stats["pending"]) == (1, 1, 0)
+
+
+def test_current_state_is_sent_after_another_value(commands, clock, send, sent):
+    commands.submit("permanent-watts", 100, send, current=50)
+    clock.advance(1)
+    # the device still reports 50, the command for 100 may not have been applied yet
+    assert commands.submit("permanent-watts", 50, send, current=50)
+    assert sent == [("permanent-watts", 100), ("permanent-watts", 50)]
+
+
+def test_cancel_all(commands, clock, send, sent):
+    commands.submit("permanent-watts", 100, send)
+    commands.submit("permanent-watts", 110, send)
+    commands.cancel_all()
+    clock.advance(2)
+    assert sent == [("permanent-watts", 100)]
+    assert commands.stats()["pending"] == 0
@@ -0,0 +1,80 @@
+import pytest
+
+import model.ecoflow.commands as commands
+from model.ecoflow.commands import CommandTimeout, CommandTracker
+
+SERIAL = "HW51ZOH4SF4E0123"
+TOPIC = f"/app/1/{SERIAL}/thing/property/set"
+
+
+class StubClient:
+    def __init__(self) -> None:
+        self.published = []
+
+    def publish(self, topic, payload):
+        self.published.append((topic, payload))
+
+
+@pytest.fixture
+def tracker(clock):
+    clock.install(commands)
+    return CommandTracker(StubClient(), timeout=5, retries=2)
+
+
+def test_reply_completes_the_future(tracker, clock):
+    future = tracker.send(SERIAL, TOPIC, b"command", 1234, 129)
+    assert tracker.client.published == [(TOPIC, b"command")]
+    clock.advance(0.3)
+    assert tracker.handle_reply(SERIAL, 1234)
+    assert future.result(0) == pytest.approx(0.3)
+    assert not clock.pending()
+    stats = tracker.stats()
+    assert (stats["sent"], stats["acknowledged"], stats["retried"], stats["pending"]) == (1, 1, 0, 0)
+    assert stats["rtt"][SERIAL]["129"]["count"] == 1
+    assert stats["rtt"][SERIAL]["129"]["buckets"]["<=0.5s"] == 1
+
+
+def test_reply_is_matched_by_serial_and_seq(tracker):
+    future = tracker.send(SERIAL, TOPIC, b"command", 1234, 129)
+    assert not tracker.handle_reply(SERIAL, 1235)
+    assert not tracker.handle_reply("HW51ZOH4SF4E9999", 1234)
+    assert not future.done()
+    assert tracker.handle_reply(SERIAL, 1234)
+    # a second reply to the same command
+    assert not tracker.handle_reply(SERIAL, 1234)
+    assert tracker.stats()["unmatched_replies"] == 3
+
+
+def test_unanswered_command_is_sent_again_with_the_same_seq(tracker, clock):
+    future = tracker.send(SERIAL, TOPIC, b"command", 1234, 129)
+    clock.advance(5)
+    clock.advance(5)
+    assert tracker.client.published == [(TOPIC, b"command")] * 3
+    assert tracker.stats()["retried"] == 2
+    # the round trip includes the retries
+    clock.advance(1)
+    assert tracker.handle_reply(SERIAL, 1234)
+    assert future.result(0) == pytest.approx(11)
+
+
+def test_timeout_after_the_last_retry(tracker, clock):
+    future = tracker.send(SERIAL, TOPIC, b"command", 1234, 129)
+    clock.advance(14.9)
+    assert not future.done()
+    clock.advance(0.1)
+    with pytest.raises(CommandTimeout):
+        future.result(0)
+    assert len(tracker.client.published) == 3
+    stats = tracker.stats()
+    assert (stats["retried"], stats["timed_out"], stats["pending"]) == (2, 1, 0)
+    # a late reply is not matched
+    assert not tracker.handle_reply(SERIAL, 1234)
+    assert SERIAL not in tracker.stats()["rtt"]
+
+
+def test_cancel_all(tracker, clock):
+    future = tracker.send(SERIAL, TOPIC, b"command", 1234, 129)
+    tracker.cancel_all()
+    assert future.cancelled()
+    clock.advance(20)
+    assert len(tracker.client.published) == 1
@@ -0,0 +1,32 @@
+import pytest
+
+import model.protos.powerstream_pb2 as powerstream
+from model.ecoflow.constant import DEFAULT_DEST, DEFAULT_SRC
+from model.ecoflow.encoder import HeaderEncoder
+
+SET_FIELDS = {"src": DEFAULT_SRC, "dest": DEFAULT_DEST, "cmd_func": 20, "cmd_id": 129, "need_ack": 1, "device_sn": "HW51ZOH4SF4E0123"}
+DATA_REQUEST_FIELDS = {"from": "Android", "src": DEFAULT_SRC, "dest": DEFAULT_DEST}
+
+
+def serialize(fields, pdata, seq):
+    message = powerstream.SendHeaderMsg()
+    header = message.msg.add()
+    for name, value in fields.items():
+        setattr(header, name, value)
+    if pdata is not None:
+        header.pdata = pdata
+        header.data_len = len(pdata)
+    header.seq = seq
+    return message.SerializeToString()
+
+
+@pytest.mark.parametrize("fields", [SET_FIELDS, DATA_REQUEST_FIELDS])
+@pytest.mark.parametrize("pdata", [b"\x08\x64", b"", b"\x08" * 200, None])
+@pytest.mark.parametrize("seq", [0, 123456, 2**31 - 1, -1])
+def test_same_bytes_as_protobuf(fields, pdata, seq):
+    assert HeaderEncoder(fields).encode(pdata, seq) == serialize(fields, pdata, seq)
+
+
+def test_variable_fields_are_rejected():
+    with pytest.raises(ValueError):
+        HeaderEncoder({"seq": 1})
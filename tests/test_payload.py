@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+import model.protos.powerstream_pb2 as powerstream
+from model.ecoflow.payload import classify_payload, merge_payloads, scan_headers, PAYLOAD_JSON, PAYLOAD_PROTO
+from model.protos.wn511_socket_sys_pb2 import plug_heartbeat_pack
+
+FIXTURE_FOLDER = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "benchmarks", "fixtures")
+PROTO_DEVICES = ["powerstream", "smartplug"]
+
+
+def load_fixtures():
+    fixtures = []
+    for filename in sorted(os.listdir(FIXTURE_FOLDER)):
+        with open(os.path.join(FIXTURE_FOLDER, filename)) as f:
+            fixture = json.load(f)
+        for payload in fixture["payloads"]:
+            fixtures.append((filename, fixture["device"], bytes.fromhex(payload)))
+    return fixtures
+
+
+def create_payload(header_length):
+    # SendHeaderMsg with one Header of the given length, the length is the second byte
+    header = powerstream.Header(cmd_func=20, cmd_id=1)
+    if header_length > 40:
+        header.device_sn = "HW51ZOH4SF4E0123"
+    header.pdata = b"\x08" * (header_length - header.ByteSize() - 2)
+    message = powerstream.SendHeaderMsg()
+    message.msg.append(header)
+    payload = message.SerializeToString()
+    assert payload[1] == header_length
+    return payload
+
+
+@pytest.mark.parametrize("name,device,payload", load_fixtures())
+def test_fixtures(name, device, payload):
+    expected = PAYLOAD_PROTO if device in PROTO_DEVICES else PAYLOAD_JSON
+    assert classify_payload(payload, False) == expected
+    assert classify_payload(payload, True) == expected
+
+
+# lengths that are the same bytes as whitespace or the first byte of JSON
+@pytest.mark.parametrize("header_length", [9, 10, 13, 32, 91, 123])
+def test_header_length_like_json(header_length):
+    payload = create_payload(header_length)
+    assert classify_payload(payload, False) == PAYLOAD_PROTO
+    assert classify_payload(payload, True) == PAYLOAD_PROTO
+    header = scan_headers(memoryview(payload))[0]
+    assert (header.cmd_func, header.cmd_id) == (20, 1)
+
+
+def test_json_with_whitespace():
+    assert classify_payload(b' \r\n{"id": 1}', True) == PAYLOAD_JSON
+    assert classify_payload(b'\t[1]', True) == PAYLOAD_JSON
+
+
+def test_inconclusive_uses_hint():
+    assert classify_payload(b"", True) == PAYLOAD_PROTO
+    assert classify_payload(b"", False) == PAYLOAD_JSON
+    assert classify_payload(b"\x12\x00", True) == PAYLOAD_PROTO
+
+
+def create_heartbeat(seq, **fields):
+    pdata = plug_heartbeat_pack(**fields).SerializeToString()
+    header = powerstream.Header(cmd_func=2, cmd_id=1, device_sn="HW52ZDH4SF4E0123", pdata=pdata, data_len=len(pdata), seq=seq)
+    message = powerstream.SendHeaderMsg()
+    message.msg.append(header)
+    return message.SerializeToString()
+
+
+def test_merge_keeps_fields_of_partial_messages():
+    merged = merge_payloads(create_heartbeat(1, watts=100, temp=35, brightness=1023),
+                            create_heartbeat(2, watts=120))
+    header = powerstream.SendHeaderMsg.FromString(merged).msg[0]
+    assert header.seq == 2
+    assert header.data_len == len(header.pdata)
+    pdata = plug_heartbeat_pack.FromString(header.pdata)
+    assert (pdata.watts, pdata.temp, pdata.brightness) == (120, 35, 1023)
+
+
+@pytest.mark.parametrize("seq", [0, 1, 123456, 2**31 - 1, -1])
+def test_scan_seq(seq):
+    header = scan_headers(memoryview(create_heartbeat(seq, watts=100)))[0]
+    assert header.seq == seq == header.message.seq